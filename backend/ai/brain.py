@@ -1,8 +1,13 @@
 import requests
 import json
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 import time
 
+from ai.ollama_health import get_ollama_monitor, OLLAMA_URL
+from ai.model_manager import get_model_manager
+from ai.conversation import ConversationSession, OllamaRequestError
+from ai.context_manager import TOKEN_BUDGET, get_token_estimator
+
 # Import RAG functionality
 try:
     from ai.rag import enhance_with_rag, get_rag_status
@@ -35,39 +40,43 @@ def get_quick_response(prompt: str) -> Optional[str]:
             return response
     return None
 
-def _format_history(history: List[Tuple[str, str, str]], max_chars: int = 2500) -> str:
-    """Format last conversation rows - includes more context for better continuity"""
+def _format_history(history: List[Tuple[str, str, str]], max_tokens: int = TOKEN_BUDGET) -> str:
+    """Format recent conversation rows, newest first into the token budget, whole turns only"""
     if not history:
         return ""
+    estimator = get_token_estimator()
     parts = []
-    # Use last 5-8 conversations for better context (increased from 3)
-    recent_history = history[-8:] if len(history) > 8 else history
-    
-    for user, assistant, _ts in recent_history:
+    used = 0
+    for user, assistant, *_ in reversed(history):
+        lines = []
         if user:
-            parts.append(f"User: {user}")
+            lines.append(f"User: {user}")
         if assistant:
             # Remove "(cached)" suffix if present
-            clean_assistant = assistant.replace(" (cached)", "")
-            parts.append(f"Assistant: {clean_assistant}")
-    
-    text = "\n".join(parts)
-    
-    # Truncate if too long, but keep complete conversations
-    if len(text) > max_chars:
-        text = text[-max_chars:]
-        # Find first complete user message
-        first_nl = text.find("\nUser: ")
-        if first_nl != -1:
-            text = text[first_nl+1:]
-    
-    return text
+            lines.append(f"Assistant: {assistant.replace(' (cached)', '')}")
+        text = "\n".join(lines)
+        cost = estimator.count(text) + 1
+        if parts and used + cost > max_tokens:
+            break
+        parts.append(text)
+        used += cost
+    return "\n".join(reversed(parts))
 
 
 def ask_ai(prompt: str, *, history: Optional[List[Tuple[str, str, str]]] = None,
-           system: Optional[str] = None, model: str = "llama3.2:1b", timeout: int = 12,
-           use_rag: bool = True) -> str:
-    """Call local LLM with optimizations for speed and optional RAG enhancement"""
+           system: Optional[str] = None, model: Optional[str] = None, timeout: int = 12,
+           use_rag: bool = True, on_token: Optional[Callable[[str], None]] = None,
+           session: Optional[ConversationSession] = None, notes: Optional[str] = None) -> str:
+    """Call local LLM with optimizations for speed and optional RAG enhancement
+
+    `on_token(chunk)` is called with each streamed piece of the answer.
+    `model` defaults to the model manager's active model (swapped under memory pressure).
+    With a `session`, the turn is appended to that conversation (stable prefix, only new
+    tokens evaluated) and `notes` (mood, memories) travel with this question only;
+    `history` and `system` are then ignored.
+    """
+    models = get_model_manager()
+    model = model or models.active_model()
     
     # Check for quick responses first
     quick_response = get_quick_response(prompt)
@@ -85,8 +94,9 @@ def ask_ai(prompt: str, *, history: Optional[List[Tuple[str, str, str]]] = None,
         except Exception as e:
             print(f"⚠️ RAG error (continuing without): {e}")
     
-    # Check cache (skip cache if RAG was used for real-time info)
-    if not rag_used:
+    # Check cache (skip cache if RAG was used for real-time info, and inside a
+    # conversation session, where an answer depends on what was said before)
+    if not rag_used and session is None:
         cache_key = f"{prompt[:100]}_{model}"
         current_time = time.time()
         
@@ -95,7 +105,36 @@ def ask_ai(prompt: str, *, history: Optional[List[Tuple[str, str, str]]] = None,
             if current_time - cached_time < _cache_timeout:
                 return f"{cached_response} (cached)"
     
+    # Fail fast while the health monitor's circuit breaker is open
+    monitor = get_ollama_monitor()
+    if not monitor.last_check:
+        monitor.wait_checked()
+    if not monitor.allow_request():
+        retry = monitor.retry_in()
+        when = f" Retrying in {retry:.0f}s." if retry >= 1 else ""
+        return f"Sorry, AI responses are not available - the Ollama server is not responding.{when}"
+
+    # Adjust token count based on whether RAG is used
+    num_tokens = 150 if rag_used else 80  # Increased from 40 to 80 for better answers
+    options = {
+        "num_predict": num_tokens,  # More tokens when RAG is used
+        "temperature": 0.3 if rag_used else 0.2,  # Slightly higher for better answers
+        "top_k": 30 if rag_used else 20,  # More choices
+        "top_p": 0.9 if rag_used else 0.85,  # More diverse
+        "repeat_penalty": 1.1  # Prevent repetition
+    }
+
     try:
+        if session is not None:
+            request_start = time.time()
+            answer, final = session.ask(prompt, model=model, notes=notes, options=options,
+                                        keep_alive=models.keep_alive_for(model), timeout=timeout,
+                                        on_token=on_token)
+            monitor.record_success(time.time() - request_start)
+            if final.get("done"):
+                models.record_generation(model, final)
+            return answer
+
         # Get conversation history for context
         context = _format_history(history or [])
         
@@ -111,34 +150,37 @@ def ask_ai(prompt: str, *, history: Optional[List[Tuple[str, str, str]]] = None,
         else:
             composite_prompt = f"{sys_text}\n\nUser: {prompt}\n\nAssistant:"
         
-        # Adjust token count based on whether RAG is used
-        num_tokens = 150 if rag_used else 80  # Increased from 40 to 80 for better answers
-        
         # Reduced timeout for faster responses
+        request_start = time.time()
         response = requests.post(
-            "http://localhost:11434/api/generate",
+            f"{OLLAMA_URL}/api/generate",
             json={
                 "model": model, 
                 "prompt": composite_prompt,
-                "options": {
-                    "num_predict": num_tokens,  # More tokens when RAG is used
-                    "temperature": 0.3 if rag_used else 0.2,  # Slightly higher for better answers
-                    "top_k": 30 if rag_used else 20,  # More choices
-                    "top_p": 0.9 if rag_used else 0.85,  # More diverse
-                    "repeat_penalty": 1.1  # Prevent repetition
-                }
+                "keep_alive": models.keep_alive_for(model),
+                "options": options
             },
             stream=True,
             timeout=timeout,
         )
         
+        # Any HTTP answer means the server is up (a missing model is not an outage)
+        monitor.record_success(time.time() - request_start)
         result = ""
         start_time = time.time()
         
         for line in response.iter_lines():
             if line:
                 data = json.loads(line)
-                result += data.get("response", "")
+                if data.get("done"):
+                    models.record_generation(model, data)
+                chunk = data.get("response", "")
+                result += chunk
+                if on_token and chunk:
+                    try:
+                        on_token(chunk)
+                    except Exception:
+                        pass
                 
                 # Stop if taking too long
                 if time.time() - start_time > timeout:
@@ -159,7 +201,23 @@ def ask_ai(prompt: str, *, history: Optional[List[Tuple[str, str, str]]] = None,
         
         return final_response
         
-    except requests.exceptions.Timeout:
+    except OllamaRequestError as e:
+        # The server answered: like the direct path, a missing model is not an outage
+        monitor.record_success(time.time() - request_start)
+        return f"AI Error: {e}"
+    except requests.exceptions.ConnectionError as e:
+        monitor.record_failure(e)
+        return "Sorry, AI responses are not available - the Ollama server is not responding."
+    except requests.exceptions.Timeout as e:
+        monitor.record_failure(e, hard=False)
         return "AI response timeout - the model is taking too long to respond. Try a simpler question."
     except requests.exceptions.RequestException as e:
-        return f"AI Error: {e}"
\ No newline at end of file
+        monitor.record_failure(e, hard=False)
+        return f"AI Error: {e}"
+    except Exception as e:
+        # Anything else (bad stream data, session errors) still settles the half-open trial
+        monitor.record_failure(e, hard=False)
+        return f"AI Error: {e}"
+    finally:
+        # Interrupted before an outcome was recorded: don't leave the trial claimed
+        monitor.end_trial()
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Conversation Context Manager
+Holds the recent conversation in memory under a token budget instead of a
+character limit. Turns live in a ring; when they exceed the budget, the
+oldest half is folded into a running summary that is generated in the
+background once the conversation goes idle, so long conversations keep
+their gist while prompts stay small.
+
+Token counts come from an estimator calibrated against the prompt_eval_count
+Ollama reports for fully evaluated prompts (Ollama exposes no tokenizer
+endpoint); it starts at ~4 characters per token.
+"""
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+# Tokens of verbatim history kept in the prompt; older turns are summarized
+TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "768") or 768)
+# Seconds without a question before the summary is generated
+IDLE_SECONDS = float(os.getenv("CONTEXT_IDLE_SECONDS", "2.0") or 2.0)
+# Longest running summary (tokens) and the ring's hard cap on turns
+SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "160") or 160)
+MAX_TURNS = int(os.getenv("CONTEXT_MAX_TURNS", "64") or 64)
+
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+Turn = Tuple[str, str]
+
+
+class TokenEstimator:
+    """chars/token ratio, refined from real token counts as they come in"""
+
+    def __init__(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN, weight: float = 0.3):
+        self.chars_per_token = chars_per_token
+        self.weight = weight
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return max(1, int(len(text) / self.chars_per_token + 0.5))
+
+    def observe(self, chars: int, tokens: int):
+        """Calibrate from a prompt of `chars` characters that the model counted as `tokens`"""
+        if chars < 200 or not tokens:
+            return  # too short to say much about the ratio
+        ratio = chars / tokens
+        if not 1.0 <= ratio <= 10.0:
+            return
+        with self._lock:
+            # First real sample replaces the default; later ones are averaged in
+            w = 1.0 if self.samples == 0 else self.weight
+            self.chars_per_token += w * (ratio - self.chars_per_token)
+            self.samples += 1
+
+
+_estimator = TokenEstimator()
+
+
+def get_token_estimator() -> TokenEstimator:
+    return _estimator
+
+
+class ConversationContext:
+    def __init__(self, budget: int = TOKEN_BUDGET, estimator: Optional[TokenEstimator] = None,
+                 summarize: Optional[Callable[[str, List[Turn]], Optional[str]]] = None,
+                 idle_seconds: float = IDLE_SECONDS, max_turns: int = MAX_TURNS):
+        self.budget = budget
+        self.estimator = estimator or get_token_estimator()
+        self.summarize = summarize       # (previous summary, turns) -> new summary or None
+        self.idle_seconds = idle_seconds
+
+        self.turns: Deque[Turn] = deque(maxlen=max(2, max_turns))
+        self.summary = ""
+        self.summarized_turns = 0        # turns folded into the summary so far
+        self.dropped_turns = 0           # turns lost without a summary (summarizer unavailable)
+
+        self._pending: Optional[Tuple[List[Turn], str]] = None   # (turns covered, new summary) ready to apply
+        self._compacting = False
+        self._busy = False
+        self._last_activity = time.time()
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Turns
+    # ------------------------------------------------------------------
+
+    def touch(self, busy: bool = False):
+        """A request is starting (busy) or just finished: postpone background work"""
+        self._busy = busy
+        self._last_activity = time.time()
+
+    def add(self, user: str, assistant: str) -> bool:
+        """Append a turn; True if the oldest turn fell off the ring (prefix changed)"""
+        with self._lock:
+            overflow = len(self.turns) == self.turns.maxlen
+            if overflow:
+                self.dropped_turns += 1
+            self.turns.append((user, assistant))
+            return overflow
+
+    def seed(self, turns: List[Turn]):
+        with self._lock:
+            self.turns.clear()
+            self.turns.extend(turns)
+            self.summary = ""
+            self._pending = None
+
+    def clear(self):
+        self.seed([])
+
+    def turn_tokens(self, turn: Turn) -> int:
+        # Role labels/template markers cost a few tokens per message
+        return self.estimator.count(turn[0]) + self.estimator.count(turn[1]) + 8
+
+    def tokens(self) -> int:
+        with self._lock:
+            return sum(self.turn_tokens(t) for t in self.turns) + self.estimator.count(self.summary)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens() > self.budget
+
+    def system_text(self, system: str) -> str:
+        """System prompt with the running summary of earlier conversation"""
+        if not self.summary:
+            return system
+        return f"{system}\n\nSummary of the earlier conversation:\n{self.summary}"
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact_later(self) -> bool:
+        """Summarize the oldest turns in the background once the conversation is idle"""
+        with self._lock:
+            if (not self.summarize or self._compacting or self._pending
+                    or not self.over_budget or len(self.turns) < 2):
+                return False
+            self._compacting = True
+        threading.Thread(target=self._compact, name="context-summary", daemon=True).start()
+        return True
+
+    def _batch(self) -> List[Turn]:
+        """Oldest turns to summarize: at least half, and enough to leave half the budget"""
+        turns = list(self.turns)
+        count = max(1, len(turns) // 2)
+        remaining = sum(self.turn_tokens(t) for t in turns[count:])
+        while count < len(turns) - 1 and remaining > self.budget // 2:
+            remaining -= self.turn_tokens(turns[count])
+            count += 1
+        return turns[:count]
+
+    def _compact(self):
+        try:
+            # Wait for a quiet moment: the summary shares the model with the next answer
+            while self._busy or time.time() - self._last_activity < self.idle_seconds:
+                time.sleep(min(0.2, self.idle_seconds))
+            # Picked now rather than when scheduled: the conversation may have grown meanwhile
+            with self._lock:
+                batch, previous = self._batch(), self.summary
+            summary = self.summarize(previous, batch) if batch else None
+            if summary:
+                with self._lock:
+                    self._pending = (batch, self._clip(summary))
+        except Exception as e:
+            print(f"⚠️ Conversation summary failed: {e}")
+        finally:
+            self._compacting = False
+
+    def _clip(self, summary: str) -> str:
+        limit = int(SUMMARY_TOKENS * self.estimator.chars_per_token)
+        summary = " ".join(summary.split())
+        return summary if len(summary) <= limit else summary[:limit].rsplit(" ", 1)[0] + "…"
+
+    def apply_pending(self) -> bool:
+        """Swap summarized turns for their summary; True if the prompt prefix changed"""
+        with self._lock:
+            changed = False
+            if self._pending:
+                batch, summary = self._pending
+                self._pending = None
+                # Some of the batch may already be gone (ceiling below): match by identity
+                covered = {id(t) for t in batch}
+                while self.turns and id(self.turns[0]) in covered:
+                    self.turns.popleft()
+                self.summary = summary
+                self.summarized_turns += len(batch)
+                changed = True
+            if self.tokens() > 2 * self.budget:
+                # Far over budget: drop the oldest turns outright. With no summary on the way go
+                # down to the budget so this doesn't repeat (and rebuild) on every turn
+                floor = 2 * self.budget if self._compacting else self.budget
+                while len(self.turns) > 2 and self.tokens() > floor:
+                    self.turns.popleft()
+                    self.dropped_turns += 1
+                changed = True
+            return changed
+
+    def wait_idle(self, timeout: float = 30.0) -> bool:
+        """Block until background summarization has finished (tests, shutdown)"""
+        deadline = time.time() + timeout
+        while self._compacting and time.time() < deadline:
+            time.sleep(0.02)
+        return not self._compacting
+
+    def stats(self):
+        return {
+            "turns": len(self.turns),
+            "tokens": self.tokens(),
+            "budget": self.budget,
+            "summary_tokens": self.estimator.count(self.summary),
+            "summarized_turns": self.summarized_turns,
+            "dropped_turns": self.dropped_turns,
+            "chars_per_token": round(self.estimator.chars_per_token, 2),
+            "summarizing": self._compacting,
+        }
+
+
+def format_summary_request(previous: str, turns: List[Turn]) -> str:
+    """Prompt asking the model to fold `turns` into the running summary"""
+    lines = [f"User: {u}\nAssistant: {a}" for u, a in turns]
+    intro = f"Current summary:\n{previous}\n\n" if previous else ""
+    return (
+        f"{intro}New conversation turns:\n" + "\n".join(lines) + "\n\n"
+        "Update the summary of this conversation in at most 4 short sentences. Keep names, facts, "
+        "preferences and open questions the assistant may need later. Reply with the summary only."
+    )
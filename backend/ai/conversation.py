@@ -0,0 +1,268 @@
+"""
+Conversation Session
+Keeps one conversation with the local LLM append-only, so the model only has
+to evaluate the tokens added since the previous turn instead of re-reading a
+rebuilt prompt every time.
+
+- The system prompt is fixed for the session; per-turn extras (mood,
+  memories) travel with the current user message only and are not kept in
+  the history, so they never eat into the token budget.
+- "chat" mode (default) sends the message list to /api/chat: the prefix is
+  byte-identical to the previous request, so Ollama's prompt cache skips it.
+- "context" mode sends only the new message to /api/generate together with
+  the `context` tokens Ollama returned last time.
+- Turns are kept under a token budget by ConversationContext: overflowing
+  turns are folded into a running summary (generated in the background while
+  the user is idle) that rides along with the system prompt.
+- Anything that invalidates the cached prefix (model swap, new system prompt,
+  folding turns into the summary, a rejected context) triggers a full rebuild.
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ai.ollama_health import OLLAMA_URL
+from ai.context_manager import (ConversationContext, TOKEN_BUDGET, SUMMARY_TOKENS,
+                                format_summary_request)
+
+SESSION_MODE = os.getenv("OLLAMA_SESSION_MODE", "chat").strip().lower()
+SUMMARY_TIMEOUT = 60
+
+DEFAULT_SYSTEM = (
+    "You are a helpful AI assistant. Give direct, informative answers. Don't ask follow-up questions "
+    "unless necessary. Be concise but complete. Use the conversation history to maintain context and "
+    "remember what was discussed."
+)
+
+
+class ContextInvalidated(Exception):
+    """Ollama rejected the cached context; the caller rebuilds from the transcript"""
+
+
+class OllamaRequestError(Exception):
+    """Ollama answered with an error (missing model, bad options): the server itself is up"""
+
+
+class ConversationSession:
+    def __init__(self, system: str = DEFAULT_SYSTEM, mode: str = SESSION_MODE,
+                 budget: int = TOKEN_BUDGET, base_url: str = OLLAMA_URL, summarize: bool = True):
+        self.system = system
+        self.mode = mode if mode in ("chat", "context") else "chat"
+        self.base_url = base_url.rstrip("/")
+
+        # (user prompt without notes, assistant reply) under a token budget, plus the running summary
+        self.history = ConversationContext(budget=budget, summarize=self._summarize if summarize else None)
+        self.context: Optional[List[int]] = None  # "context" mode: tokens of everything so far
+        self.model: Optional[str] = None          # model the cached prefix belongs to
+        self.last_model: Optional[str] = None     # model and keep_alive the summary is generated with
+        self.keep_alive: Any = None
+        self._calibrated = set()                  # models whose full prompt fed the token estimator
+        self._lock = threading.Lock()
+
+        # Stats
+        self.requests = 0
+        self.rebuilds = 0
+        self.prompt_tokens = 0           # prompt tokens Ollama actually evaluated
+        self.last_prompt_tokens = None
+        self.last_prompt_ms = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def seed(self, history: List[Tuple[str, str, Any]]):
+        """Start from stored (user, assistant, timestamp) rows, oldest first"""
+        with self._lock:
+            self.history.seed([(u, (a or "").replace(" (cached)", "")) for u, a, *_ in history if u and a])
+            self._invalidate()
+        # Stored history beyond the budget is summarized before it costs prompt tokens
+        self.history.compact_later()
+
+    def set_system(self, system: str):
+        with self._lock:
+            if system != self.system:
+                self.system = system
+                self._invalidate()
+
+    def reset(self):
+        with self._lock:
+            self.history.clear()
+            self._invalidate()
+
+    def _invalidate(self):
+        self.context = None
+        self.model = None
+
+    @property
+    def turns(self) -> List[Tuple[str, str]]:
+        return list(self.history.turns)
+
+    @property
+    def system_text(self) -> str:
+        return self.history.system_text(self.system)
+
+    @staticmethod
+    def user_message(prompt: str, notes: Optional[str] = None) -> str:
+        notes = (notes or "").strip()
+        return f"[{notes}]\n{prompt}" if notes else prompt
+
+    def messages(self, user: str) -> List[Dict[str, str]]:
+        msgs = [{"role": "system", "content": self.system_text}]
+        for u, a in self.turns:
+            msgs.append({"role": "user", "content": u})
+            msgs.append({"role": "assistant", "content": a})
+        msgs.append({"role": "user", "content": user})
+        return msgs
+
+    def transcript(self, user: str) -> str:
+        """Whole conversation as one prompt (context-mode rebuild)"""
+        parts = [f"User: {u}\nAssistant: {a}" for u, a in self.turns]
+        parts.append(f"User: {user}\nAssistant:")
+        return "\n\n".join(parts)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def ask(self, prompt: str, *, model: str, notes: Optional[str] = None, options: Optional[Dict] = None,
+            keep_alive: Any = None, timeout: float = 12, on_token: Optional[Callable[[str], None]] = None,
+            ) -> Tuple[str, Dict[str, Any]]:
+        """Send one turn; returns (answer, final Ollama chunk with timings)"""
+        user = self.user_message(prompt, notes)
+        self.history.touch(busy=True)
+        try:
+            with self._lock:
+                if self.model is not None and self.model != model:
+                    self._invalidate()  # the cached prefix belongs to another model
+                if self.history.apply_pending():
+                    self._invalidate()  # summarized turns left the prompt: one rebuild per compaction
+                rebuilding = self.model is None and bool(self.turns)
+                prompt_chars = sum(len(m["content"]) for m in self.messages(user))
+                calibrate = model not in self._calibrated
+                self.last_model, self.keep_alive = model, keep_alive
+                if self.mode == "context":
+                    try:
+                        answer, final = self._generate(user, model, options, keep_alive, timeout, on_token)
+                    except ContextInvalidated:
+                        self._invalidate()
+                        rebuilding = True
+                        answer, final = self._generate(user, model, options, keep_alive, timeout, on_token)
+                else:
+                    answer, final = self._chat(user, model, options, keep_alive, timeout, on_token)
+
+                self.requests += 1
+                self.rebuilds += int(rebuilding)
+                self.model = model
+                if final.get("prompt_eval_count") is not None:
+                    self.last_prompt_tokens = final["prompt_eval_count"]
+                    self.prompt_tokens += final["prompt_eval_count"]
+                    if calibrate:
+                        # The model's first prompt is evaluated in full: a real chars/token sample
+                        self._calibrated.add(model)
+                        self.history.estimator.observe(prompt_chars, final["prompt_eval_count"])
+                if final.get("prompt_eval_duration") is not None:
+                    self.last_prompt_ms = round(final["prompt_eval_duration"] / 1e6, 1)
+                if answer and not final.get("truncated"):
+                    if self.history.add(prompt, answer):
+                        self._invalidate()
+                elif self.mode == "context":
+                    self._invalidate()  # a partial answer never becomes part of the cached context
+        finally:
+            self.history.touch()
+        self.history.compact_later()
+        return answer, final
+
+    def _stream(self, endpoint: str, payload: Dict, timeout: float, on_token, extract) -> Tuple[str, Dict]:
+        response = requests.post(f"{self.base_url}{endpoint}", json=payload, stream=True, timeout=timeout)
+        if response.status_code >= 400:
+            if self.mode == "context" and payload.get("context"):
+                raise ContextInvalidated(response.text[:200])
+            try:
+                error = response.json().get("error")
+            except ValueError:
+                error = None
+            raise OllamaRequestError(error or f"HTTP {response.status_code} from {endpoint}")
+        result, final = "", {}
+        start = time.time()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get("error"):
+                if payload.get("context"):
+                    raise ContextInvalidated(data["error"])
+                raise OllamaRequestError(data["error"])
+            chunk = extract(data)
+            result += chunk
+            if on_token and chunk:
+                try:
+                    on_token(chunk)
+                except Exception:
+                    pass
+            if data.get("done"):
+                final = data
+                break
+            if time.time() - start > timeout:
+                final = {"truncated": True}
+                result += " [Response truncated for speed]"
+                break
+        return result.strip(), final
+
+    def _chat(self, user, model, options, keep_alive, timeout, on_token):
+        payload = {"model": model, "messages": self.messages(user), "stream": True, "options": options or {}}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return self._stream("/api/chat", payload, timeout, on_token,
+                            lambda d: (d.get("message") or {}).get("content", ""))
+
+    def _generate(self, user, model, options, keep_alive, timeout, on_token):
+        payload = {"model": model, "stream": True, "options": options or {}}
+        if self.context:
+            payload["context"] = self.context
+            payload["prompt"] = user
+        else:
+            # First turn or rebuild: the whole transcript once, under the session's system prompt
+            payload["system"] = self.system_text
+            payload["prompt"] = self.transcript(user) if self.turns else user
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        answer, final = self._stream("/api/generate", payload, timeout, on_token, lambda d: d.get("response", ""))
+        if final.get("context"):
+            self.context = final["context"]
+        return answer, final
+
+    def _summarize(self, previous: str, turns: List[Tuple[str, str]]) -> Optional[str]:
+        """Fold `turns` into the running summary with the session's model (background thread)"""
+        if not self.last_model:
+            return None
+        payload = {"model": self.last_model, "prompt": format_summary_request(previous, turns), "stream": False,
+                   "options": {"num_predict": SUMMARY_TOKENS, "temperature": 0.2}}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        try:
+            response = requests.post(f"{self.base_url}/api/generate", json=payload, timeout=SUMMARY_TIMEOUT)
+            response.raise_for_status()
+            return (response.json().get("response") or "").strip() or None
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        history = self.history.stats()
+        return {
+            "mode": self.mode,
+            "turns": len(self.turns),
+            "history_tokens": history["tokens"],
+            "token_budget": history["budget"],
+            "summarized_turns": history["summarized_turns"],
+            "chars_per_token": history["chars_per_token"],
+            "requests": self.requests,
+            "rebuilds": self.rebuilds,
+            "prompt_tokens_evaluated": self.prompt_tokens,
+            "last_prompt_tokens": self.last_prompt_tokens,
+            "last_prompt_ms": self.last_prompt_ms,
+            "context_tokens": len(self.context) if self.context else 0,
+        }
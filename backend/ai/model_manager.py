@@ -0,0 +1,298 @@
+"""
+Local LLM Model Manager
+Keeps the Ollama model warm: preloads it at startup with an empty generate
+call, sets keep_alive on every request according to policy, and reacts to
+memory pressure (sampled by the MetricsSampler via psutil) by swapping to a
+smaller fallback model or unloading entirely, reloading once memory frees up.
+Load times reported by Ollama (load_duration) are kept as metrics so cold
+starts are visible.
+
+Policy (env):
+    OLLAMA_MODEL            model answered with (default llama3.2:1b)
+    OLLAMA_FALLBACK_MODEL   smaller model used under memory pressure (optional)
+    OLLAMA_KEEP_ALIVE       how long Ollama keeps the model loaded (default -1: until unloaded here)
+    OLLAMA_PRESSURE_KEEP_ALIVE  keep_alive while memory is tight (default 2m)
+    OLLAMA_SWAP_PERCENT / OLLAMA_UNLOAD_PERCENT   memory use (%) that triggers swap / unload
+    OLLAMA_RELOAD_AFTER     seconds memory must stay low before a bigger model is loaded again
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+import requests
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+from ai.ollama_health import OLLAMA_URL
+
+DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+FALLBACK_MODEL = os.getenv("OLLAMA_FALLBACK_MODEL", "").strip() or None
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "-1")
+PRESSURE_KEEP_ALIVE = os.getenv("OLLAMA_PRESSURE_KEEP_ALIVE", "2m")
+# keep_alive restored on exit so the model doesn't stay resident after the assistant closes
+EXIT_KEEP_ALIVE = os.getenv("OLLAMA_EXIT_KEEP_ALIVE", "5m")
+PRELOAD = os.getenv("OLLAMA_PRELOAD", "1") == "1"
+
+SWAP_PERCENT = float(os.getenv("OLLAMA_SWAP_PERCENT", "85") or 85)
+UNLOAD_PERCENT = float(os.getenv("OLLAMA_UNLOAD_PERCENT", "92") or 92)
+# Memory, counting the model about to be loaded, must stay this far below SWAP_PERCENT to reload it
+HYSTERESIS = 5.0
+# Minimum time in a low-memory mode before stepping back up (the model's own size is only known once loaded)
+RELOAD_AFTER = float(os.getenv("OLLAMA_RELOAD_AFTER", "60") or 60)
+MEMORY_CHECK_INTERVAL = 5.0
+LOAD_TIMEOUT = 120
+
+# A load_duration above this counts as a cold start (model read from disk)
+COLD_LOAD_SECONDS = 0.5
+
+PRIMARY, FALLBACK, UNLOADED = "primary", "fallback", "unloaded"
+
+
+class ModelManager:
+    def __init__(self, model: str = DEFAULT_MODEL, fallback: Optional[str] = FALLBACK_MODEL,
+                 keep_alive: str = KEEP_ALIVE, base_url: str = OLLAMA_URL,
+                 swap_percent: float = SWAP_PERCENT, unload_percent: float = UNLOAD_PERCENT):
+        self.model = model
+        self.fallback = fallback if fallback and fallback != model else None
+        self.keep_alive = keep_alive
+        self.base_url = base_url.rstrip("/")
+        self.swap_percent = swap_percent
+        self.unload_percent = unload_percent
+
+        self.mode = PRIMARY
+        self.reload_after = RELOAD_AFTER
+        self._mode_since = time.monotonic()
+        self.model_sizes: Dict[str, int] = {}   # bytes resident per model, from /api/ps
+        self.memory_percent: Optional[float] = None
+        self._last_memory_check = 0.0
+        self._switching = False
+        self._lock = threading.RLock()
+        self._sampler = None
+
+        # Metrics
+        self.loads: List[Dict[str, Any]] = []   # recent loads: model, seconds, source, at
+        self.requests = 0
+        self.cold_starts = 0
+        self.unloads = 0
+        self.swaps = 0
+
+    # ------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------
+
+    @property
+    def under_pressure(self) -> bool:
+        return self.mode != PRIMARY
+
+    def active_model(self) -> str:
+        """Model requests should use right now"""
+        if self.mode == FALLBACK and self.fallback:
+            return self.fallback
+        return self.model
+
+    def keep_alive_for(self, model: Optional[str] = None) -> str:
+        """keep_alive to send with a request: short while memory is tight"""
+        return PRESSURE_KEEP_ALIVE if self.under_pressure else self.keep_alive
+
+    # ------------------------------------------------------------------
+    # Ollama calls
+    # ------------------------------------------------------------------
+
+    def _generate(self, model: str, keep_alive: Any, timeout: float = LOAD_TIMEOUT) -> Dict[str, Any]:
+        # An empty prompt only loads (or, with keep_alive 0, unloads) the model
+        response = requests.post(f"{self.base_url}/api/generate",
+                                 json={"model": model, "prompt": "", "keep_alive": keep_alive, "stream": False},
+                                 timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def preload(self, model: Optional[str] = None, source: str = "preload") -> Dict[str, Any]:
+        """Load `model` (default: the active one) into memory ahead of the first question"""
+        model = model or self.active_model()
+        t0 = time.perf_counter()
+        try:
+            data = self._generate(model, self.keep_alive_for(model))
+        except Exception as e:
+            return {"success": False, "model": model, "message": f"Preloading {model} failed: {e}"}
+        seconds = time.perf_counter() - t0
+        load = (data.get("load_duration") or 0) / 1e9
+        self._record_load(model, load or seconds, source)
+        self._refresh_sizes()
+        return {"success": True, "model": model, "seconds": round(seconds, 3), "load_seconds": round(load, 3),
+                "message": f"{model} ready in {seconds:.1f}s"}
+
+    def _refresh_sizes(self):
+        """Remember how much memory each resident model takes (used to decide when it fits again)"""
+        try:
+            response = requests.get(f"{self.base_url}/api/ps", timeout=2)
+            if response.ok:
+                for m in response.json().get("models") or []:
+                    name = m.get("name") or m.get("model")
+                    if name and m.get("size"):
+                        self.model_sizes[name] = int(m["size"])
+        except Exception:
+            pass
+
+    def model_share(self, model: Optional[str]) -> float:
+        """Percent of system memory `model` takes when loaded (0 if unknown)"""
+        size = self.model_sizes.get(model) if model else None
+        if not size or not PSUTIL_AVAILABLE:
+            return 0.0
+        try:
+            return size * 100.0 / psutil.virtual_memory().total
+        except Exception:
+            return 0.0
+
+    def unload(self, model: Optional[str] = None) -> Dict[str, Any]:
+        model = model or self.active_model()
+        try:
+            self._generate(model, 0, timeout=30)
+        except Exception as e:
+            return {"success": False, "model": model, "message": f"Unloading {model} failed: {e}"}
+        with self._lock:
+            self.unloads += 1
+        return {"success": True, "model": model, "message": f"{model} unloaded"}
+
+    def release(self):
+        """On exit: hand the model back to Ollama's normal expiry instead of keeping it forever"""
+        if self.keep_alive in ("-1", -1):
+            try:
+                self._generate(self.active_model(), EXIT_KEEP_ALIVE, timeout=5)
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record_load(self, model: str, seconds: float, source: str):
+        with self._lock:
+            self.loads.append({"model": model, "seconds": round(seconds, 3), "source": source, "at": time.time()})
+            del self.loads[:-20]
+            if seconds >= COLD_LOAD_SECONDS:
+                self.cold_starts += 1
+
+    def record_generation(self, model: str, final: Dict[str, Any]):
+        """Feed the last streamed chunk of a generate call (it carries the timings)"""
+        with self._lock:
+            self.requests += 1
+        load = (final.get("load_duration") or 0) / 1e9
+        if load >= COLD_LOAD_SECONDS:
+            # The model had been unloaded: this answer paid for loading it
+            self._record_load(model, load, "request")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            loads = list(self.loads)
+            return {
+                "model": self.model,
+                "active_model": self.active_model(),
+                "mode": self.mode,
+                "keep_alive": self.keep_alive_for(),
+                "memory_percent": self.memory_percent,
+                "requests": self.requests,
+                "cold_starts": self.cold_starts,
+                "unloads": self.unloads,
+                "swaps": self.swaps,
+                "last_load": loads[-1] if loads else None,
+                "mean_load_seconds": round(sum(l["seconds"] for l in loads) / len(loads), 3) if loads else None,
+            }
+
+    # ------------------------------------------------------------------
+    # Memory pressure
+    # ------------------------------------------------------------------
+
+    def attach(self, sampler) -> "ModelManager":
+        """Follow memory use from a MetricsSampler"""
+        self._sampler = sampler
+        sampler.add_listener(self._on_sample)
+        return self
+
+    def detach(self):
+        if self._sampler is not None:
+            self._sampler.remove_listener(self._on_sample)
+            self._sampler = None
+
+    def _on_sample(self, sample: Dict[str, Any]):
+        now = time.time()
+        if now - self._last_memory_check < MEMORY_CHECK_INTERVAL:
+            return
+        self._last_memory_check = now
+        percent = sample.get("mem_percent")
+        if percent is None or percent != percent:  # NaN
+            return
+        target = self.target_mode(percent)
+        if target != self.mode and not self._switching:
+            # Loading and unloading take seconds: never on the sampler thread
+            self._switching = True
+            threading.Thread(target=self.switch_mode, args=(target,), daemon=True).start()
+
+    def target_mode(self, percent: float) -> str:
+        """Mode memory use calls for, with hysteresis before returning to the primary model.
+
+        Memory use includes the resident model, so unloading it frees its own
+        share: stepping back up only happens once use *plus* the model to load
+        stays below the band, and not before `reload_after` seconds in the
+        low-memory mode. Otherwise it would unload and reload in a loop.
+        """
+        self.memory_percent = percent
+        if percent >= self.unload_percent:
+            return UNLOADED
+        current = None if self.mode == UNLOADED else self.active_model()
+        settled = time.monotonic() - self._mode_since >= self.reload_after
+        if percent >= self.swap_percent:
+            if self.mode == UNLOADED:
+                if (self.fallback and settled
+                        and percent + self.model_share(self.fallback) < self.unload_percent):
+                    return FALLBACK
+                return UNLOADED
+            return FALLBACK if self.fallback else PRIMARY
+        if self.mode == PRIMARY:
+            return PRIMARY
+        if not settled:
+            return self.mode
+        limit = self.swap_percent - HYSTERESIS
+        if percent - self.model_share(current) + self.model_share(self.model) <= limit:
+            return PRIMARY
+        if (self.mode == UNLOADED and self.fallback
+                and percent + self.model_share(self.fallback) <= limit):
+            return FALLBACK
+        return self.mode
+
+    def switch_mode(self, target: str) -> Dict[str, Any]:
+        """Unload what is resident now and load what `target` needs"""
+        try:
+            with self._lock:
+                current = None if self.mode == UNLOADED else self.active_model()
+                if target != self.mode:
+                    self._mode_since = time.monotonic()
+                self.mode = target
+                wanted = None if target == UNLOADED else self.active_model()
+                if target == FALLBACK:
+                    self.swaps += 1
+            if current and current != wanted:
+                self.unload(current)
+            if wanted and wanted != current:
+                return self.preload(wanted, source="memory" if target == FALLBACK else "reload")
+            return {"success": True, "model": wanted, "message": f"Model mode: {target}"}
+        finally:
+            self._switching = False
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager() -> ModelManager:
+    """Get or create the shared model manager"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager()
+        return _manager
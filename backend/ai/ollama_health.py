@@ -0,0 +1,273 @@
+"""
+Ollama Health Monitor
+A background thread polls the Ollama server (/api/tags, /api/ps) and keeps a
+circuit breaker, so ask_ai fails fast while the server is down instead of
+waiting out its timeout on every turn, and AI answers come back on their own
+once the server returns.
+
+Breaker states:
+    closed     server healthy, requests go through
+    open       server failing, requests fail immediately until the next probe
+    half_open  one trial (a probe or a real request) decides whether to close again
+"""
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434").rstrip("/")
+
+# Poll period while healthy, and the backoff range while failing (seconds)
+HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15") or 15)
+BACKOFF_MIN = float(os.getenv("OLLAMA_BACKOFF_MIN", "1") or 1)
+BACKOFF_MAX = float(os.getenv("OLLAMA_BACKOFF_MAX", "30") or 30)
+PROBE_TIMEOUT = 2.0
+
+# Request failures (timeouts) in a row that open the breaker; refused connections open it at once
+FAILURE_THRESHOLD = 2
+# A half-open trial whose outcome is never recorded expires after this many seconds
+TRIAL_TIMEOUT = 30.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class OllamaHealthMonitor:
+    def __init__(self, base_url: str = OLLAMA_URL, interval: float = HEALTH_INTERVAL,
+                 backoff_min: float = BACKOFF_MIN, backoff_max: float = BACKOFF_MAX):
+        self.base_url = base_url.rstrip("/")
+        self.interval = interval
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+
+        self.state = HALF_OPEN       # unknown until the first probe
+        self.failures = 0            # consecutive failures
+        self.backoff = backoff_min
+        self.next_probe = 0.0        # monotonic time the breaker may be tried again
+        self.last_error: Optional[str] = None
+        self.last_check = 0.0
+        self.last_ok = 0.0
+        self.latency = None          # seconds for the last successful probe
+        self.models: List[str] = []          # installed
+        self.loaded_models: List[Dict[str, Any]] = []  # in memory (/api/ps)
+
+        self._trial = False          # a half-open trial is in flight
+        self._trial_started = 0.0
+        self._lock = threading.RLock()  # listeners may read the monitor
+        self._checked = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "OllamaHealthMonitor":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ollama-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """callback(old_state, new_state) on every breaker transition"""
+        self._listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # Breaker
+    # ------------------------------------------------------------------
+
+    @property
+    def available(self) -> bool:
+        return self.state == CLOSED
+
+    def allow_request(self) -> bool:
+        """Whether a request may go to Ollama now (claims the half-open trial when due)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self._trial and now - self._trial_started < TRIAL_TIMEOUT:
+                return False
+            if now < self.next_probe:
+                return False
+            self._set_state(HALF_OPEN)
+            self._trial = True
+            self._trial_started = now
+            return True
+
+    def end_trial(self):
+        """Give up a claimed trial without an outcome (the caller failed before reaching Ollama)"""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self, latency: Optional[float] = None):
+        with self._lock:
+            self._trial = False
+            self.failures = 0
+            self.backoff = self.backoff_min
+            self.last_ok = time.time()
+            self.last_error = None
+            if latency is not None:
+                self.latency = latency
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: Any, hard: bool = True):
+        """A failed call; `hard` failures (refused connection) open the breaker at once"""
+        with self._lock:
+            self._trial = False
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == CLOSED and not hard and self.failures < FAILURE_THRESHOLD:
+                return
+            # Exponential backoff over consecutive failures
+            self.backoff = min(self.backoff_min * 2 ** (self.failures - 1), self.backoff_max)
+            self.next_probe = time.monotonic() + self.backoff
+            self._set_state(OPEN)
+        self._wake.set()
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will be tried again (0 when closed)"""
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self.next_probe - time.monotonic())
+
+    def _set_state(self, state: str):
+        # Called with the lock held
+        old, self.state = self.state, state
+        if old != state:
+            for callback in list(self._listeners):
+                try:
+                    callback(old, state)
+                except Exception:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    def check_now(self, timeout: float = PROBE_TIMEOUT) -> bool:
+        """Probe the server once (blocking) and update the breaker"""
+        t0 = time.perf_counter()
+        try:
+            response = requests.get(f"{self.base_url}/api/tags", timeout=timeout)
+            response.raise_for_status()
+            tags = response.json().get("models") or []
+        except Exception as e:
+            self.record_failure(e)
+            ok = False
+        else:
+            latency = time.perf_counter() - t0
+            self.models = [m.get("name") or m.get("model") for m in tags]
+            self._refresh_loaded(timeout)
+            self.record_success(latency)
+            ok = True
+        with self._lock:
+            self.last_check = time.time()
+            self._checked.notify_all()
+        return ok
+
+    def _refresh_loaded(self, timeout: float):
+        try:
+            response = requests.get(f"{self.base_url}/api/ps", timeout=timeout)
+            if response.ok:
+                self.loaded_models = [
+                    {"name": m.get("name") or m.get("model"), "size": m.get("size"),
+                     "size_vram": m.get("size_vram"), "expires_at": m.get("expires_at")}
+                    for m in response.json().get("models") or []
+                ]
+        except Exception:
+            pass  # older servers have no /api/ps; tags alone mean healthy
+
+    def wait_until_available(self, timeout: float = 10.0) -> bool:
+        """Block until the breaker closes or `timeout` passes (starts the monitor)"""
+        self.start()
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self.state != CLOSED:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._checked.wait(remaining)
+            return True
+
+    def wait_checked(self, timeout: float = PROBE_TIMEOUT + 0.5) -> bool:
+        """Block until the first probe has finished (state known); True if available"""
+        self.start()
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while not self.last_check:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._checked.wait(remaining)
+            return self.state == CLOSED
+
+    def wake(self):
+        """Probe as soon as possible (e.g. after the user starts Ollama)"""
+        with self._lock:
+            if self.state != CLOSED:
+                self.next_probe = 0.0
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                if self.state == CLOSED:
+                    delay = max(0.0, self.last_check + self.interval - time.time())
+                else:
+                    delay = max(0.0, self.next_probe - time.monotonic())
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue
+            if self.allow_request() or self.state == CLOSED:
+                self.check_now()
+            else:
+                # A real request holds the half-open trial; look again shortly
+                self._wake.wait(self.backoff_min)
+                self._wake.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "available": self.available,
+            "url": self.base_url,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+            "last_ok": self.last_ok or None,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "models": list(self.models),
+            "loaded_models": list(self.loaded_models),
+        }
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_ollama_monitor(start: bool = True) -> OllamaHealthMonitor:
+    """Get or create the shared monitor (started on first use)"""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = OllamaHealthMonitor()
+        if start and not _monitor.running:
+            _monitor.start()
+        return _monitor
@@ -105,6 +105,43 @@ def save_conversation(db, user_input, assistant_response):
         cursor.close()
 
 
+def get_conversation_page(before_id=None, after_id=None, limit=50):
+    """One page of conversations, oldest first (keyset pagination on id).
+
+    - no ids: the newest `limit` conversations
+    - before_id: the `limit` conversations just older than that id
+    - after_id: the `limit` conversations just newer than that id
+    """
+    db = get_db_connection()
+    if not db:
+        return []
+    cursor = db.cursor(dictionary=True)
+    try:
+        if after_id is not None:
+            cursor.execute(
+                "SELECT id, user_input, assistant_response, timestamp FROM conversations "
+                "WHERE id > %s ORDER BY id ASC LIMIT %s",
+                (after_id, limit),
+            )
+            return cursor.fetchall()
+        if before_id is not None:
+            cursor.execute(
+                "SELECT id, user_input, assistant_response, timestamp FROM conversations "
+                "WHERE id < %s ORDER BY id DESC LIMIT %s",
+                (before_id, limit),
+            )
+        else:
+            cursor.execute(
+                "SELECT id, user_input, assistant_response, timestamp FROM conversations "
+                "ORDER BY id DESC LIMIT %s",
+                (limit,),
+            )
+        return list(reversed(cursor.fetchall()))
+    finally:
+        cursor.close()
+        db.close()
+
+
 # 🔹 DELETED TASKS (for history)
 def get_deleted_tasks():
     db = get_db_connection()
@@ -2,14 +2,32 @@
 Modern GUI Panel for Offline Assistant
 Shows visual feedback while CLI runs in background
 """
+import os
 import tkinter as tk
 from tkinter import ttk
 import threading
 import time
 from datetime import datetime
 
+from .feed import get_gui_feed
+from .history_view import HistoryPanel
+
+# Redraw period: updates posted in between are coalesced into one redraw
+FRAME_MS = int(os.getenv("GUI_FRAME_MS", "50") or 50)
+
+# Response scrollback: past this many lines the oldest TRIM_LINES are dropped at once
+SCROLLBACK_LINES = int(os.getenv("GUI_SCROLLBACK_LINES", "2000") or 2000)
+TRIM_LINES = max(1, SCROLLBACK_LINES // 4)
+
 class AssistantGUI:
-    def __init__(self):
+    def __init__(self, feed=None, frame_ms: int = FRAME_MS, history_loader=None,
+                 scrollback_lines: int = SCROLLBACK_LINES):
+        self.feed = feed or get_gui_feed()
+        self.frame_ms = frame_ms
+        self.history_loader = history_loader  # loader(before_id=, after_id=, limit=) -> rows, oldest first
+        self.scrollback_lines = scrollback_lines
+        self.history_panel = None
+        self._shown = {}  # last rendered label values, to skip no-op reconfigures
         self.root = None
         self.status_label = None
         self.response_text = None
@@ -24,6 +42,7 @@ class AssistantGUI:
         """Start GUI in separate thread"""
         if not self.running:
             self.running = True
+            self.feed.active = True
             self.gui_thread = threading.Thread(target=self._run_gui, daemon=True)
             self.gui_thread.start()
             time.sleep(0.5)  # Wait for GUI to initialize
@@ -90,13 +109,26 @@ class AssistantGUI:
         response_frame = tk.Frame(self.root, bg='#1a1a1a')
         response_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
+        response_header = tk.Frame(response_frame, bg='#1a1a1a')
+        response_header.pack(fill='x', padx=10, pady=(10, 5))
+
         tk.Label(
-            response_frame,
+            response_header,
             text="Response:",
             font=('Arial', 10, 'bold'),
             fg='#888888',
             bg='#1a1a1a'
-        ).pack(anchor='w', padx=10, pady=(10, 5))
+        ).pack(side='left')
+
+        tk.Button(
+            response_header,
+            text="History",
+            font=('Arial', 9),
+            fg='#ffffff',
+            bg='#2a2a2a',
+            relief='flat',
+            command=self.show_history
+        ).pack(side='right')
         
         # Scrollable text area for responses
         text_container = tk.Frame(response_frame, bg='#1a1a1a')
@@ -119,6 +151,13 @@ class AssistantGUI:
         )
         self.response_text.pack(side='left', fill='both', expand=True)
         scrollbar.config(command=self.response_text.yview)
+
+        # Tags are configured once; updates only reference them
+        self.response_text.tag_config('timestamp', foreground='#888888')
+        self.response_text.tag_config('status_ok', foreground='#00ff88', font=('Arial', 12, 'bold'))
+        self.response_text.tag_config('status_fail', foreground='#ff4444', font=('Arial', 12, 'bold'))
+        self.response_text.tag_config('response', foreground='#ffffff')
+        self.response_text.config(state='disabled')
         
         # System Stats Section
         stats_frame = tk.Frame(self.root, bg='#1a1a1a')
@@ -234,10 +273,14 @@ class AssistantGUI:
         
         # Update time periodically
         self._update_time()
+
+        # Apply posted updates once per frame
+        self._pump()
         
         # Start GUI loop
         self.root.mainloop()
         self.running = False
+        self.feed.active = False
         
     def _get_time(self):
         """Get current time string"""
@@ -249,76 +292,151 @@ class AssistantGUI:
             self.time_label.config(text=self._get_time())
             self.root.after(1000, self._update_time)
             
+    # ------------------------------------------------------------------
+    # Frame pump (Tk thread only)
+    # ------------------------------------------------------------------
+
+    def _pump(self):
+        """Drain the feed and redraw what changed; reschedules itself every frame"""
+        if not self.running:
+            return
+        try:
+            state, events = self.feed.drain()
+            if state:
+                self._apply_state(state)
+            if events:
+                self._apply_response(events)
+            if self.history_panel is not None:
+                if self.history_panel.closed:
+                    self.history_panel = None
+                else:
+                    self.history_panel.poll()
+        except Exception as e:
+            print(f"GUI update error: {e}")
+        self.root.after(self.frame_ms, self._pump)
+
+    def _set_label(self, key, widget, **options):
+        if widget is not None and self._shown.get(key) != options:
+            widget.config(**options)
+            self._shown[key] = options
+
+    def _apply_state(self, state):
+        if "command" in state:
+            self._set_label('command', self.command_label, text=f"▶ {state['command']}")
+        if "status" in state:
+            status, color = state["status"]
+            self._set_label('status', self.status_label, text=f"● {status}", fg=color)
+        stats = state.get("stats") or {}
+        if "cpu" in stats and self.cpu_bar:
+            if self._shown.get('cpu') != stats["cpu"]:
+                self.cpu_bar['value'] = stats["cpu"]
+                self.cpu_label.config(text=f"{stats['cpu']}%")
+                self._shown['cpu'] = stats["cpu"]
+        if "memory" in stats and self.memory_bar:
+            if self._shown.get('memory') != stats["memory"]:
+                self.memory_bar['value'] = stats["memory"]
+                self.memory_label.config(text=f"{stats['memory']}%")
+                self._shown['memory'] = stats["memory"]
+        if "battery" in stats:
+            self._set_label('battery', self.battery_label, text=stats["battery"])
+
+    def _apply_response(self, events):
+        """Append-only: each response is added after the previous ones, tokens at the end"""
+        text = self.response_text
+        if text is None:
+            return
+        # Follow new output only if the user hasn't scrolled up to read older text
+        at_bottom = text.yview()[1] >= 0.999
+        text.config(state='normal')
+        for op, value in events:
+            if op == "begin":
+                if text.compare('end-1c', '!=', '1.0'):
+                    text.insert('end', "\n")
+                text.insert('end', f"[{datetime.now().strftime('%H:%M:%S')}] ", 'timestamp')
+                text.mark_set('status_start', 'end-1c')
+                text.mark_gravity('status_start', 'left')
+                text.insert('end', f"{'✓' if value else '✗'} ", 'status_ok' if value else 'status_fail')
+            elif op == "text":
+                text.insert('end', value, 'response')
+            elif op == "end":
+                if not value and 'status_start' in text.mark_names():
+                    # Outcome known only at the end of a stream: fix up the glyph
+                    text.delete('status_start', 'status_start + 2c')
+                    text.insert('status_start', "✗ ", 'status_fail')
+                text.insert('end', "\n")
+        self._trim_scrollback(text)
+        text.config(state='disabled')
+        if at_bottom:
+            text.see('end')
+
+    def _trim_scrollback(self, text):
+        """Drop the oldest lines in one chunk once the buffer passes the limit"""
+        lines = int(text.index('end-1c').split('.')[0])
+        if lines > self.scrollback_lines:
+            cut = lines - self.scrollback_lines + TRIM_LINES
+            text.delete('1.0', f"{cut + 1}.0")
+
+    def show_history(self):
+        """Open the paged conversation history window (Tk thread)"""
+        if self.history_loader is None:
+            self.feed.post_status("NO HISTORY SOURCE", '#ffaa00')
+            return
+        if self.history_panel is not None and not self.history_panel.closed:
+            self.history_panel.window.lift()
+            return
+        self.history_panel = HistoryPanel(self.root, self.history_loader)
+
+    # ------------------------------------------------------------------
+    # Public update API (any thread): posts to the feed, never touches Tk
+    # ------------------------------------------------------------------
+
     def update_command(self, command):
         """Update the current command display"""
-        if self.running and self.command_label:
-            self.root.after(0, lambda: self.command_label.config(text=f"▶ {command}"))
+        self.feed.post_command(command)
             
     def update_response(self, response, success=True):
         """Update the response text area"""
-        if self.running and self.response_text:
-            def _update():
-                self.response_text.config(state='normal')
-                self.response_text.delete('1.0', 'end')
-                
-                # Add timestamp
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                color = '#00ff88' if success else '#ff4444'
-                
-                self.response_text.insert('end', f"[{timestamp}] ", 'timestamp')
-                self.response_text.insert('end', f"{'✓' if success else '✗'} ", 'status')
-                self.response_text.insert('end', f"{response}\n", 'response')
-                
-                # Apply tags for colors
-                self.response_text.tag_config('timestamp', foreground='#888888')
-                self.response_text.tag_config('status', foreground=color, font=('Arial', 12, 'bold'))
-                self.response_text.tag_config('response', foreground='#ffffff')
-                
-                self.response_text.config(state='disabled')
-                self.response_text.see('end')
-                
-            self.root.after(0, _update)
+        self.feed.post_response(response, success)
+
+    def begin_response(self, success=True):
+        """Start a streamed response; follow with append_response() and end_response()"""
+        self.feed.begin_response(success)
+
+    def append_response(self, chunk):
+        self.feed.append_response(chunk)
+
+    def end_response(self, success=True):
+        self.feed.end_response(success)
             
     def update_status(self, status, color='#00ff88'):
         """Update the status indicator"""
-        if self.running and self.status_label:
-            self.root.after(0, lambda: self.status_label.config(text=f"● {status}", fg=color))
+        self.feed.post_status(status, color)
             
     def update_system_stats(self, cpu=None, memory=None, battery=None):
         """Update system statistics"""
-        if self.running:
-            def _update():
-                if cpu is not None and self.cpu_bar:
-                    self.cpu_bar['value'] = cpu
-                    self.cpu_label.config(text=f"{cpu}%")
-                    
-                if memory is not None and self.memory_bar:
-                    self.memory_bar['value'] = memory
-                    self.memory_label.config(text=f"{memory}%")
-                    
-                if battery is not None and self.battery_label:
-                    self.battery_label.config(text=battery)
-                    
-            self.root.after(0, _update)
+        self.feed.post_stats(cpu, memory, battery)
+
+    def attach_sampler(self, sampler):
+        """Drive the stats panel from the background metrics sampler"""
+        self.feed.attach_sampler(sampler)
             
     def show_processing(self):
         """Show processing animation"""
-        if self.running and self.status_label:
-            self.root.after(0, lambda: self.status_label.config(text="● PROCESSING...", fg='#ffaa00'))
+        self.feed.post_status("PROCESSING...", '#ffaa00')
             
     def show_listening(self):
         """Show listening status"""
-        if self.running and self.status_label:
-            self.root.after(0, lambda: self.status_label.config(text="● LISTENING...", fg='#00aaff'))
+        self.feed.post_status("LISTENING...", '#00aaff')
             
     def show_idle(self):
         """Show idle status"""
-        if self.running and self.status_label:
-            self.root.after(0, lambda: self.status_label.config(text="● READY", fg='#00ff88'))
+        self.feed.post_status("READY", '#00ff88')
             
     def stop(self):
         """Stop the GUI"""
         if self.running and self.root:
+            self.feed.active = False
+            self.feed.detach_sampler()
             self.root.after(0, self.root.quit)
             self.running = False
 
@@ -332,9 +450,11 @@ def get_gui():
         _gui_instance = AssistantGUI()
     return _gui_instance
 
-def start_gui():
-    """Start the GUI"""
+def start_gui(history_loader=None):
+    """Start the GUI (`history_loader` feeds the paged history window)"""
     gui = get_gui()
+    if history_loader is not None:
+        gui.history_loader = history_loader
     gui.start()
     return gui
 
@@ -379,3 +499,27 @@ def show_idle():
     gui = get_gui()
     if gui.running:
         gui.show_idle()
+
+def begin_response(success=True):
+    """Start a streamed response"""
+    gui = get_gui()
+    if gui.running:
+        gui.begin_response(success)
+
+def append_response(chunk):
+    """Append a streamed chunk to the current response"""
+    gui = get_gui()
+    if gui.running:
+        gui.append_response(chunk)
+
+def end_response(success=True):
+    """Finish a streamed response"""
+    gui = get_gui()
+    if gui.running:
+        gui.end_response(success)
+
+def attach_sampler(sampler):
+    """Feed the stats panel from the metrics sampler"""
+    gui = get_gui()
+    if gui.running:
+        gui.attach_sampler(sampler)
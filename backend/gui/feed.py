@@ -0,0 +1,146 @@
+"""
+GUI Data Feed
+Thread-safe hand-off between producers (metrics sampler, turn pipeline,
+streamed AI tokens) and the Tk thread. Producers only record the latest
+value or append text under a lock; the GUI drains everything once per
+frame, so a fast producer can never flood the Tk event queue.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Cap on text buffered between frames (a GUI that stopped draining can't grow memory)
+MAX_PENDING_CHARS = 200_000
+
+
+class GuiFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}        # latest-value fields (command, status, stats)
+        self._events: List[Tuple[str, Any]] = []  # ordered response ops
+        self._pending_chars = 0
+        self.active = False                      # set while a GUI is draining
+        self._sampler = None
+
+    # ------------------------------------------------------------------
+    # Producers (any thread)
+    # ------------------------------------------------------------------
+
+    def post_command(self, command: str):
+        if self.active:
+            with self._lock:
+                self._state["command"] = command
+
+    def post_status(self, status: str, color: str = '#00ff88'):
+        if self.active:
+            with self._lock:
+                self._state["status"] = (status, color)
+
+    def post_stats(self, cpu=None, memory=None, battery=None):
+        if not self.active:
+            return
+        with self._lock:
+            stats = dict(self._state.get("stats") or {})
+            if cpu is not None:
+                stats["cpu"] = cpu
+            if memory is not None:
+                stats["memory"] = memory
+            if battery is not None:
+                stats["battery"] = battery
+            self._state["stats"] = stats
+
+    def _push(self, op: str, value: Any = None):
+        if op == "text" and self._events and self._events[-1][0] == "text":
+            # Consecutive tokens become one insert
+            self._events[-1] = ("text", self._events[-1][1] + value)
+        else:
+            self._events.append((op, value))
+        if op == "text":
+            self._pending_chars += len(value)
+            if self._pending_chars > MAX_PENDING_CHARS:
+                self._compact()
+
+    def _compact(self):
+        """Drop all but the newest response when the GUI falls far behind"""
+        last_begin = max((i for i, (op, _) in enumerate(self._events) if op == "begin"), default=0)
+        self._events = self._events[last_begin:]
+        self._pending_chars = sum(len(v) for op, v in self._events if op == "text")
+        if self._pending_chars > MAX_PENDING_CHARS:
+            kept = [(op, v) for op, v in self._events if op != "text"]
+            tail = "".join(v for op, v in self._events if op == "text")[-MAX_PENDING_CHARS:]
+            self._events = kept[:1] + [("text", tail)] + kept[1:]
+            self._pending_chars = len(tail)
+
+    def begin_response(self, success: bool = True):
+        """Start a new (possibly streamed) response"""
+        if self.active:
+            with self._lock:
+                self._push("begin", success)
+
+    def append_response(self, text: str):
+        """Append a chunk (e.g. one streamed token) to the current response"""
+        if self.active and text:
+            with self._lock:
+                self._push("text", text)
+
+    def end_response(self, success: bool = True):
+        if self.active:
+            with self._lock:
+                self._push("end", success)
+
+    def post_response(self, text: str, success: bool = True):
+        """A complete response in one go"""
+        if self.active:
+            with self._lock:
+                self._push("begin", success)
+                self._push("text", text)
+                self._push("end", success)
+
+    # ------------------------------------------------------------------
+    # Sampler subscription
+    # ------------------------------------------------------------------
+
+    def _on_sample(self, sample: Dict[str, Any]):
+        battery = sample.get("battery")
+        if battery is not None:
+            battery = f"{battery:.0f}% {'(charging)' if sample.get('plugged') else '(on battery)'}"
+        self.post_stats(cpu=round(sample["cpu"]), memory=round(sample["mem_percent"]), battery=battery)
+
+    def attach_sampler(self, sampler):
+        """Push every metrics sample to the GUI"""
+        self.detach_sampler()
+        self._sampler = sampler
+        sampler.add_listener(self._on_sample)
+        latest = sampler.latest()
+        if latest:
+            self._on_sample(latest)
+
+    def detach_sampler(self):
+        if self._sampler is not None:
+            self._sampler.remove_listener(self._on_sample)
+            self._sampler = None
+
+    # ------------------------------------------------------------------
+    # Consumer (Tk thread)
+    # ------------------------------------------------------------------
+
+    def drain(self) -> Tuple[Dict[str, Any], List[Tuple[str, Any]]]:
+        """Take everything posted since the last frame"""
+        with self._lock:
+            state, events = self._state, self._events
+            self._state, self._events = {}, []
+            self._pending_chars = 0
+        return state, events
+
+
+# Global feed instance
+_feed: Optional[GuiFeed] = None
+_feed_lock = threading.Lock()
+
+
+def get_gui_feed() -> GuiFeed:
+    """Get or create the shared GUI feed"""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = GuiFeed()
+        return _feed
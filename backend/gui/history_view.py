@@ -0,0 +1,228 @@
+"""
+Conversation History View
+A lazily paged history window: conversations are fetched a page at a time
+(off the Tk thread) as the user scrolls, and only a bounded window of rows
+is kept rendered, so the panel stays fast however long the history is.
+"""
+import threading
+from typing import Any, Callable, Dict, List
+
+try:
+    import tkinter as tk
+except ImportError:
+    tk = None
+
+PAGE_SIZE = 50
+MAX_ROWS = 200  # rendered rows; older/newer pages beyond this are dropped and re-fetched on demand
+
+# Scroll position (fraction) that triggers fetching the next page
+_EDGE = 0.05
+
+
+class HistoryPager:
+    """Keeps a sliding window of conversation rows (oldest first).
+
+    `loader(before_id=None, after_id=None, limit=N)` returns rows oldest
+    first, each a dict with at least an 'id'.
+    """
+
+    def __init__(self, loader: Callable[..., List[Dict[str, Any]]], page_size: int = PAGE_SIZE,
+                 max_rows: int = MAX_ROWS):
+        self.loader = loader
+        self.page_size = page_size
+        self.max_rows = max(max_rows, page_size * 2)
+        self.rows: List[Dict[str, Any]] = []
+        self.has_older = True
+        self.has_newer = False
+
+    def fetch_older(self) -> List[Dict[str, Any]]:
+        before = self.rows[0]["id"] if self.rows else None
+        return self.loader(before_id=before, limit=self.page_size) or []
+
+    def fetch_newer(self) -> List[Dict[str, Any]]:
+        if not self.rows:
+            return []
+        return self.loader(after_id=self.rows[-1]["id"], limit=self.page_size) or []
+
+    def add_older(self, page: List[Dict[str, Any]]) -> int:
+        """Prepend a page; returns how many of the newest rows were dropped"""
+        if len(page) < self.page_size:
+            self.has_older = False
+        self.rows = page + self.rows
+        overflow = len(self.rows) - self.max_rows
+        if overflow > 0:
+            self.rows = self.rows[:-overflow]
+            self.has_newer = True
+            return overflow
+        return 0
+
+    def add_newer(self, page: List[Dict[str, Any]]) -> int:
+        """Append a page; returns how many of the oldest rows were dropped"""
+        if len(page) < self.page_size:
+            self.has_newer = False
+        self.rows = self.rows + page
+        overflow = len(self.rows) - self.max_rows
+        if overflow > 0:
+            self.rows = self.rows[overflow:]
+            self.has_older = True
+            return overflow
+        return 0
+
+
+def format_row(row: Dict[str, Any]) -> List[tuple]:
+    """(text, tag) pieces for one conversation"""
+    ts = row.get("timestamp")
+    stamp = ts.strftime("%Y-%m-%d %H:%M") if hasattr(ts, "strftime") else str(ts or "")
+    return [
+        (f"[{stamp}]\n", "timestamp"),
+        ("You: ", "label"), (f"{row.get('user_input') or ''}\n", "user"),
+        ("Assistant: ", "label"), (f"{row.get('assistant_response') or ''}\n\n", "response"),
+    ]
+
+
+class HistoryPanel:
+    """Toplevel window rendering a HistoryPager; all Tk calls happen on the Tk thread"""
+
+    def __init__(self, root, loader, page_size: int = PAGE_SIZE, max_rows: int = MAX_ROWS):
+        self.root = root
+        self.pager = HistoryPager(loader, page_size, max_rows)
+        self._lock = threading.Lock()
+        self._loading = False
+        self._result = None  # (direction, rows or exception) from the loader thread
+        self.window = tk.Toplevel(root)
+        self.window.title("Conversation History")
+        self.window.geometry("520x600")
+        self.window.configure(bg='#0a0a0a')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        container = tk.Frame(self.window, bg='#1a1a1a')
+        container.pack(fill='both', expand=True, padx=10, pady=10)
+        self.scrollbar = tk.Scrollbar(container)
+        self.scrollbar.pack(side='right', fill='y')
+        self.text = tk.Text(container, font=('Consolas', 10), bg='#0a0a0a', fg='#ffffff', wrap='word',
+                            relief='flat', padx=10, pady=10, yscrollcommand=self._on_scroll)
+        self.text.pack(side='left', fill='both', expand=True)
+        self.scrollbar.config(command=self.text.yview)
+        self.text.tag_config('timestamp', foreground='#888888')
+        self.text.tag_config('label', foreground='#00aaff', font=('Consolas', 10, 'bold'))
+        self.text.tag_config('user', foreground='#ffffff')
+        self.text.tag_config('response', foreground='#00ff88')
+        self.text.tag_config('notice', foreground='#888888', justify='center')
+        self.text.config(state='disabled')
+        self.closed = False
+        self._request("older")
+
+    # ------------------------------------------------------------------
+    # Loading (loader runs on a worker thread, results applied in poll())
+    # ------------------------------------------------------------------
+
+    def _request(self, direction: str):
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        fetch = self.pager.fetch_older if direction == "older" else self.pager.fetch_newer
+
+        def _work():
+            try:
+                result = fetch()
+            except Exception as e:
+                result = e
+            with self._lock:
+                self._result = (direction, result)
+
+        threading.Thread(target=_work, name="history-loader", daemon=True).start()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(first) <= _EDGE and self.pager.has_older:
+            self._request("older")
+        elif float(last) >= 1 - _EDGE and self.pager.has_newer:
+            self._request("newer")
+
+    def poll(self):
+        """Apply a finished page load (called from the GUI frame pump)"""
+        with self._lock:
+            result, self._result = self._result, None
+        if result is None or self.closed:
+            return
+        direction, rows = result
+        try:
+            if isinstance(rows, Exception):
+                self._notice(f"Could not load history: {rows}")
+            elif direction == "older":
+                self._render_older(rows)
+            else:
+                self._render_newer(rows)
+        finally:
+            with self._lock:
+                self._loading = False
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _notice(self, message: str):
+        self.text.config(state='normal')
+        self.text.insert('end', f"{message}\n", 'notice')
+        self.text.config(state='disabled')
+
+    def _insert_rows(self, index: str, rows: List[Dict[str, Any]]):
+        """Insert rows at `index`, each starting at a mark named row<id>"""
+        for row in rows:
+            mark = f"row{row['id']}"
+            self.text.mark_set(mark, index)
+            self.text.mark_gravity(mark, 'left')
+            pieces = format_row(row)
+            args = [x for piece in pieces for x in piece]
+            self.text.insert(index, *args)
+            # From now on text inserted in front (older pages) pushes the mark along
+            self.text.mark_gravity(mark, 'right')
+            index = self.text.index(f"{mark} + {sum(len(p) for p, _ in pieces)}c")
+
+    def _drop_marks(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            self.text.mark_unset(f"row{row['id']}")
+
+    @staticmethod
+    def _lines_of(rows: List[Dict[str, Any]]) -> int:
+        return sum(sum(p.count("\n") for p, _ in format_row(r)) for r in rows)
+
+    def _render_older(self, page: List[Dict[str, Any]]):
+        old_rows = list(self.pager.rows)
+        dropped = self.pager.add_older(page)
+        top_line = int(self.text.index('@0,0').split('.')[0])
+        self.text.config(state='normal')
+        self._insert_rows('1.0', page)
+        if dropped:
+            # The newest rows fall out of the window; they are re-fetched when scrolled back to
+            self.text.delete(f"row{old_rows[-dropped]['id']}", 'end-1c')
+            self._drop_marks(old_rows[-dropped:])
+        self.text.config(state='disabled')
+        if not old_rows:
+            self.text.see('end')
+            if not page:
+                self._notice("No conversations yet.")
+        else:
+            # Keep the rows the user was looking at in place
+            self.text.yview(f"{top_line + self._lines_of(page)}.0")
+
+    def _render_newer(self, page: List[Dict[str, Any]]):
+        old_rows = list(self.pager.rows)
+        dropped = self.pager.add_newer(page)
+        top_line = int(self.text.index('@0,0').split('.')[0])
+        self.text.config(state='normal')
+        self._insert_rows(self.text.index('end-1c'), page)
+        if dropped:
+            self.text.delete('1.0', f"row{self.pager.rows[0]['id']}")
+            self._drop_marks(old_rows[:dropped])
+        self.text.config(state='disabled')
+        if dropped:
+            self.text.yview(f"{max(1, top_line - self._lines_of(old_rows[:dropped]))}.0")
+
+    def close(self):
+        self.closed = True
+        try:
+            self.window.destroy()
+        except Exception:
+            pass
@@ -2,14 +2,12 @@ import os
 import sys
 import time
 import threading
+import queue
 import tempfile
-import asyncio
 import subprocess
 import shutil
-import pyttsx3
 import re
 import datetime
-import requests
 from dotenv import load_dotenv
 
 # Suppress TensorFlow/MediaPipe warnings
@@ -18,55 +16,74 @@ os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 warnings.filterwarnings('ignore', category=FutureWarning)
-from ai.brain import ask_ai
-from dateparser.search import search_dates
-from speech.stt import listen_voice
 
-# Vision and face analysis
-from vision.face_analyzer import start_face_analysis, stop_face_analysis, get_current_analysis, detect_user_mood
-from nlp.nlp_utils import parse_intent
+# Heavy modules (TTS, HTTP, date parsing, spaCy, MySQL, RAG) load on first use so
+# the prompt appears immediately; `python main_clean.py --profile-imports` shows the cost
+from system.lazy_import import lazy_module, lazy_from, is_available, module_exists, profile_startup, format_profile
+from system.startup import StartupOrchestrator
+
+pyttsx3 = lazy_module('pyttsx3')
+requests = lazy_module('requests')
+asyncio = lazy_module('asyncio')
+ask_ai, = lazy_from('ai.brain', 'ask_ai')
+get_ollama_monitor, = lazy_from('ai.ollama_health', 'get_ollama_monitor')
+get_model_manager, = lazy_from('ai.model_manager', 'get_model_manager')
+ConversationSession, = lazy_from('ai.conversation', 'ConversationSession')
+search_dates, = lazy_from('dateparser.search', 'search_dates')
+listen_voice, = lazy_from('speech.stt', 'listen_voice')
+
+# Vision and face analysis load only when main() starts them (not in FAST_MODE)
+start_face_analysis, stop_face_analysis, get_current_analysis, detect_user_mood = lazy_from(
+    'vision.face_analyzer', 'start_face_analysis', 'stop_face_analysis', 'get_current_analysis', 'detect_user_mood')
+parse_intent, = lazy_from('nlp.nlp_utils', 'parse_intent')
 
 # Old system control functions (for app blocking, etc.)
-from system.system_control import run_system_command, list_running_apps, block_app_by_name, block_apps_by_names
+(run_system_command, list_running_apps, block_app_by_name, block_apps_by_names,
+ unblock_app, get_block_status) = lazy_from(
+    'system.system_control',
+    'run_system_command', 'list_running_apps', 'block_app_by_name', 'block_apps_by_names',
+    'unblock_app', 'get_block_status')
+from system.block_manager import get_block_manager
+from system.process_monitor import ProcessStartMonitor, compile_matcher
 
 # New dynamic automation system
-from system.automation_controller import execute_command as run_automation_command, is_automation_command
+run_automation_command, is_automation_command = lazy_from(
+    'system.automation_controller', 'execute_command', 'is_automation_command')
+
+(quick_process_kill, execute_fast_command, quick_volume_control,
+ quick_brightness_control, quick_power_action, quick_app_launch,
+ mute_toggle, lock_screen, wifi_toggle, performance_status, system_status) = lazy_from(
+    'system.optimized_control',
+    'quick_process_kill', 'execute_fast_command', 'quick_volume_control',
+    'quick_brightness_control', 'quick_power_action', 'quick_app_launch',
+    'mute_toggle', 'lock_screen', 'wifi_toggle', 'performance_status', 'system_status')
+(get_db_connection, save_conversation, save_task, log_action, get_system_logs,
+ get_deleted_tasks, get_tasks_on_date,
+ # Memory helpers
+ ensure_memories_table, save_memory, get_recent_memories, search_memories, delete_memory_by_id) = lazy_from(
+    'db.db_connection',
+    'get_db_connection', 'save_conversation', 'save_task', 'log_action', 'get_system_logs',
+    'get_deleted_tasks', 'get_tasks_on_date',
+    'ensure_memories_table', 'save_memory', 'get_recent_memories', 'search_memories', 'delete_memory_by_id')
+
+# RAG functionality (loaded when online mode is first used)
+rag_module = lazy_module('ai.rag')
+get_rag_status, activate_online_mode_with_wifi = lazy_from('ai.rag', 'get_rag_status', 'activate_online_mode_with_wifi')
+
+
+def rag_available() -> bool:
+    """Loads the RAG module on first call; False when its dependencies are missing"""
+    return is_available(rag_module)
 
-from system.optimized_control import (
-    quick_process_kill, execute_fast_command, quick_volume_control,
-    quick_brightness_control, quick_power_action, quick_app_launch,
-    mute_toggle, lock_screen, wifi_toggle, performance_status, system_status
-)
-from db.db_connection import (
-    get_db_connection, save_conversation, save_task, log_action, get_system_logs,
-    get_deleted_tasks, get_tasks_on_date,
-    # Memory helpers
-    ensure_memories_table, save_memory, get_recent_memories, search_memories, delete_memory_by_id
-)
-
-# RAG functionality
-RAG_AVAILABLE = False
-rag_module = None
-try:
-    from ai.rag import get_rag_status, activate_online_mode_with_wifi
-    import ai.rag as rag_module
-    RAG_AVAILABLE = True
-    print("✅ RAG system loaded successfully")
-except ImportError as e:
-    print(f"⚠️ RAG not available: {e}")
-except Exception as e:
-    print(f"⚠️ RAG loading error: {e}")
 
 # Advanced Automation - New Dynamic System
 AUTOMATION_AVAILABLE = True  # Always available with new system
-try:
-    import pyautogui
-    MOUSE_KEYBOARD_AVAILABLE = True
-    print("✅ New dynamic automation system loaded")
+# pyautogui needs a display and is slow to import: only check that it is installed
+MOUSE_KEYBOARD_AVAILABLE = module_exists('pyautogui')
+print("✅ New dynamic automation system loaded")
+if MOUSE_KEYBOARD_AVAILABLE:
     print("   ✓ Mouse & Keyboard control enabled")
-except ImportError:
-    MOUSE_KEYBOARD_AVAILABLE = False
-    print("✅ New dynamic automation system loaded")
+else:
     print("   ⚠️ Mouse & Keyboard control disabled (install pyautogui)")
 
 def show_tasks(db):
@@ -142,19 +159,19 @@ def handle_enhanced_commands(user_input):
     if any(keyword in text for keyword in ["volume", "sound", "audio"]):
         if "up" in text or "increase" in text:
             result = quick_volume_control("up", 10)
-            return f"Volume increased to {result}! Let me know if you'd like to adjust it further or try something else."
+            return f"{result}! Let me know if you'd like to adjust it further or try something else."
         elif "down" in text or "decrease" in text:
             result = quick_volume_control("down", 10)
-            return f"Volume decreased to {result}! Let me know if you'd like to adjust it further or try something else."
+            return f"{result}! Let me know if you'd like to adjust it further or try something else."
         elif "mute" in text:
             result = mute_toggle()
-            return f"Sound toggled to {result}! Let me know if you'd like to adjust the volume or try something else."
+            return f"{result}! Let me know if you'd like to adjust the volume or try something else."
         elif "max" in text or "full" in text:
             result = quick_volume_control("set", 100)
-            return f"Volume set to maximum {result}! Let me know if you'd like to adjust it or try something else."
+            return f"{result}! Let me know if you'd like to adjust it or try something else."
         elif "min" in text or "zero" in text:
             result = quick_volume_control("set", 0)
-            return f"Volume muted to {result}! Let me know if you'd like to adjust it or try something else."
+            return f"{result}! Let me know if you'd like to adjust it or try something else."
         else:
             # Extract volume level if specified
             import re
@@ -164,24 +181,24 @@ def handle_enhanced_commands(user_input):
                 result = quick_volume_control("set", level)
             else:
                 result = quick_volume_control("get")
-            return f"Volume: {result}. Let me know if you'd like to adjust it further!"
+            return f"{result}. Let me know if you'd like to adjust it further!"
 
     elif any(keyword in text for keyword in ["brightness", "screen", "display"]):
         if "up" in text or "increase" in text or "brighter" in text:
             result = quick_brightness_control("up", 10)
-            return "Screen brightness increased! Let me know if you'd like to adjust it further or try something else."
+            return f"{result}! Let me know if you'd like to adjust it further or try something else."
         elif "down" in text or "decrease" in text or "dimmer" in text:
             result = quick_brightness_control("down", 10)
-            return "Screen brightness decreased! Let me know if you'd like to adjust it further or try something else."
+            return f"{result}! Let me know if you'd like to adjust it further or try something else."
         elif "max" in text or "full" in text:
             result = quick_brightness_control("set", 100)
-            return "Screen brightness set to maximum! Let me know if you'd like to adjust it or try something else."
+            return f"{result}! Let me know if you'd like to adjust it or try something else."
         elif "min" in text or "lowest" in text:
             result = quick_brightness_control("set", 10)
-            return "Screen brightness set to minimum! Let me know if you'd like to adjust it or try something else."
+            return f"{result}! Let me know if you'd like to adjust it or try something else."
         else:
             result = quick_brightness_control("get")
-            return f"Current brightness is at {result}%. Let me know if you'd like to adjust it!"
+            return f"{result}. Let me know if you'd like to adjust it!"
 
     elif any(keyword in text for keyword in ["shutdown", "restart", "sleep", "hibernate", "lock"]):
         if "shutdown" in text or "power off" in text:
@@ -301,19 +318,23 @@ def check_ollama_server(timeout=3):
         return False
 
 
-def wait_for_ollama_server(timeout=10):
+def wait_for_ollama_server(timeout=10, verbose=True):
     """Wait for Ollama server to become available"""
     start_time = time.time()
-    print("🔄 Checking Ollama server availability...")
+    if verbose:
+        print("🔄 Checking Ollama server availability...")
 
     while time.time() - start_time < timeout:
         if check_ollama_server():
-            print("✅ Ollama server is ready!")
+            if verbose:
+                print("✅ Ollama server is ready!")
             return True
-        print("⏳ Waiting for Ollama server...")
+        if verbose:
+            print("⏳ Waiting for Ollama server...")
         time.sleep(1)
 
-    print("❌ Ollama server is not available. Please start Ollama server and try again.")
+    if verbose:
+        print("❌ Ollama server is not available. Please start Ollama server and try again.")
     return False
 
 
@@ -324,12 +345,8 @@ interrupt_flag = threading.Event()
 is_speaking = threading.Event()
 
 # Optional edge-tts fallback
-EDGE_TTS_AVAILABLE = False
-try:
-    import edge_tts
-    EDGE_TTS_AVAILABLE = True
-except Exception:
-    EDGE_TTS_AVAILABLE = False
+EDGE_TTS_AVAILABLE = module_exists('edge_tts')
+edge_tts = lazy_module('edge_tts')
 
 
 def get_tts_engine():
@@ -469,9 +486,15 @@ def interrupt_listener(mode):
             time.sleep(0.5)
 
 
-def speak(text):
+# GUI panel (started when ASSISTANT_GUI=1)
+_gui = None
+
+
+def speak(text, gui=True):
     """Print assistant text and speak asynchronously (non-blocking)."""
     print(f"Assistant: {text}")
+    if gui and _gui is not None:
+        _gui.update_response(text)
 
     def _speak_worker(t: str):
         tts_engine = None  # Initialize at the start
@@ -650,56 +673,151 @@ _memory_table_checked = False
 _memory_table_lock = threading.Lock()
 
 
+# Fixed for the whole session so the model can reuse what it already evaluated
+ASSISTANT_SYSTEM = (
+    "You are a helpful AI assistant like Google Assistant. Be natural, concise, and direct. "
+    "Keep responses brief and conversational. "
+    "CRITICAL INSTRUCTION: NEVER assume or mention what the user is doing unless they explicitly tell you. "
+    "If the user asks about their mood or face, respond based on detected emotion, but do not invent activities. "
+    "For example, if mood is neutral, respond naturally without assuming they're doing anything specific. "
+    "Notes in [brackets] before a question (mood, memories) apply to that question only."
+)
+
+
+# Conversation turns waiting to be written; the main loop never waits on the database
+_turn_log = queue.Queue()
+
+
+def save_turn(user_input, response):
+    """Queue a conversation turn for the background writer (never blocks)"""
+    _turn_log.put((user_input, response))
+
+
+def write_turns(startup):
+    """Background writer: waits for the database once, then saves turns in order"""
+    available = startup.wait('db') not in (None, False)
+    while True:
+        user_input, response = _turn_log.get()
+        try:
+            if not available:
+                continue  # no database this run: turns are dropped, as before
+            # Own pooled connection: the main thread keeps using the startup one
+            conn = get_db_connection()
+            if not conn:
+                continue
+            try:
+                save_conversation(conn, user_input, response)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ Could not save conversation: {e}")
+        finally:
+            _turn_log.task_done()
+
+
+def flush_turns(timeout=2.0):
+    """Give queued turns a moment to reach the database before exit"""
+    deadline = time.time() + timeout
+    while _turn_log.unfinished_tasks and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def preload_model(startup=None):
+    """Warm the LLM once Ollama is reachable; at startup also follow memory pressure"""
+    models = get_model_manager()
+    if startup is not None:
+        try:
+            from system.metrics_sampler import get_metrics_sampler
+            models.attach(get_metrics_sampler())
+        except Exception as e:
+            print("Warning: model memory policy unavailable:", e)
+        if not startup.wait('ollama'):
+            return None
+    from ai.model_manager import PRELOAD
+    if not PRELOAD:
+        return None
+    result = models.preload()
+    if not result['success']:
+        print(f"\n⚠️ {result['message']}")
+    return result['success']
+
+
+def start_reminder_watcher(startup):
+    db = startup.require('db', what="Database")
+    threading.Thread(target=check_reminders, args=(db,), daemon=True).start()
+    return True
+
+
+# Startup reports (printed when each background initialization finishes)
+def _report_ollama(ready, error):
+    if ready:
+        print("\n✅ Ollama server is ready!")
+    else:
+        print("\n⚠️ Ollama server not available. AI responses will be limited.")
+        print("   To enable AI: Start Ollama server - it will be picked up automatically.")
+    # From here on, announce outages and recoveries as the health monitor sees them
+    get_ollama_monitor().add_listener(_report_ollama_change)
+
+
+def _report_ollama_change(old, new):
+    if new == "closed":
+        print("\n✅ Ollama server is back - AI responses enabled.")
+        # A restarted server has nothing loaded
+        threading.Thread(target=preload_model, daemon=True).start()
+    elif new == "open" and old == "closed":
+        print("\n⚠️ Ollama server stopped responding - AI responses paused until it returns.")
+
+
+def _report_db(connection, error):
+    if not connection:
+        print("\n❌ Database connection failed. Tasks, reminders and history are unavailable.")
+
+
+def _report_vision(active, error):
+    if isinstance(error, ImportError):
+        print(f"\n⚠️ Face analysis not available: {error}")
+    elif error:
+        print(f"\n⚠️ Face analysis initialization failed: {error}")
+    elif active:
+        print("\n✅ Face analysis system activated!")
+    else:
+        print("\n⚠️ Face analysis system not available (camera not found)")
+
+
 def main():
+    global _gui
     print("🚀 Starting Offline AI Assistant...")
 
-    # Warm up TTS engine in background so first speech has minimal latency
-    try:
-        tts_warm = threading.Thread(target=get_tts_engine, daemon=True)
-        tts_warm.start()
-    except Exception:
-        pass
-
     # Fast mode option to reduce latency by skipping heavy features
     FAST_MODE = os.getenv('FAST_MODE', '').strip() not in ('', '0', 'false', 'False')
 
-    # Check if Ollama server is available (optional - continue without it)
-    ollama_available = False
-    try:
-        if wait_for_ollama_server(timeout=5 if FAST_MODE else 10):
-            ollama_available = True
-        else:
-            print("⚠️ Ollama server not available. AI responses will be limited.")
-            print("   To enable AI: Start Ollama server and restart the assistant.")
-    except Exception:
-        print("⚠️ Ollama check failed. Continuing without AI responses.")
-
-    db = get_db_connection()
-    if not db:
-        print("❌ Database connection failed. Exiting.")
-        return
+    # Every subsystem initializes concurrently; the prompt appears right away and each
+    # feature waits only on what it needs (AI answers on Ollama, tasks on the database)
+    startup = StartupOrchestrator()
+    startup.launch('tts', get_tts_engine)
+    # The health monitor keeps polling after startup, so Ollama can come and go mid-session
+    startup.launch('ollama', lambda: get_ollama_monitor().wait_until_available(timeout=5 if FAST_MODE else 10))
+    startup.launch('db', get_db_connection)
+    startup.on_ready('ollama', _report_ollama)
+    # Load the model now so the first question doesn't pay for it
+    startup.launch('model', preload_model, startup, requires=('ollama',))
+    startup.on_ready('db', _report_db)
+    db = startup.deferred('db', what="Database")
+    threading.Thread(target=write_turns, args=(startup,), name="turn-log", daemon=True).start()
+
+    # One conversation with the LLM for the whole run (fixed system prompt, append-only turns)
+    session = ConversationSession(system=ASSISTANT_SYSTEM)
+    session_seeded = False
 
     # Initialize face analysis (optional)
-    face_analysis_active = False
     last_face_id = None
     last_mood = None
     last_mood_confidence = 0.0
-    try:
-        if not FAST_MODE:
-            from vision.face_analyzer import start_face_analysis, stop_face_analysis, get_current_analysis, detect_user_mood
-            if start_face_analysis():
-                face_analysis_active = True
-                print("✅ Face analysis system activated!")
-            else:
-                print("⚠️ Face analysis system not available (camera not found)")
-        else:
-            print("⏩ FAST_MODE: Skipping face analysis initialization")
-    except ImportError as e:
-        print(f"⚠️ Face analysis not available: {e}")
-        face_analysis_active = False
-    except Exception as e:
-        print(f"⚠️ Face analysis initialization failed: {e}")
-        face_analysis_active = False
+    if not FAST_MODE:
+        startup.launch('vision', start_face_analysis)
+        startup.on_ready('vision', _report_vision)
+    else:
+        print("⏩ FAST_MODE: Skipping face analysis initialization")
 
     mode = input("Choose mode (cli/voice): ").strip().lower()
     if mode not in ["cli", "voice"]:
@@ -711,15 +829,40 @@ def main():
         interrupt_thread.start()
         print("✅ Voice interrupt feature activated! Say 'hey wait' to interrupt.")
 
-    # Start reminder watcher in the background (skip in FAST_MODE)
+    # Start reminder watcher once the database is up (skip in FAST_MODE)
+    if not FAST_MODE:
+        startup.launch('reminders', start_reminder_watcher, startup, requires=('db',))
+    else:
+        print("⏩ FAST_MODE: Reminder watcher disabled")
+
+    # Background metrics sampler: "cpu usage" and friends read its latest sample
     try:
-        if not FAST_MODE:
-            reminder_thread = threading.Thread(target=check_reminders, args=(db,), daemon=True)
-            reminder_thread.start()
-        else:
-            print("⏩ FAST_MODE: Reminder watcher disabled")
+        from system.metrics_sampler import get_metrics_sampler
+        sampler = get_metrics_sampler()
+        if os.getenv("METRICS_RECORD", "1") == "1":
+            from system.metrics_store import get_metrics_store
+            get_metrics_store().attach(sampler)
+    except Exception as e:
+        print("Warning: metrics sampler unavailable:", e)
+
+    # Optional GUI panel; stats are pushed from the sampler, turns from the loop below
+    if os.getenv("ASSISTANT_GUI", "0") == "1":
+        try:
+            from gui.assistant_gui import start_gui
+            from db.db_connection import get_conversation_page
+            _gui = start_gui(history_loader=get_conversation_page)
+            from system.metrics_sampler import get_metrics_sampler
+            _gui.attach_sampler(get_metrics_sampler())
+        except Exception as e:
+            print("Warning: GUI panel unavailable:", e)
+
+    # Resume processes left suspended by a previous run (e.g. after a crash)
+    try:
+        recovered = get_block_manager().recover()
+        if recovered.get("resumed") or recovered.get("adopted"):
+            print(f"🔓 {recovered['message']}")
     except Exception as e:
-        print("Warning: failed to start reminder watcher:", e)
+        print("Warning: failed to recover app blocks:", e)
 
     # Tick callback for audible countdowns
     def tick_cb(remaining: int, total: int, label: str):
@@ -736,37 +879,66 @@ def main():
     if always_block:
         targets = [p.strip() for p in always_block.split(',') if p.strip()]
         if targets:
-            def _auto_block_watcher():
-                backoff_until = 0
-                while True:
-                    try:
-                        apps = list_running_apps()
-                        present = []
-                        low_apps = [a.lower() for a in apps]
-                        for t in targets:
-                            tlow = t.lower()
-                            matched = None
-                            for idx, la in enumerate(low_apps):
-                                if la == tlow or tlow in la:
-                                    matched = apps[idx]
-                                    break
-                            if matched:
-                                present.append(matched)
-                        if present and time.time() >= backoff_until:
-                            result = block_apps_by_names(present, always_block_duration)
-                            log_action(f"Auto-blocked apps: {present} for {always_block_duration}s - {result}")
-                            backoff_until = time.time() + always_block_duration + 2
-                    except Exception as e:
-                        print("Auto-block watcher error:", e)
-                    time.sleep(5)
-            watcher = threading.Thread(target=_auto_block_watcher, daemon=True)
-            watcher.start()
+            match_target = compile_matcher(targets)
+            pending = set()
+            rechecks = {}
+            pending_lock = threading.Lock()
+
+            def _block_target(target):
+                with pending_lock:
+                    pending.discard(target)
+                try:
+                    result = block_apps_by_names([target], always_block_duration)
+                    if "No running processes matched" not in result:
+                        log_action(f"Auto-blocked apps: {[target]} for {always_block_duration}s - {result}")
+                        # Keep it blocked: re-check once this block expires (one chain per target)
+                        with pending_lock:
+                            current = rechecks.get(target)
+                            if current is None or not current.is_alive() or current is threading.current_thread():
+                                recheck = threading.Timer(always_block_duration + 2, _block_target, args=(target,))
+                                recheck.daemon = True
+                                rechecks[target] = recheck
+                                recheck.start()
+                except Exception as e:
+                    print("Auto-block watcher error:", e)
+
+            def _schedule_block(target):
+                # Coalesce the burst of processes a single app launch spawns
+                with pending_lock:
+                    if target in pending:
+                        return
+                    pending.add(target)
+                timer = threading.Timer(0.05, _block_target, args=(target,))
+                timer.daemon = True
+                timer.start()
+
+            def _on_process_start(pid, name):
+                target = match_target(name)
+                if target and not get_block_manager().is_blocked(pid):
+                    _schedule_block(target)
+
+            # Catch targets that are already running, then react to new processes only
+            try:
+                for app in list_running_apps():
+                    target = match_target(app)
+                    if target:
+                        _schedule_block(target)
+            except Exception as e:
+                print("Auto-block watcher error:", e)
+            process_monitor = ProcessStartMonitor(_on_process_start)
+            backend = process_monitor.start()
+            print(f"✅ Auto-block watcher active ({backend}) for: {', '.join(targets)}")
 
     while True:
         try:
+            if _gui is not None:
+                _gui.show_listening() if mode == "voice" else _gui.show_idle()
             user_input = get_user_input(mode)
             if not user_input:
                 continue
+            if _gui is not None:
+                _gui.update_command(user_input)
+                _gui.show_processing()
             # Quick diagnostic: TTS test
             low_ins = user_input.lower().strip()
             if low_ins in ["test tts", "tts test", "test-tts", "check tts"]:
@@ -780,13 +952,29 @@ def main():
                     speak(f"TTS test failed: {res.get('message')}")
                 continue
             
+            if low_ins in ["startup status", "startup report"]:
+                print(f"🚦 Startup: {startup.summary()}")
+                ollama = get_ollama_monitor().status()
+                print(f"🦙 Ollama: {ollama['state']}, models loaded: "
+                      f"{', '.join(m['name'] for m in ollama['loaded_models']) or 'none'}")
+                models = get_model_manager().metrics()
+                last = models['last_load']
+                conv = session.stats()
+                print(f"💬 Session: {conv['turns']} turns ({conv['mode']}), {conv['rebuilds']} rebuilds, "
+                      f"last prompt {conv['last_prompt_tokens'] or 0} tokens evaluated, "
+                      f"history ~{conv['history_tokens']}/{conv['token_budget']} tokens, "
+                      f"{conv['summarized_turns']} turns summarized")
+                print(f"🧠 Model: {models['active_model']} ({models['mode']}, keep_alive {models['keep_alive']}), "
+                      f"last load {str(last['seconds']) + 's' if last else 'none yet'}, cold starts {models['cold_starts']}")
+                continue
+
             if user_input.lower() in ["exit", "quit", "bye"]:
                 speak("Goodbye!")
                 break
 
             # Get face analysis if available
             current_mood = "neutral"
-            if face_analysis_active:
+            if startup.peek('vision', False):
                 try:
                     current_mood = detect_user_mood()
                 except Exception:
@@ -802,7 +990,7 @@ def main():
                     "and local libraries to run without the internet."
                 )
                 speak_no_prefix(response)
-                save_conversation(db, user_input, response)
+                save_turn(user_input, response)
                 continue
 
             # Structured intent routing
@@ -876,6 +1064,22 @@ def main():
                         pass
                     continue
 
+                if it == "BLOCK_STATUS":
+                    speak(get_block_status())
+                    continue
+
+                if it == "UNBLOCK_APP":
+                    name = params.get("name")
+                    if name:
+                        speak(unblock_app(name))
+                        try:
+                            log_action(f"Unblocked app: {name}")
+                        except Exception:
+                            pass
+                    else:
+                        speak("Which app should I unblock?")
+                    continue
+
                 if it == "TASK_ADD":
                     task = params.get("title")
                     if task:
@@ -923,7 +1127,7 @@ def main():
             enhanced_result = handle_enhanced_commands(user_input)
             if enhanced_result:
                 speak(enhanced_result)
-                save_conversation(db, user_input, enhanced_result)
+                save_turn(user_input, enhanced_result)
                 log_action(f"Enhanced command executed: {user_input[:50]}...")
                 continue
 
@@ -1060,7 +1264,7 @@ def main():
 
             # RAG status command
             if user_input.lower() in ["rag status", "check rag", "internet status"]:
-                if RAG_AVAILABLE:
+                if rag_available():
                     status = get_rag_status()
                     status_msg = f"🌐 RAG System Status:\n"
                     status_msg += f"   Enabled: {'✓ Yes' if status['enabled'] else '✗ No'}\n"
@@ -1074,7 +1278,7 @@ def main():
 
             # Deactivate online mode (CHECK THIS FIRST before activate!)
             if any(phrase in user_input.lower() for phrase in ["deactivate online mode", "disable online mode", "turn off online mode", "deactive online mode", "offline mode"]):
-                if RAG_AVAILABLE:
+                if rag_available():
                     rag_module.online_mode_active = False
                     print("🔌 Deactivating online mode...")
                     speak("Online mode deactivated. Switched back to offline mode.")
@@ -1085,7 +1289,7 @@ def main():
 
             # Activate online mode with smart WiFi connection
             if any(phrase in user_input.lower() for phrase in ["active online mode", "activate online mode", "enable online mode", "turn on online mode", "online mode on"]):
-                if RAG_AVAILABLE:
+                if rag_available():
                     print("🔄 Checking WiFi and activating online mode...")
                     result = activate_online_mode_with_wifi()
                     
@@ -1148,10 +1352,14 @@ def main():
                 continue
 
             # AI response fallback with mood awareness
-            try:
-                history = fetch_conversation_history(db, limit=(5 if FAST_MODE else 20))
-            except Exception:
-                history = []
+            if not session_seeded:
+                # The session keeps the conversation from here on; stored history only seeds it once.
+                # Rows past the token budget are summarized in the background, not dropped
+                session_seeded = True
+                try:
+                    session.seed(list(reversed(fetch_conversation_history(db, limit=(8 if FAST_MODE else 20)))))
+                except Exception:
+                    pass
             try:
                 mem_rows = search_memories(user_input, limit=5)
             except Exception:
@@ -1160,15 +1368,17 @@ def main():
 
             # Add mood context to system message - only for tone, not activity assumptions
             mood_context = ""
-            if face_analysis_active:
-                # Get current face analysis
+            if startup.peek('vision', False):
+                # Latest background analysis (a cached read, no camera work here)
                 analysis = get_current_analysis()
                 faces_detected = analysis.get('faces_detected', 0)
 
                 if faces_detected > 0:
+                    # Mood smoothed over the last few seconds rather than one frame
                     face = analysis['analysis'][0] if analysis['analysis'] else {}
-                    emotion = face.get('emotion', {}).get('emotion', 'neutral')
-                    confidence = face.get('emotion', {}).get('confidence', 0)
+                    mood = analysis.get('mood') or face.get('emotion', {})
+                    emotion = mood.get('emotion', 'neutral')
+                    confidence = mood.get('confidence', 0)
 
                     # State tracking - only print if mood changed significantly
                     mood_changed = False
@@ -1195,30 +1405,43 @@ def main():
                     else:
                         mood_context = "\nRespond in a natural, conversational manner."
 
-            system_msg = (
-                "You are a helpful AI assistant like Google Assistant. Be natural, concise, and direct. "
-                "Keep responses brief and conversational. "
-                "CRITICAL INSTRUCTION: NEVER assume or mention what the user is doing unless they explicitly tell you. "
-                "If the user asks about their mood or face, respond based on detected emotion, but do not invent activities. "
-                "For example, if mood is neutral, respond naturally without assuming they're doing anything specific."
-                + mood_context
-                + ("User memories:\n" + mem_context if mem_context else "")
-            )
+            # Mood and memories change every turn: they go with this question, not into the
+            # system prompt, so the conversation prefix the model has already read stays the same
+            notes = " ".join(part for part in (
+                mood_context.strip(),
+                ("User memories:\n" + mem_context) if mem_context else "",
+            ) if part)
             # Show quick feedback so user knows model is generating (reduces perceived latency)
             try:
                 print("[AI] Generating response...")
             except Exception:
                 pass
             _ai_t0 = time.time()
-            response = ask_ai(user_input, history=history, system=system_msg) if ollama_available else "Sorry, AI responses are not available. Please start Ollama server."
+            streamed = []
+            on_token = None
+            if _gui is not None:
+                _gui.begin_response()
+                def on_token(chunk):
+                    streamed.append(chunk)
+                    _gui.append_response(chunk)
+            if not startup.done('ollama'):
+                print("⏳ Waiting for Ollama server...")
+                startup.wait('ollama')
+            # ask_ai fails fast on its own while the Ollama circuit breaker is open
+            response = ask_ai(user_input, session=session, notes=notes, on_token=on_token)
+            ollama_available = get_ollama_monitor().available
             _ai_t1 = time.time()
             try:
                 if ollama_available:
                     print(f"[AI] Response generated in {_ai_t1 - _ai_t0:.2f}s")
             except Exception:
                 pass
-            speak(response)
-            save_conversation(db, user_input, response)
+            if _gui is not None:
+                if not streamed:  # quick/cached answers and errors arrive in one piece
+                    _gui.append_response(response)
+                _gui.end_response()
+            speak(response, gui=False)
+            save_turn(user_input, response)
 
         except KeyboardInterrupt:
             speak("Goodbye!")
@@ -1230,19 +1453,28 @@ def main():
 
     # Cleanup
     try:
-        if face_analysis_active and 'stop_face_analysis' in globals():
+        if startup.peek('vision', False):
             stop_face_analysis()
             print("Face analysis system stopped.")
     except Exception as e:
         print(f"Error stopping face analysis: {e}")
 
-    if db:
+    if startup.ready('db'):
+        flush_turns()
+    connection = startup.peek('db')
+    if connection:
         try:
-            db.close()
+            connection.close()
             print("Database connection closed.")
         except Exception:
             pass
+    if startup.peek('model'):
+        get_model_manager().release()
+    startup.shutdown()
 
 
 if __name__ == "__main__":
-    main()
+    if "--profile-imports" in sys.argv:
+        print(format_profile(profile_startup("main_clean")))
+    else:
+        main()
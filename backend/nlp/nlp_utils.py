@@ -108,6 +108,12 @@ def parse_intent(user_input: str) -> Optional[Dict[str, Any]]:
     if lower in ["show apps", "list apps", "show applications"]:
         return {"intent": "SHOW_APPS", "params": {}}
 
+    # Active blocks / early release
+    if lower in ["block status", "blocked apps", "show blocks", "show blocked apps", "list blocks"]:
+        return {"intent": "BLOCK_STATUS", "params": {}}
+    if lower.startswith("unblock "):
+        return {"intent": "UNBLOCK_APP", "params": {"name": text[8:].strip()}}
+
     # Block app(s)
     if lower.startswith("block "):
         seconds = _parse_duration_seconds(lower)
@@ -27,28 +27,25 @@ def open_app(app_name: str) -> Dict[str, Any]:
     try:
         import subprocess
         import winreg
-        import time
+        from system.control.process_watch import snapshot_pids, wait_for_app
         
         # Try method 1: Direct start command (works for built-in Windows apps)
         try:
+            baseline = snapshot_pids()
             result = subprocess.Popen(['start', '', app_name], shell=True, 
                                      stdout=subprocess.DEVNULL, 
                                      stderr=subprocess.DEVNULL)
-            time.sleep(1.5)  # Give app time to start
             
-            # Verify if app started by checking running processes
-            for proc in psutil.process_iter(['name']):
-                try:
-                    proc_name = proc.info['name'].lower()
-                    if app_name.lower() in proc_name or proc_name.replace('.exe', '') == app_name.lower():
-                        return {
-                            'success': True,
-                            'message': f'Successfully opened {app_name}',
-                            'app': app_name,
-                            'method': 'start_command'
-                        }
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            # Verify if app started: returns as soon as a new matching process appears
+            launch = wait_for_app(app_name, pid=result.pid, baseline=baseline, timeout=1.5)
+            if launch['success']:
+                return {
+                    'success': True,
+                    'message': f'Successfully opened {app_name}',
+                    'app': app_name,
+                    'method': 'start_command',
+                    'proc': launch['pid']
+                }
         except:
             pass
         
@@ -67,14 +64,17 @@ def open_app(app_name: str) -> Dict[str, Any]:
                         try:
                             with winreg.OpenKey(key, f"{app_name}.exe") as app_key:
                                 app_path = winreg.QueryValue(app_key, None)
-                                subprocess.Popen(app_path, shell=True)
-                                time.sleep(1.5)
+                                baseline = snapshot_pids()
+                                child = subprocess.Popen(app_path, shell=True)
+                                launch = wait_for_app([app_name, app_path], pid=child.pid, baseline=baseline, timeout=1.5)
                                 return {
                                     'success': True,
                                     'message': f'Successfully opened {app_name}',
                                     'app': app_name,
                                     'method': 'registry',
-                                    'path': app_path
+                                    'path': app_path,
+                                    'proc': launch['pid'],
+                                    'verified': launch['success']
                                 }
                         except:
                             pass
@@ -98,14 +98,17 @@ def open_app(app_name: str) -> Dict[str, Any]:
                         if file.lower() == f"{app_name.lower()}.exe" or app_name.lower() in file.lower():
                             app_path = os.path.join(root, file)
                             try:
-                                subprocess.Popen(app_path, shell=True)
-                                time.sleep(1.5)
+                                baseline = snapshot_pids()
+                                child = subprocess.Popen(app_path, shell=True)
+                                launch = wait_for_app([app_name, file], pid=child.pid, baseline=baseline, timeout=1.5)
                                 return {
                                     'success': True,
                                     'message': f'Successfully opened {app_name}',
                                     'app': app_name,
                                     'method': 'file_search',
-                                    'path': app_path
+                                    'path': app_path,
+                                    'proc': launch['pid'],
+                                    'verified': launch['success']
                                 }
                             except:
                                 continue
@@ -115,13 +118,16 @@ def open_app(app_name: str) -> Dict[str, Any]:
         
         # Method 4: Try as Windows Store app (ms-windows-store: protocol)
         try:
+            baseline = snapshot_pids()
             subprocess.Popen(['start', f'shell:AppsFolder\\{app_name}'], shell=True)
-            time.sleep(1.5)
+            launch = wait_for_app(app_name, baseline=baseline, timeout=1.5)
             return {
                 'success': True,
                 'message': f'Attempted to open {app_name} as Windows Store app',
                 'app': app_name,
-                'method': 'store_app'
+                'method': 'store_app',
+                'proc': launch['pid'],
+                'verified': launch['success']
             }
         except:
             pass
@@ -523,21 +529,9 @@ def get_file_info(path: str) -> Dict[str, Any]:
 # ============================================================================
 
 def get_cpu_usage() -> Dict[str, Any]:
-    """Get CPU usage percentage"""
-    try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        cpu_count = psutil.cpu_count()
-        return {
-            'success': True,
-            'cpu_percent': cpu_percent,
-            'cpu_count': cpu_count,
-            'message': f'CPU usage: {cpu_percent}% ({cpu_count} cores)'
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'message': f'Failed to get CPU usage: {str(e)}'
-        }
+    """Get CPU usage percentage (latest background sample, no blocking measurement)"""
+    from system.control.system_info import get_cpu_usage as _sampled_cpu_usage
+    return _sampled_cpu_usage()
 
 
 def get_memory_info() -> Dict[str, Any]:
@@ -10,8 +10,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from system.parser import parse_command, get_command_help
 from system.control import apps, input_control, files, system_info
+from system.control.process_watch import wait_for_window
+from system.command_runner import get_command_runner
 import subprocess
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
 
 # Execution context to remember last app between sub-commands
 _execution_context = {
@@ -19,10 +22,129 @@ _execution_context = {
     "last_app_proc": None,
 }
 
+# Shared pool for independent sub-commands of a compound command
+_MAX_WORKERS = int(os.getenv("AUTOMATION_WORKERS", "4") or 4)
+_executor = None
+
+# Parsed actions that drive keyboard/mouse and therefore need the opened app
+_INPUT_ACTIONS = {"type_text", "press_key", "click_mouse", "move_mouse"}
+
 def _split_compound(cmd_str):
     # split on ' and ' but keep quoted "and" inside text (simple approach)
     return re.split(r'\s+and\s+', cmd_str.strip(), flags=re.IGNORECASE)
 
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="automation")
+    return _executor
+
+def _classify(cmd):
+    """Classify a sub-command: open, close, input, query (read-only) or other"""
+    low = cmd.strip().lower()
+    if low.startswith("open "):
+        return "open"
+    if low.startswith("close "):
+        return "close"
+    if re.search(r'\btype\b', low):
+        return "input"
+    action, _ = parse_command(low)
+    if action in _INPUT_ACTIONS:
+        return "input"
+    if action and (action.startswith("get_") or action.startswith("list_")):
+        return "query"
+    return "other"
+
+def _plan(parts):
+    """Build execution steps with dependencies on earlier steps.
+
+    - input steps (type/press/click) depend on the preceding open and on the
+      previous input step, so keystrokes stay ordered and go to the right app
+    - close depends on an earlier open of the same app
+    - queries and unrelated launches are independent
+    - anything else (shell fallback, file changes) is a barrier: it waits for
+      all earlier steps, and later non-query steps wait for it
+    """
+    steps = []
+    last_open = None
+    last_input = None
+    last_barrier = None
+    for i, part in enumerate(parts):
+        kind = _classify(part)
+        deps = set()
+        if kind == "input":
+            if last_open is not None:
+                deps.add(last_open)
+            if last_input is not None:
+                deps.add(last_input)
+        elif kind == "close":
+            target = part.strip()[6:].strip().lower()
+            for prev in steps:
+                if prev["kind"] == "open" and target and target in prev["cmd"].strip()[5:].strip().lower():
+                    deps.add(prev["index"])
+            if last_input is not None:
+                deps.add(last_input)
+        elif kind == "other":
+            deps.update(range(i))
+        if last_barrier is not None and kind != "query":
+            deps.add(last_barrier)
+
+        steps.append({
+            "index": i,
+            "cmd": part,
+            "kind": kind,
+            "deps": sorted(deps),
+            # context (opened app) that an input step should act on
+            "ctx_from": last_open if kind == "input" else None,
+        })
+        if kind == "open":
+            last_open = i
+        elif kind == "input":
+            last_input = i
+        elif kind == "other":
+            last_barrier = i
+    return steps
+
+def _resolve_action(action):
+    """Find the control-module function implementing a parsed action"""
+    if not action:
+        return None
+    for module in (apps, input_control, files, system_info):
+        handler = getattr(module, action, None)
+        if callable(handler):
+            return handler
+    return None
+
+def _normalize_result(action, res):
+    """Turn a control-module return value into the controller's dict shape"""
+    if isinstance(res, list):
+        return {"success": True, "is_automation": True, "processes": res,
+                "message": f"{len(res)} processes running"}
+    res = dict(res or {})
+    res.setdefault("is_automation", True)
+    res.setdefault("success", res.get("found", True))
+    if not res.get("message"):
+        if "files" in res:
+            res["message"] = f"{res.get('count', len(res['files']))} files in {res.get('folder')}"
+        elif "found" in res:
+            res["message"] = f"{res.get('name')} is {'running' if res['found'] else 'not running'}"
+        elif "resolution" in res:
+            res["message"] = f"Screen size: {res['resolution']}"
+        elif "position" in res:
+            res["message"] = f"Mouse position: {res['position']}"
+        elif action == "get_full_system_status":
+            res["message"] = "System status collected"
+    return res
+
+def _focus_when_ready(app_name, proc=None, timeout=1.0):
+    """Wait for the app's window (event-driven, with deadline) and focus it once"""
+    try:
+        wait_for_window(app_name, pid=proc, timeout=timeout)
+        if hasattr(apps, 'focus_app'):
+            apps.focus_app(app_name, proc=proc)
+    except Exception:
+        pass
+
 def _handle_single(cmd, ctx):
     cmd = cmd.strip()
     low = cmd.lower()
@@ -35,17 +157,8 @@ def _handle_single(cmd, ctx):
             # apps.open_app returns 'app' key; normalize
             ctx["last_app_name"] = res.get("app") or res.get("app_name") or app_name
             ctx["last_app_proc"] = res.get("proc") if "proc" in res else None
-            # best-effort focus: some control modules may provide focus; otherwise wait briefly
-            try:
-                if hasattr(apps, 'focus_app'):
-                    # Try a couple of times in case window hasn't appeared yet
-                    for _ in range(2):
-                        apps.focus_app(ctx["last_app_name"], proc=ctx.get("last_app_proc"))
-                        time.sleep(0.2)
-                else:
-                    time.sleep(0.5)
-            except Exception:
-                time.sleep(0.5)
+            # best-effort focus once the window exists (returns as soon as it appears)
+            _focus_when_ready(ctx["last_app_name"], ctx.get("last_app_proc"))
         return res
 
     # Close app
@@ -67,58 +180,104 @@ def _handle_single(cmd, ctx):
         if not target:
             return {"success": False, "is_automation": True, "message": "No app focused to type into. Open an app first."}
         try:
-            # Try to focus target if available, otherwise give a short delay
-            if hasattr(apps, 'focus_app'):
-                try:
-                    # Small retry focus to improve reliability
-                    for _ in range(2):
-                        apps.focus_app(target, proc=proc)
-                        time.sleep(0.2)
-                except Exception:
-                    time.sleep(0.3)
-            else:
-                time.sleep(0.3)
+            # Make sure the target window is up and focused before typing
+            _focus_when_ready(target, proc)
             res = input_control.type_text(text)
             return res
         except Exception as e:
             return {"success": False, "is_automation": True, "message": f"Typing failed: {e}"}
 
-    # Fallback to generic system command: run via subprocess and capture output
+    # Parsed commands (system info, files, input) map onto the control modules
+    action, value = parse_command(cmd)
+    handler = _resolve_action(action)
+    if handler is not None:
+        try:
+            if value is None:
+                res = handler()
+            elif isinstance(value, tuple):
+                res = handler(*value)
+            else:
+                res = handler(value)
+            return _normalize_result(action, res)
+        except Exception as e:
+            return {"success": False, "is_automation": True, "message": f"{action} failed: {e}"}
+
+    # Fallback to generic system command: run in a warm shell session and capture output
     try:
-        proc = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=15)
-        out = (proc.stdout or '').strip()
-        err = (proc.stderr or '').strip()
-        success = proc.returncode == 0
-        message = out if out else (err if err else f"Command exited with {proc.returncode}")
-        return {"success": success, "is_automation": True, "message": message}
+        res = get_command_runner().run(cmd, timeout=15)
+        out = res.get("output") or ''
+        if res.get("timed_out"):
+            return {"success": False, "is_automation": True, "message": f"Command timed out after 15s: {cmd}"}
+        message = out if out else f"Command exited with {res.get('returncode')}"
+        return {"success": res.get("success", False), "is_automation": True, "message": message}
     except Exception as e:
         return {"success": False, "is_automation": True, "message": f"Unhandled command error: {e}"}
 
     return {"success": False, "is_automation": True, "message": "Unknown command"}
 
+def _run_step(step, futures, ctxs):
+    """Run one planned step after its dependencies; skip it if any failed"""
+    for dep in step["deps"]:
+        dep_res = futures[dep].result()
+        if not dep_res.get("success", False):
+            return {"success": False, "is_automation": True, "skipped": True,
+                    "message": f"Skipped '{step['cmd']}' (depends on a failed step)"}
+    if step["kind"] == "input" and step["ctx_from"] is not None:
+        ctx = ctxs[step["ctx_from"]]
+    else:
+        ctx = ctxs[step["index"]]
+    return _handle_single(step["cmd"], ctx)
+
 def execute_command(command_str):
     """
     Enhanced execute_command: handles compound commands joined by 'and'
     and maintains context (last opened app) so subsequent actions like 'type'
     apply to the opened app.
+
+    Independent sub-commands ("open chrome and open spotify", "cpu usage and
+    memory usage") run concurrently on a thread pool; dependent ones ('type'
+    after 'open') wait for what they depend on. Results keep the original order.
     """
-    parts = _split_compound(command_str)
+    parts = [p for p in _split_compound(command_str) if p.strip()]
+    if not parts:
+        return {"is_automation": True, "success": False, "message": "Unknown command"}
+
+    if len(parts) == 1:
+        res = _handle_single(parts[0], _execution_context)
+        result = dict(res)
+        result["is_automation"] = res.get("is_automation", True)
+        result["success"] = res.get("success", False)
+        result["message"] = res.get("message") or res.get("output") or str(res)
+        return result
+
+    steps = _plan(parts)
+    # Each step gets its own context seeded from the session context, so
+    # concurrent opens don't overwrite each other's "last app"
+    ctxs = [dict(_execution_context) for _ in steps]
+    futures: List[Any] = []
+    executor = _get_executor()
+    for step in steps:
+        # Steps are submitted in order, so dependencies are always picked up
+        # by a worker before anything waiting on them
+        futures.append(executor.submit(_run_step, step, futures, ctxs))
+    results = [f.result() for f in futures]
+
+    # Session context follows the last app opened in this command
+    for step in reversed(steps):
+        if step["kind"] in ("open", "close") and results[step["index"]].get("success"):
+            _execution_context.update(ctxs[step["index"]])
+            break
+
     messages = []
     overall_success = True
     is_automation = True
-
-    for part in parts:
-        res = _handle_single(part, _execution_context)
+    for res in results:
         # Normalize keys for caller compatibility
         is_automation = res.get("is_automation", True) and is_automation
-        success = res.get("success", False)
-        overall_success = overall_success and success
-        msg = res.get("message") or res.get("output") or str(res)
-        messages.append(msg)
-
-        if not success:
-            # stop on first failure or continue? Stop to mirror user expectation
-            break
+        overall_success = overall_success and res.get("success", False)
+        if res.get("skipped"):
+            continue
+        messages.append(res.get("message") or res.get("output") or str(res))
 
     return {
         "is_automation": is_automation,
@@ -130,7 +289,10 @@ def execute_command(command_str):
 def is_automation_command(command: str) -> bool:
     """Check if command is an automation command"""
     action, _ = parse_command(command)
-    return action is not None
+    if action is not None:
+        return True
+    parts = _split_compound(command)
+    return len(parts) > 1 and any(parse_command(p)[0] is not None for p in parts)
 
 
 if __name__ == "__main__":
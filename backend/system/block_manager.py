@@ -0,0 +1,337 @@
+"""
+App Block Manager
+Non-blocking app blocking: suspends processes, resumes them from a timer heap,
+supports many concurrent blocks and persists state so a restart can resume
+processes left suspended by a crash
+"""
+import os
+import json
+import time
+import heapq
+import queue
+import atexit
+import itertools
+import platform
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+import psutil
+
+# Where active blocks are persisted between runs
+BLOCK_STATE_PATH = os.getenv(
+    "BLOCK_STATE_PATH",
+    os.path.join(os.path.expanduser("~"), ".offline_assistant", "active_blocks.json")
+)
+
+
+def _tick_marks(seconds: int) -> List[int]:
+    """Remaining-seconds values at which the tick callback fires (same cadence as the old countdown)"""
+    return [r for r in range(seconds, 0, -1) if r == seconds or r % 5 == 0 or r <= 3]
+
+
+class BlockManager:
+    def __init__(self, state_path: str = BLOCK_STATE_PATH):
+        self.state_path = state_path
+        self._blocks: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[float, int, str, str, int]] = []  # (when, seq, kind, block_id, remaining)
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._thread = None
+        # Tick callbacks (spoken countdowns) run on their own thread so they never delay a resume
+        self._ticks: "queue.Queue[Tuple[str, int]]" = queue.Queue()
+        self._tick_thread = None
+
+    # ------------------------------------------------------------------
+    # Timer thread
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="block-manager", daemon=True)
+            self._thread.start()
+        if self._tick_thread is None or not self._tick_thread.is_alive():
+            self._tick_thread = threading.Thread(target=self._run_ticks, name="block-ticks", daemon=True)
+            self._tick_thread.start()
+
+    def _schedule(self, when: float, kind: str, block_id: str, remaining: int = 0):
+        heapq.heappush(self._heap, (when, next(self._seq), kind, block_id, remaining))
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                when, _, kind, block_id, remaining = self._heap[0]
+                delay = when - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                heapq.heappop(self._heap)
+                block = self._blocks.get(block_id)
+            if block is None:
+                continue  # released early
+            if kind == "resume":
+                self.release(block_id)
+            elif kind == "tick" and block.get("tick_callback"):
+                self._ticks.put((block_id, remaining))
+
+    def _run_ticks(self):
+        while True:
+            block_id, remaining = self._ticks.get()
+            with self._cond:
+                block = self._blocks.get(block_id)
+            if block is None:
+                continue  # released while earlier ticks were still speaking
+            try:
+                block["tick_callback"](remaining, block["seconds"], block["label"])
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _save(self):
+        state = {
+            bid: {k: v for k, v in b.items() if k != "tick_callback"}
+            for bid, b in self._blocks.items()
+        }
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp = self.state_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+        except Exception as e:
+            print(f"Block manager: could not save state: {e}")
+
+    def recover(self) -> Dict[str, Any]:
+        """Pick up blocks left behind by a previous run.
+
+        Expired blocks are resumed right away; blocks with time left are
+        re-adopted and resumed on schedule.
+        """
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {"success": True, "resumed": 0, "adopted": 0, "message": "No saved blocks"}
+        except Exception as e:
+            return {"success": False, "resumed": 0, "adopted": 0, "message": f"Could not read block state: {e}"}
+
+        resumed = adopted = 0
+        now = time.time()
+        with self._cond:
+            expired = []
+            for bid, block in state.items():
+                block["pids"] = [tuple(p) for p in block.get("pids", [])]
+                if block.get("resume_at", 0) <= now:
+                    expired.append(block)
+                    continue
+                block["tick_callback"] = None
+                self._blocks[bid] = block
+                self._schedule(block["resume_at"], "resume", bid)
+                adopted += 1
+            held = self._held_pids()
+            for block in expired:
+                resumed += self._resume_pids(p for p in block["pids"] if p[0] not in held)
+            self._save()
+            if adopted:
+                self._ensure_thread()
+        return {
+            "success": True,
+            "resumed": resumed,
+            "adopted": adopted,
+            "message": f"Resumed {resumed} orphaned process(es), re-adopted {adopted} active block(s)"
+        }
+
+    # ------------------------------------------------------------------
+    # Blocking
+    # ------------------------------------------------------------------
+
+    def _held_pids(self) -> set:
+        # Called with the lock held
+        return {p[0] for b in self._blocks.values() for p in b["pids"]}
+
+    @staticmethod
+    def _resume_pids(pids) -> int:
+        resumed = 0
+        for pid, _name, create_time in pids:
+            try:
+                p = psutil.Process(pid)
+                # Guard against pid reuse since the block was created
+                if create_time and abs(p.create_time() - create_time) > 1:
+                    continue
+                p.resume()
+                resumed += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return resumed
+
+    def block(self, app_names: List[str], seconds: int, tick_callback=None, label: str = None) -> Dict[str, Any]:
+        """Suspend matching processes now and schedule their resume; returns immediately"""
+        from system.system_control import _find_processes_by_name_part, _is_admin
+
+        seconds = max(0, int(seconds))
+        requested = [n.strip() for n in (app_names or []) if (n or "").strip()]
+        if not requested:
+            return {"success": False, "message": "No application names provided to block."}
+
+        # Never suspend the assistant itself or the shell it runs in
+        seen_pids = {os.getpid()}
+        try:
+            seen_pids.update(p.pid for p in psutil.Process().parents())
+        except Exception:
+            pass
+        procs: List[psutil.Process] = []
+        for name in requested:
+            for p in _find_processes_by_name_part(name):
+                if p.pid not in seen_pids:
+                    seen_pids.add(p.pid)
+                    procs.append(p)
+        if not procs:
+            return {"success": False, "message": f"No running processes matched: {', '.join(requested)}."}
+
+        suspended: List[Tuple[int, str, float]] = []  # (pid, name, create_time)
+        denied: List[Tuple[int, str]] = []
+        for p in procs:
+            try:
+                name = p.info.get('name') or p.name()
+                create_time = p.create_time()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            try:
+                p.suspend()
+                suspended.append((p.pid, name, create_time))
+            except psutil.AccessDenied:
+                denied.append((p.pid, name))
+            except psutil.NoSuchProcess:
+                continue
+            except Exception:
+                continue
+
+        if not suspended:
+            names = ', '.join(requested)
+            if denied and platform.system().lower() == 'windows' and not _is_admin():
+                details = ", ".join(f"{n}({pid})" for pid, n in denied[:5])
+                more = " ..." if len(denied) > 5 else ""
+                return {
+                    "success": False,
+                    "denied": denied,
+                    "message": (
+                        f"Found processes for {names} but could not suspend any due to permissions (e.g., {details}{more}). "
+                        f"Please run the terminal as Administrator and try again."
+                    )
+                }
+            return {"success": False, "denied": denied, "message": f"Found processes for {names}, but none could be suspended."}
+
+        now = time.time()
+        label = label or (", ".join(requested[:3]) + (" ..." if len(requested) > 3 else ""))
+        with self._cond:
+            block_id = str(next(self._ids))
+            while block_id in self._blocks:
+                block_id = str(next(self._ids))
+            self._blocks[block_id] = {
+                "id": block_id,
+                "names": requested,
+                "label": label,
+                "pids": suspended,
+                "seconds": seconds,
+                "started_at": now,
+                "resume_at": now + seconds,
+                "tick_callback": tick_callback,
+            }
+            self._schedule(now + seconds, "resume", block_id)
+            if tick_callback:
+                for remaining in _tick_marks(seconds):
+                    self._schedule(now + seconds - remaining, "tick", block_id, remaining)
+            self._save()
+            self._ensure_thread()
+
+        return {
+            "success": True,
+            "block_id": block_id,
+            "suspended": [(pid, name) for pid, name, _ in suspended],
+            "denied": denied,
+            "seconds": seconds,
+            "message": f"Blocking {label} for {seconds} seconds"
+        }
+
+    def release(self, block_id: str) -> Dict[str, Any]:
+        """Resume a block's processes now (on schedule or early)"""
+        with self._cond:
+            block = self._blocks.pop(block_id, None)
+            if block is not None:
+                self._save()
+                # Overlapping blocks share processes: keep those another block still holds suspended
+                held = self._held_pids()
+        if block is None:
+            return {"success": False, "message": f"No active block {block_id}"}
+        resumed = self._resume_pids(p for p in block["pids"] if p[0] not in held)
+        return {"success": True, "resumed": resumed, "message": f"Unblocked {block['label']} ({resumed} process(es) resumed)"}
+
+    def release_by_name(self, name: str) -> Dict[str, Any]:
+        """Release every active block that includes the given app name"""
+        target = (name or "").strip().lower()
+        with self._cond:
+            ids = [bid for bid, b in self._blocks.items()
+                   if any(target == n.lower() or target in n.lower() for n in b["names"])]
+        if not ids:
+            return {"success": False, "message": f"'{name}' is not blocked"}
+        resumed = sum(self.release(bid).get("resumed", 0) for bid in ids)
+        return {"success": True, "resumed": resumed, "message": f"Unblocked {name} ({resumed} process(es) resumed)"}
+
+    def release_all(self) -> int:
+        with self._cond:
+            ids = list(self._blocks)
+        return sum(self.release(bid).get("resumed", 0) for bid in ids)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Active blocks with their remaining time, soonest first"""
+        now = time.time()
+        with self._cond:
+            blocks = [
+                {
+                    "id": b["id"],
+                    "label": b["label"],
+                    "names": list(b["names"]),
+                    "processes": len(b["pids"]),
+                    "remaining": max(0, int(round(b["resume_at"] - now))),
+                }
+                for b in self._blocks.values()
+            ]
+        return sorted(blocks, key=lambda b: b["remaining"])
+
+    def is_blocked(self, pid: int) -> bool:
+        with self._cond:
+            return any(pid == p[0] for b in self._blocks.values() for p in b["pids"])
+
+
+# Global manager instance
+_block_manager = None
+_block_manager_lock = threading.Lock()
+
+
+def get_block_manager() -> BlockManager:
+    """Get or create the block manager (resumes everything on interpreter exit)"""
+    global _block_manager
+    with _block_manager_lock:
+        if _block_manager is None:
+            _block_manager = BlockManager()
+            atexit.register(_block_manager.release_all)
+        return _block_manager
+
+
+def format_block_status() -> str:
+    """Human-readable summary of active blocks"""
+    blocks = get_block_manager().status()
+    if not blocks:
+        return "No apps are blocked right now."
+    parts = []
+    for b in blocks:
+        mins, secs = divmod(b["remaining"], 60)
+        left = f"{mins}m {secs}s" if mins else f"{secs}s"
+        parts.append(f"{b['label']} ({b['processes']} process(es), {left} left)")
+    return "Blocked: " + "; ".join(parts)
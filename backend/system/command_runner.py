@@ -0,0 +1,361 @@
+"""
+Command Runner
+Keeps warm shell sessions (bash/sh, and PowerShell where present) and sends
+commands over pipes with sentinels instead of paying interpreter startup per
+call. Supports streamed output, per-command timeouts, output size caps and a
+small result cache for idempotent queries.
+On Windows, plain commands keep running through cmd.exe one at a time (its
+quoting and built-ins); PowerShell sessions are used when asked for by name.
+"""
+import os
+import sys
+import time
+import uuid
+import queue
+import shlex
+import shutil
+import signal
+import threading
+import subprocess
+from typing import Callable, Dict, Any, Optional
+
+# Defaults (overridable per call)
+DEFAULT_TIMEOUT = float(os.getenv("COMMAND_TIMEOUT", "60") or 60)
+MAX_OUTPUT_CHARS = int(os.getenv("COMMAND_MAX_OUTPUT", "65536") or 65536)
+# Time a new interpreter gets to come up; not charged to the command's own timeout
+STARTUP_TIMEOUT = float(os.getenv("COMMAND_STARTUP_TIMEOUT", "20") or 20)
+# How long read-only queries (current brightness, volume) may be answered from the cache
+QUERY_CACHE_TTL = float(os.getenv("COMMAND_CACHE_TTL", "2") or 2)
+
+IS_WINDOWS = sys.platform.startswith("win")
+
+
+def _powershell_exe() -> Optional[str]:
+    return shutil.which("pwsh") or shutil.which("powershell") or shutil.which("powershell.exe")
+
+
+def _posix_shell_exe() -> Optional[str]:
+    return shutil.which("bash") or shutil.which("sh")
+
+
+class ShellSession:
+    """One long-lived interpreter process fed commands through stdin"""
+
+    def __init__(self, kind: str):
+        self.kind = kind  # "bash" or "powershell"
+        self.proc = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._sentinel = f"__OA_DONE_{uuid.uuid4().hex}__"
+
+    # ------------------------------------------------------------------
+    # Process management
+    # ------------------------------------------------------------------
+
+    def _argv(self):
+        if self.kind == "powershell":
+            exe = _powershell_exe()
+            if not exe:
+                return None
+            return [exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"]
+        exe = _posix_shell_exe()
+        if not exe:
+            return None
+        return [exe, "--noprofile", "--norc"] if os.path.basename(exe) == "bash" else [exe]
+
+    def _start(self) -> bool:
+        argv = self._argv()
+        if argv is None:
+            return False
+        kwargs = {}
+        if IS_WINDOWS:
+            kwargs["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        else:
+            # Own process group so a timed-out command's children die with the shell
+            kwargs["start_new_session"] = True
+        self.proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            **kwargs
+        )
+        self._lines = queue.Queue()
+        reader = threading.Thread(target=self._reader, args=(self.proc, self._lines),
+                                  name=f"shell-{self.kind}-reader", daemon=True)
+        reader.start()
+        return self._ready()
+
+    def _ready(self, timeout: float = STARTUP_TIMEOUT) -> bool:
+        """Wait for the fresh interpreter to answer an empty command (cold PowerShell takes seconds)"""
+        try:
+            self.proc.stdin.write(self._wrap(""))
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            self.close()
+            return False
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._lines.get(timeout=max(0.0, remaining)) if remaining > 0 else None
+            except queue.Empty:
+                line = None
+            if line is None:
+                self.close()
+                return False
+            if self._sentinel in line:
+                return True
+
+    @staticmethod
+    def _reader(proc, lines):
+        try:
+            for line in proc.stdout:
+                lines.put(line)
+        except Exception:
+            pass
+        lines.put(None)  # EOF
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def close(self):
+        if self.proc is not None:
+            try:
+                if not IS_WINDOWS:
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                else:
+                    self.proc.kill()
+                self.proc.wait(timeout=2)
+            except Exception:
+                pass
+        self.proc = None
+
+    def _wrap(self, command: str) -> str:
+        if self.kind == "powershell":
+            # One line per command; $? reflects cmdlets, $LASTEXITCODE native programs
+            return (
+                f"$global:LASTEXITCODE = 0; try {{ & {{ {command} }} 2>&1 | Out-String -Stream -Width 4096 }} "
+                f"catch {{ $_ | Out-String -Stream }}; "
+                f"Write-Output (\"{self._sentinel} \" + $(if ($LASTEXITCODE) {{ $LASTEXITCODE }} elseif ($?) {{ 0 }} else {{ 1 }}))\n"
+            )
+        return f"eval {shlex.quote(command)} </dev/null 2>&1; printf '%s %d\\n' '{self._sentinel}' $?\n"
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def run(self, command: str, timeout: float = DEFAULT_TIMEOUT,
+            on_output: Optional[Callable[[str], None]] = None,
+            max_output: int = MAX_OUTPUT_CHARS) -> Dict[str, Any]:
+        with self._lock:
+            if not self.alive() and not self._start():
+                return {"success": False, "returncode": None, "output": f"{self.kind} is not available",
+                        "timed_out": False, "truncated": False, "elapsed": 0.0}
+            # The timeout covers the command only: a cold start must not make the session give up on itself
+            start = time.monotonic()
+            try:
+                self.proc.stdin.write(self._wrap(command))
+                self.proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                self.close()
+                return {"success": False, "returncode": None, "output": f"Shell session error: {e}",
+                        "timed_out": False, "truncated": False, "elapsed": 0.0}
+
+            chunks = []
+            size = 0
+            truncated = False
+            timed_out = False
+            returncode = None
+            deadline = start + timeout
+
+            def _emit(text):
+                nonlocal size, truncated
+                if not text:
+                    return
+                if on_output:
+                    try:
+                        on_output(text)
+                    except Exception:
+                        pass
+                if size < max_output:
+                    keep = text[:max_output - size]
+                    chunks.append(keep)
+                    size += len(keep)
+                    if len(keep) < len(text):
+                        truncated = True
+                else:
+                    truncated = True
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                try:
+                    line = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    timed_out = True
+                    break
+                if line is None:
+                    # The command ended the shell (e.g. "exit 3"); restart lazily next time
+                    try:
+                        returncode = self.proc.wait(timeout=2)
+                    except Exception:
+                        returncode = None
+                    self.proc = None
+                    break
+                idx = line.find(self._sentinel)
+                if idx != -1:
+                    _emit(line[:idx])
+                    try:
+                        returncode = int(line[idx + len(self._sentinel):].strip())
+                    except ValueError:
+                        returncode = None
+                    break
+                _emit(line)
+
+            if timed_out:
+                # The interpreter is stuck in the command; discard it
+                self.close()
+
+            output = "".join(chunks).rstrip()
+            if truncated:
+                output += f"\n... [output truncated at {max_output} characters]"
+            return {
+                "success": returncode == 0 and not timed_out,
+                "returncode": returncode,
+                "output": output,
+                "timed_out": timed_out,
+                "truncated": truncated,
+                "elapsed": round(time.monotonic() - start, 3),
+            }
+
+
+class CommandRunner:
+    """Routes commands to warm shell sessions and caches idempotent results"""
+
+    def __init__(self):
+        self._sessions: Dict[str, ShellSession] = {}
+        self._sessions_lock = threading.Lock()
+        self._cache: Dict[tuple, tuple] = {}       # (shell, command) -> (time, result, tag)
+        self._generations: Dict[str, int] = {}     # tag -> bumped by every invalidate()
+        self._cache_lock = threading.Lock()
+
+    def default_shell(self) -> str:
+        return "cmd" if IS_WINDOWS else "bash"
+
+    def available(self, shell: str) -> bool:
+        """Whether `shell` can be kept warm (cmd always runs one-shot)"""
+        if shell == "cmd":
+            return False
+        return bool(_powershell_exe() if shell == "powershell" else _posix_shell_exe())
+
+    def _session(self, shell: str) -> ShellSession:
+        with self._sessions_lock:
+            session = self._sessions.get(shell)
+            if session is None:
+                session = ShellSession(shell)
+                self._sessions[shell] = session
+            return session
+
+    def run(self, command: str, shell: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT,
+            on_output: Optional[Callable[[str], None]] = None, max_output: int = MAX_OUTPUT_CHARS,
+            cache_ttl: float = 0, cache_tag: Optional[str] = None) -> Dict[str, Any]:
+        """Run `command` in a warm session.
+
+        - `on_output(text)` receives output incrementally, line by line.
+        - `cache_ttl` > 0 marks the command as an idempotent query whose
+          successful result may be reused for that many seconds.
+        - `cache_tag` groups cached queries so the command that changes the
+          state they read can drop them with invalidate(tag=...).
+        """
+        shell = shell or self.default_shell()
+        key = (shell, command)
+        if cache_ttl > 0:
+            with self._cache_lock:
+                hit = self._cache.get(key)
+                generation = self._generations.get(cache_tag, 0)
+            if hit and time.monotonic() - hit[0] < cache_ttl:
+                result = dict(hit[1], cached=True)
+                if on_output and result.get("output"):
+                    on_output(result["output"] + "\n")
+                return result
+
+        if not self.available(shell):
+            result = _run_once(command, timeout, max_output)
+        else:
+            result = self._session(shell).run(command, timeout=timeout, on_output=on_output, max_output=max_output)
+        result["shell"] = shell
+        result["cached"] = False
+
+        if cache_ttl > 0 and result["success"]:
+            with self._cache_lock:
+                # A change invalidated while this query ran: its answer may already be stale
+                if self._generations.get(cache_tag, 0) == generation:
+                    self._cache[key] = (time.monotonic(), dict(result), cache_tag)
+                    if len(self._cache) > 128:
+                        oldest = min(self._cache, key=lambda k: self._cache[k][0])
+                        del self._cache[oldest]
+        return result
+
+    def invalidate(self, command: Optional[str] = None, tag: Optional[str] = None):
+        """Drop cached results: one command's, one tag's, or all of them"""
+        with self._cache_lock:
+            if command is None and tag is None:
+                self._cache.clear()
+                for name in self._generations:
+                    self._generations[name] += 1
+                return
+            if tag is not None:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in [k for k, v in self._cache.items()
+                        if (command is not None and k[1] == command) or (tag is not None and v[2] == tag)]:
+                del self._cache[key]
+
+    def warm_up(self, shell: Optional[str] = None):
+        """Start a session ahead of time so the first command doesn't pay startup"""
+        shell = shell or self.default_shell()
+        if self.available(shell):
+            self._session(shell).run("echo ready" if shell == "bash" else "'ready'", timeout=5)
+
+    def close(self):
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def _run_once(command: str, timeout: float, max_output: int) -> Dict[str, Any]:
+    """Fallback when no interpreter can be kept warm: one-shot shell process"""
+    start = time.monotonic()
+    try:
+        proc = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+        output = "\n".join(p for p in [(proc.stdout or "").strip(), (proc.stderr or "").strip()] if p)
+        truncated = len(output) > max_output
+        if truncated:
+            output = output[:max_output] + f"\n... [output truncated at {max_output} characters]"
+        return {"success": proc.returncode == 0, "returncode": proc.returncode, "output": output,
+                "timed_out": False, "truncated": truncated, "elapsed": round(time.monotonic() - start, 3)}
+    except subprocess.TimeoutExpired as e:
+        output = e.stdout if isinstance(e.stdout, str) else (e.stdout or b"").decode(errors="replace")
+        return {"success": False, "returncode": None, "output": output[:max_output].strip(),
+                "timed_out": True, "truncated": False, "elapsed": round(time.monotonic() - start, 3)}
+
+
+# Global runner instance
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_command_runner() -> CommandRunner:
+    """Get or create the shared command runner"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = CommandRunner()
+        return _runner
@@ -6,5 +6,8 @@ from . import apps
 from . import input_control
 from . import files
 from . import system_info
+from . import process_watch
+from . import volume
+from . import brightness
 
-__all__ = ['apps', 'input_control', 'files', 'system_info']
+__all__ = ['apps', 'input_control', 'files', 'system_info', 'process_watch', 'volume', 'brightness']
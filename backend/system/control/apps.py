@@ -6,9 +6,15 @@ import os
 import psutil
 import subprocess
 import time
-import winreg
 from typing import Dict, List, Any
 
+from .process_watch import snapshot_pids, wait_for_app
+
+try:
+    import winreg  # Windows only
+except ImportError:
+    winreg = None
+
 # Optional window focusing backends
 try:
     import pygetwindow as gw  # type: ignore
@@ -41,21 +47,18 @@ def open_app(name: str) -> Dict[str, Any]:
         try:
             # Use proper start command syntax for PowerShell/CMD
             cmd = f'start "" "{app_name}"'
+            baseline = snapshot_pids()
             result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=3)
-            time.sleep(1.5)
-            
-            # Verify if app started
-            for proc in psutil.process_iter(['name']):
-                try:
-                    proc_name = proc.info['name'].lower()
-                    if app_name in proc_name or proc_name.replace('.exe', '') == app_name:
-                        return {
-                            'success': True,
-                            'message': f'Successfully opened {name}',
-                            'app': name
-                        }
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+
+            # Verify the app started: return as soon as a matching process shows up
+            launch = wait_for_app(app_name, baseline=baseline, timeout=1.5)
+            if launch['success']:
+                return {
+                    'success': True,
+                    'message': f'Successfully opened {name}',
+                    'app': name,
+                    'proc': launch['pid']
+                }
         except subprocess.TimeoutExpired:
             # App might be starting, continue to verification
             pass
@@ -75,14 +78,17 @@ def open_app(name: str) -> Dict[str, Any]:
                     with winreg.OpenKey(hkey, subkey_path) as key:
                         with winreg.OpenKey(key, f"{app_name}.exe") as app_key:
                             app_path = winreg.QueryValue(app_key, None)
-                            subprocess.Popen(app_path, shell=True,
-                                           stdout=subprocess.DEVNULL,
-                                           stderr=subprocess.DEVNULL)
-                            time.sleep(1.5)
+                            baseline = snapshot_pids()
+                            child = subprocess.Popen(app_path, shell=True,
+                                                     stdout=subprocess.DEVNULL,
+                                                     stderr=subprocess.DEVNULL)
+                            launch = wait_for_app([app_name, app_path], pid=child.pid, baseline=baseline, timeout=1.5)
                             return {
                                 'success': True,
                                 'message': f'Successfully opened {name} from registry',
-                                'app': name
+                                'app': name,
+                                'proc': launch['pid'],
+                                'verified': launch['success']
                             }
                 except:
                     continue
@@ -104,14 +110,17 @@ def open_app(name: str) -> Dict[str, Any]:
                     for file in files:
                         if file.lower() == f"{app_name}.exe" or app_name in file.lower():
                             full_path = os.path.join(root, file)
-                            subprocess.Popen(full_path, shell=True,
-                                           stdout=subprocess.DEVNULL,
-                                           stderr=subprocess.DEVNULL)
-                            time.sleep(1.5)
+                            baseline = snapshot_pids()
+                            child = subprocess.Popen(full_path, shell=True,
+                                                     stdout=subprocess.DEVNULL,
+                                                     stderr=subprocess.DEVNULL)
+                            launch = wait_for_app([app_name, file], pid=child.pid, baseline=baseline, timeout=1.5)
                             return {
                                 'success': True,
                                 'message': f'Successfully opened {name} from {full_path}',
-                                'app': name
+                                'app': name,
+                                'proc': launch['pid'],
+                                'verified': launch['success']
                             }
                     # Limit search depth
                     if root.count(os.sep) - base_path.count(os.sep) > 2:
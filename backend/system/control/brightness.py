@@ -0,0 +1,393 @@
+"""
+Brightness Control Module
+Display brightness with the backlight discovered once and the current level
+cached, so relative steps don't re-query the hardware:
+- Linux: /sys/class/backlight read/written directly
+- Windows: one persistent WMI connection (PowerShell via the warm runner
+  when the wmi package is missing)
+- Tests: an in-memory fake backend
+Rapid repeated commands are coalesced into a single hardware write.
+"""
+import os
+import sys
+import time
+import threading
+from typing import Dict, Any, List, Optional
+
+try:
+    import wmi
+    import pythoncom
+    WMI_AVAILABLE = True
+except ImportError:
+    wmi = None
+    pythoncom = None
+    WMI_AVAILABLE = False
+
+# Force a backend by name ("sysfs", "wmi", "powershell", "fake")
+BRIGHTNESS_BACKEND = os.getenv("BRIGHTNESS_BACKEND", "").strip().lower()
+
+# Commands arriving within this window collapse into one write (seconds)
+COALESCE_WINDOW = float(os.getenv("BRIGHTNESS_COALESCE", "0.15") or 0.15)
+
+# Re-read the hardware after this long, in case brightness keys changed it
+CACHE_TTL = 30.0
+
+SYSFS_BACKLIGHT = "/sys/class/backlight"
+
+# Firmware interfaces are preferred over vendor/raw ones (same order as systemd)
+_SYSFS_TYPE_PRIORITY = {"firmware": 0, "platform": 1, "raw": 2}
+
+SYSFS_PERMISSION_HINT = ("add your user to the 'video' group or install a udev rule "
+                         "that makes /sys/class/backlight/*/brightness group-writable")
+
+
+def _clamp(level) -> int:
+    return max(0, min(100, int(round(level))))
+
+
+class BrightnessBackend:
+    """Interface: levels are integer percentages 0-100"""
+    name = "base"
+
+    def get(self) -> int:
+        raise NotImplementedError
+
+    def set(self, level: int) -> int:
+        """Apply the level and return what was applied"""
+        raise NotImplementedError
+
+
+class FakeBackend(BrightnessBackend):
+    """In-memory backend for tests"""
+    name = "fake"
+
+    def __init__(self, level: int = 50):
+        self.level = _clamp(level)
+        self.reads = 0
+        self.writes = 0
+
+    def get(self) -> int:
+        self.reads += 1
+        return self.level
+
+    def set(self, level: int) -> int:
+        self.writes += 1
+        self.level = _clamp(level)
+        return self.level
+
+
+class SysfsBackend(BrightnessBackend):
+    """Linux backlight class device; writing needs the video group or a udev rule"""
+    name = "sysfs"
+
+    def __init__(self, device_path: str):
+        self.device_path = device_path
+        self.device = os.path.basename(device_path)
+        with open(os.path.join(device_path, "max_brightness")) as f:
+            self.max_brightness = max(1, int(f.read().strip()))
+
+    @staticmethod
+    def discover(root: Optional[str] = None) -> Optional[str]:
+        """Pick the preferred writable backlight device under `root`.
+
+        Raises PermissionError when devices exist but none can be written
+        (the default for non-root users on most distributions).
+        """
+        root = root or SYSFS_BACKLIGHT
+        try:
+            names = os.listdir(root)
+        except OSError:
+            return None
+        candidates = []
+        readonly = []
+        for name in names:
+            path = os.path.join(root, name)
+            if not os.access(os.path.join(path, "brightness"), os.W_OK):
+                readonly.append(path)
+                continue
+            try:
+                with open(os.path.join(path, "type")) as f:
+                    kind = f.read().strip()
+            except OSError:
+                kind = "raw"
+            candidates.append((_SYSFS_TYPE_PRIORITY.get(kind, 3), name, path))
+        if candidates:
+            return min(candidates)[2]
+        if readonly:
+            raise PermissionError(f"Backlight {os.path.basename(readonly[0])} is not writable - {SYSFS_PERMISSION_HINT}")
+        return None
+
+    def get(self) -> int:
+        # actual_brightness reflects the hardware, brightness the last request
+        for fname in ("actual_brightness", "brightness"):
+            try:
+                with open(os.path.join(self.device_path, fname)) as f:
+                    return _clamp(int(f.read().strip()) * 100 / self.max_brightness)
+            except (OSError, ValueError):
+                continue
+        raise OSError(f"Cannot read brightness of {self.device}")
+
+    def set(self, level: int) -> int:
+        raw = round(_clamp(level) * self.max_brightness / 100)
+        try:
+            with open(os.path.join(self.device_path, "brightness"), "w") as f:
+                f.write(str(raw))
+        except PermissionError:
+            raise PermissionError(f"Permission denied writing {self.device} brightness - {SYSFS_PERMISSION_HINT}")
+        return _clamp(raw * 100 / self.max_brightness)
+
+
+class WmiBackend(BrightnessBackend):
+    """Windows WmiMonitorBrightness; one WMI connection per thread (COM apartments)"""
+    name = "wmi"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            pythoncom.CoInitialize()
+            conn = wmi.WMI(namespace="wmi")
+            self._local.conn = conn
+        return conn
+
+    def get(self) -> int:
+        return _clamp(self._conn().WmiMonitorBrightness()[0].CurrentBrightness)
+
+    def set(self, level: int) -> int:
+        level = _clamp(level)
+        self._conn().WmiMonitorBrightnessMethods()[0].WmiSetBrightness(level, 0)
+        return level
+
+
+class PowerShellBackend(BrightnessBackend):
+    """WMI through the persistent PowerShell session (no per-call startup)"""
+    name = "powershell"
+
+    def __init__(self):
+        from system.command_runner import get_command_runner, QUERY_CACHE_TTL
+        self._runner = get_command_runner()
+        self._query_ttl = QUERY_CACHE_TTL
+
+    def _run(self, script: str, cache_ttl: float = 0) -> str:
+        # Reads may come from the runner's cache; any change drops the cached reads
+        result = self._runner.run(script, shell="powershell", timeout=3, cache_ttl=cache_ttl, cache_tag="brightness")
+        if not cache_ttl:
+            self._runner.invalidate(tag="brightness")
+        if not result["success"]:
+            raise RuntimeError(result["output"] or "WMI brightness call failed")
+        return result["output"].strip()
+
+    def get(self) -> int:
+        return _clamp(float(self._run(
+            "(Get-CimInstance -Namespace root/WMI -ClassName WmiMonitorBrightness | Select-Object -First 1).CurrentBrightness",
+            cache_ttl=self._query_ttl
+        )))
+
+    def set(self, level: int) -> int:
+        level = _clamp(level)
+        self._run(
+            "Get-CimInstance -Namespace root/WMI -ClassName WmiMonitorBrightnessMethods | "
+            f"Select-Object -First 1 | Invoke-CimMethod -MethodName WmiSetBrightness "
+            f"-Arguments @{{Timeout=0; Brightness={level}}} | Out-Null"
+        )
+        return level
+
+
+def create_backend(name: Optional[str] = None, errors: Optional[List[str]] = None) -> Optional[BrightnessBackend]:
+    """Instantiate the named backend, or the first one that works on this machine.
+
+    Why each candidate was rejected is appended to `errors` when given.
+    """
+    name = (name or BRIGHTNESS_BACKEND or "").lower()
+    if name == "fake":
+        return FakeBackend()
+    if name:
+        order = [name]
+    elif sys.platform.startswith("win"):
+        order = ["wmi", "powershell"]
+    else:
+        order = ["sysfs"]
+
+    for candidate in order:
+        try:
+            if candidate == "sysfs":
+                path = SysfsBackend.discover()
+                if not path:
+                    continue
+                backend = SysfsBackend(path)
+            elif candidate == "wmi" and WMI_AVAILABLE:
+                backend = WmiBackend()
+            elif candidate == "powershell" and sys.platform.startswith("win"):
+                backend = PowerShellBackend()
+            else:
+                continue
+            backend.get()  # probe once: no backlight (desktop monitor) -> try the next
+            return backend
+        except Exception as e:
+            if errors is not None:
+                errors.append(str(e))
+            continue
+    return None
+
+
+class BrightnessController:
+    """Caches the current level and coalesces bursts of commands into one write"""
+
+    def __init__(self, backend: Optional[BrightnessBackend] = None,
+                 coalesce_window: float = COALESCE_WINDOW, cache_ttl: float = CACHE_TTL):
+        self._backend = backend
+        self._resolved = backend is not None
+        self.coalesce_window = coalesce_window
+        self.cache_ttl = cache_ttl
+        self._cond = threading.Condition()
+        self._level: Optional[int] = None   # last known / requested level
+        self._read_at = 0.0
+        self._pending: Optional[int] = None
+        self._deadline = 0.0
+        self._writing = False
+        self._last_error: Optional[str] = None
+        self._unavailable_reason: Optional[str] = None
+        self._thread = None
+
+    @property
+    def backend(self) -> Optional[BrightnessBackend]:
+        if not self._resolved:
+            with self._cond:
+                if not self._resolved:
+                    errors: List[str] = []
+                    self._backend = create_backend(errors=errors)
+                    self._unavailable_reason = errors[0] if errors else None
+                    self._resolved = True
+        return self._backend
+
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def _unavailable(self) -> Dict[str, Any]:
+        if self._unavailable_reason and "not writable" in self._unavailable_reason:
+            message = f"Brightness control needs permission: {self._unavailable_reason}"
+        else:
+            message = "No controllable display backlight found (external monitors need DDC/CI)"
+        return {"success": False, "level": None, "backend": None, "message": message}
+
+    def _current(self) -> int:
+        """Cached level, refreshed from the hardware only when stale (caller holds the lock)"""
+        if self._pending is not None:
+            return self._pending
+        if self._level is None or time.monotonic() - self._read_at > self.cache_ttl:
+            self._level = self.backend.get()
+            self._read_at = time.monotonic()
+        return self._level
+
+    # ------------------------------------------------------------------
+    # Coalescing writer
+    # ------------------------------------------------------------------
+
+    def _request(self, level: int):
+        """Queue a write; a burst inside the window ends up as one write (caller holds the lock)"""
+        if self._pending is None:
+            self._deadline = time.monotonic() + self.coalesce_window
+        self._pending = level
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._writer, name="brightness-writer", daemon=True)
+            self._thread.start()
+        self._cond.notify_all()
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                delay = self._deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                target = self._pending
+                self._pending = None
+                self._writing = True
+            try:
+                applied = self.backend.set(target)
+                error = None
+            except Exception as e:
+                applied, error = None, str(e)
+            with self._cond:
+                self._writing = False
+                self._last_error = error
+                if applied is not None and self._pending is None:
+                    self._level = applied
+                    self._read_at = time.monotonic()
+                elif error:
+                    self._level = None  # unknown now; re-read next time
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until queued writes have reached the hardware; False if one failed"""
+        end = time.monotonic() + timeout
+        with self._cond:
+            while self._pending is not None or self._writing:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+            return self._last_error is None
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def _do(self, fn, message, wait: bool = False) -> Dict[str, Any]:
+        backend = self.backend
+        if backend is None:
+            return self._unavailable()
+        try:
+            with self._cond:
+                level = fn()
+        except Exception as e:
+            return {"success": False, "level": None, "backend": backend.name,
+                    "message": f"Brightness control error: {e}"}
+        if wait:
+            # Waits out the coalescing window: commands arriving together share one write,
+            # and each reports the level that write left the display at
+            if not self.flush(timeout=self.coalesce_window + 2.0):
+                error = self._last_error or "the write did not finish in time"
+                return {"success": False, "level": None, "backend": backend.name,
+                        "message": f"Could not change brightness: {error}"}
+            with self._cond:
+                if self._level is not None:
+                    level = self._level
+        return {"success": True, "level": level, "backend": backend.name, "message": message(level)}
+
+    def get(self) -> Dict[str, Any]:
+        return self._do(self._current, lambda lvl: f"Current brightness: {lvl}%")
+
+    def set(self, level: int, wait: bool = False) -> Dict[str, Any]:
+        """Request a level; `wait` returns once the (coalesced) write is done and reports a failure"""
+        def _set():
+            target = _clamp(level)
+            self._request(target)
+            return target
+        return self._do(_set, lambda lvl: f"Brightness set to {lvl}%", wait)
+
+    def change(self, delta: int, wait: bool = False) -> Dict[str, Any]:
+        def _change():
+            target = _clamp(self._current() + delta)
+            self._request(target)
+            return target
+        verb = "increased" if delta >= 0 else "decreased"
+        return self._do(_change, lambda lvl: f"Brightness {verb} to {lvl}%", wait)
+
+
+# Global controller instance
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_brightness_controller() -> BrightnessController:
+    """Get or create the shared brightness controller (device discovered on first use)"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = BrightnessController()
+        return _controller
@@ -0,0 +1,206 @@
+"""
+Process Watch Module
+Launch verification that waits for a spawned app to actually appear
+(by pid, descendants, new processes or a visible window) instead of sleeping
+"""
+import os
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set, Union
+
+import psutil
+
+# Window enumeration is only available on Windows
+try:
+    import ctypes
+    from ctypes import wintypes
+    _user32 = ctypes.windll.user32
+except Exception:
+    ctypes = None
+    wintypes = None
+    _user32 = None
+
+# Default deadline for launch verification (seconds)
+DEFAULT_TIMEOUT = float(os.getenv("LAUNCH_VERIFY_TIMEOUT", "3.0") or 3.0)
+
+# Polling backoff: start very short, double up to a small ceiling
+_INITIAL_DELAY = 0.01
+_MAX_DELAY = 0.2
+
+# An app that was already running (single-instance apps hand the launch over
+# to the existing process) is accepted after this grace period
+_REUSE_GRACE = 0.5
+
+# Intermediate launchers that should not count as "the app"
+_SHELL_NAMES = {'cmd.exe', 'conhost.exe', 'sh', 'bash', 'dash', 'zsh', 'powershell.exe', 'pwsh.exe', 'pwsh'}
+
+
+def snapshot_pids() -> Set[int]:
+    """Return the set of currently running pids (cheap, no per-process reads)"""
+    try:
+        return set(psutil.pids())
+    except Exception:
+        return set()
+
+
+def _normalize(name: str) -> str:
+    name = (name or '').strip().lower()
+    if name.endswith('.exe'):
+        name = name[:-4]
+    return os.path.basename(name)
+
+
+def _name_matches(proc_name: str, targets: List[str]) -> bool:
+    pname = _normalize(proc_name)
+    if not pname:
+        return False
+    for t in targets:
+        if t and (t in pname or pname == t):
+            return True
+    return False
+
+
+def _proc_name(pid: int) -> str:
+    try:
+        return psutil.Process(pid).name() or ''
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return ''
+
+
+def _family(pid: int) -> List[int]:
+    """Return pid and all of its live descendants"""
+    try:
+        proc = psutil.Process(pid)
+        pids = [proc.pid]
+        for child in proc.children(recursive=True):
+            pids.append(child.pid)
+        return pids
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return []
+
+
+def _window_pids() -> Optional[Set[int]]:
+    """Return pids owning a visible top-level window, or None when unsupported"""
+    if _user32 is None:
+        return None
+    owners: Set[int] = set()
+    try:
+        @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        def _enum(hwnd, _lparam):
+            try:
+                if _user32.IsWindowVisible(hwnd):
+                    pid = wintypes.DWORD()
+                    _user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+                    owners.add(pid.value)
+            except Exception:
+                pass
+            return True
+
+        _user32.EnumWindows(_enum, 0)
+        return owners
+    except Exception:
+        return None
+
+
+def wait_for_app(names: Union[str, Iterable[str]], pid: Optional[int] = None,
+                 baseline: Optional[Set[int]] = None, timeout: float = DEFAULT_TIMEOUT,
+                 require_window: bool = False) -> Dict[str, Any]:
+    """Wait until a launched application is up, returning as soon as it is.
+
+    - `pid`: the spawned child; it and its descendants are tracked directly.
+    - `baseline`: pids captured with snapshot_pids() before launching; only
+      processes that are new since then are examined on each poll.
+    - Without either, running processes are scanned for a matching name.
+    - `require_window`: on Windows, also wait for a visible window.
+
+    Polls with a short exponential backoff until `timeout` expires.
+    """
+    if isinstance(names, str):
+        names = [names]
+    targets = [_normalize(n) for n in names if n]
+    start = time.monotonic()
+    deadline = start + max(0.0, timeout)
+    delay = _INITIAL_DELAY
+    seen = set(baseline) if baseline is not None else None
+    candidates: List[int] = []
+    existing: Optional[List[int]] = None
+    method = None
+
+    while True:
+        # 1) The spawned child and its descendants
+        if pid is not None and not candidates:
+            family = _family(pid)
+            matched = [p for p in family if _name_matches(_proc_name(p), targets)]
+            if not matched:
+                # Any non-shell descendant; an empty name (lookup failed) proves nothing
+                family_names = {p: _proc_name(p).lower() for p in family}
+                matched = [p for p in family if family_names[p] and family_names[p] not in _SHELL_NAMES]
+            if matched:
+                candidates, method = matched, 'pid'
+
+        # 2) Processes that appeared since the baseline snapshot
+        if seen is not None and not candidates:
+            current = snapshot_pids()
+            new_pids = current - seen
+            seen = current
+            matched = [p for p in new_pids if _name_matches(_proc_name(p), targets)]
+            if matched:
+                candidates, method = matched, 'new_process'
+
+        # 3) No pid or baseline: plain name scan
+        if pid is None and seen is None and not candidates:
+            matched = []
+            for proc in psutil.process_iter(['pid', 'name']):
+                try:
+                    if _name_matches(proc.info.get('name') or '', targets):
+                        matched.append(proc.info['pid'])
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            if matched:
+                candidates, method = matched, 'name'
+
+        if candidates:
+            if not require_window:
+                break
+            owners = _window_pids()
+            if owners is None:
+                break
+            windowed = [p for p in candidates if p in owners]
+            if windowed:
+                candidates, method = windowed, 'window'
+                break
+
+        now = time.monotonic()
+
+        # Single-instance apps: the launch was handed to an already running process
+        if seen is not None and not candidates and now - start >= _REUSE_GRACE:
+            if existing is None:
+                existing = [p for p in (baseline or ()) if _name_matches(_proc_name(p), targets)]
+            if existing:
+                candidates, method = existing, 'existing'
+                break
+
+        if now >= deadline:
+            return {
+                'success': False,
+                'pid': candidates[0] if candidates else None,
+                'pids': candidates,
+                'elapsed': round(now - start, 3),
+                'method': method or 'timeout'
+            }
+
+        time.sleep(min(delay, deadline - now))
+        delay = min(delay * 2, _MAX_DELAY)
+
+    return {
+        'success': True,
+        'pid': candidates[0],
+        'pids': candidates,
+        'elapsed': round(time.monotonic() - start, 3),
+        'method': method
+    }
+
+
+def wait_for_window(names: Union[str, Iterable[str]], pid: Optional[int] = None,
+                    timeout: float = 1.0) -> Dict[str, Any]:
+    """Wait until the app owns a visible window (returns immediately off Windows)"""
+    return wait_for_app(names, pid=pid, timeout=timeout, require_window=True)
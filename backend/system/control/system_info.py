@@ -4,18 +4,50 @@ Handles system monitoring and information retrieval
 """
 import psutil
 import platform
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# Background sampler (needs NumPy); without it metrics are read on demand
+try:
+    from system.metrics_sampler import get_metrics_sampler
+    from system.metrics_store import get_metrics_store, parse_period
+    SAMPLER_AVAILABLE = True
+except ImportError:
+    SAMPLER_AVAILABLE = False
+
+
+def _latest_sample() -> Optional[Dict[str, Any]]:
+    """Latest background sample, or None when the sampler can't be used"""
+    if not SAMPLER_AVAILABLE:
+        return None
+    sampler = get_metrics_sampler()
+    sampler.wait_ready(timeout=0.5)
+    return sampler.latest()
+
+
+def _format_rate(bytes_per_sec: float) -> str:
+    for unit in ('B/s', 'KB/s', 'MB/s'):
+        if bytes_per_sec < 1024:
+            return f'{bytes_per_sec:.1f} {unit}'
+        bytes_per_sec /= 1024
+    return f'{bytes_per_sec:.1f} GB/s'
 
 
 def get_cpu_usage() -> Dict[str, Any]:
-    """Get CPU usage"""
+    """Get CPU usage (latest background sample, no blocking measurement)"""
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
+        sample = _latest_sample()
         cpu_count = psutil.cpu_count()
+        if sample is not None:
+            cpu_percent = round(sample['cpu'], 1)
+            per_core = sample['per_core']
+        else:
+            per_core = psutil.cpu_percent(interval=0.1, percpu=True)
+            cpu_percent = round(sum(per_core) / len(per_core), 1) if per_core else 0.0
         return {
             'success': True,
             'cpu_percent': cpu_percent,
             'cpu_count': cpu_count,
+            'per_core': per_core,
             'message': f'CPU usage: {cpu_percent}% ({cpu_count} cores)'
         }
     except Exception as e:
@@ -121,7 +153,7 @@ def get_network_info() -> Dict[str, Any]:
     """Get network information"""
     try:
         net_io = psutil.net_io_counters()
-        return {
+        result = {
             'success': True,
             'bytes_sent': net_io.bytes_sent,
             'bytes_recv': net_io.bytes_recv,
@@ -131,6 +163,14 @@ def get_network_info() -> Dict[str, Any]:
             'bytes_recv_mb': round(net_io.bytes_recv / (1024**2), 2),
             'message': f'Network: {round(net_io.bytes_recv / (1024**2), 2)} MB received, {round(net_io.bytes_sent / (1024**2), 2)} MB sent'
         }
+        if SAMPLER_AVAILABLE:
+            sampler = get_metrics_sampler()
+            recv, sent = sampler.rate('net_recv'), sampler.rate('net_sent')
+            if recv is not None and sent is not None:
+                result['recv_per_sec'] = recv
+                result['sent_per_sec'] = sent
+                result['message'] += f' (now {_format_rate(recv)} down, {_format_rate(sent)} up)'
+        return result
     except Exception as e:
         return {
             'success': False,
@@ -138,6 +178,97 @@ def get_network_info() -> Dict[str, Any]:
         }
 
 
+def get_cpu_average(seconds: float = 300) -> Dict[str, Any]:
+    """Average and peak CPU usage over the last `seconds`"""
+    if not SAMPLER_AVAILABLE:
+        return {'success': False, 'message': 'CPU history needs NumPy (pip install numpy)'}
+    try:
+        sampler = get_metrics_sampler()
+        sampler.wait_ready(timeout=0.5)
+        ts, _values = sampler.window('cpu', seconds)
+        average = sampler.average('cpu', seconds)
+        if average is None:
+            return {'success': False, 'message': 'No CPU samples recorded yet'}
+        peak = sampler.peak('cpu', seconds)
+        covered = float(ts[-1] - ts[0]) if len(ts) > 1 else 0.0
+        span = f'{int(seconds // 60)} minutes' if seconds >= 120 else f'{int(seconds)} seconds'
+        note = '' if covered >= seconds * 0.9 else f' (only {int(covered)}s of history so far)'
+        return {
+            'success': True,
+            'average': round(average, 1),
+            'peak': round(peak, 1),
+            'seconds': seconds,
+            'covered_seconds': round(covered, 1),
+            'message': f'Average CPU over the last {span}: {average:.1f}% (peak {peak:.1f}%){note}'
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Failed to get CPU history: {str(e)}'
+        }
+
+
+def get_network_throughput(seconds: float = 5) -> Dict[str, Any]:
+    """Network throughput in bytes/s over the last `seconds`"""
+    if not SAMPLER_AVAILABLE:
+        return {'success': False, 'message': 'Network throughput needs NumPy (pip install numpy)'}
+    try:
+        sampler = get_metrics_sampler()
+        sampler.wait_ready(timeout=0.5)
+        recv, sent = sampler.rate('net_recv', seconds), sampler.rate('net_sent', seconds)
+        if recv is None or sent is None:
+            return {'success': False, 'message': 'Not enough network samples yet, try again in a second'}
+        return {
+            'success': True,
+            'recv_per_sec': recv,
+            'sent_per_sec': sent,
+            'message': f'Network: {_format_rate(recv)} down, {_format_rate(sent)} up'
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Failed to get network throughput: {str(e)}'
+        }
+
+
+def get_cpu_history(period: str = "today") -> Dict[str, Any]:
+    """What used the CPU during a period ("this afternoon", "yesterday", "last 3 hours")"""
+    if not SAMPLER_AVAILABLE:
+        return {'success': False, 'message': 'Metrics history needs NumPy (pip install numpy)'}
+    try:
+        start, end, label = parse_period(period)
+        summary = get_metrics_store().summarize(start.timestamp(), end.timestamp())
+        if not summary['success']:
+            return {'success': False, 'message': f'No metrics recorded for {label}'}
+        top = ', '.join(f'{name} ({cpu:.1f}%)' for name, cpu in summary['top']) or 'nothing stood out'
+        summary['period'] = label
+        summary['message'] = (
+            f"{label[0].upper() + label[1:]} ({start:%H:%M}-{end:%H:%M}) CPU averaged {summary['cpu_avg']:.1f}% "
+            f"(peak {summary['cpu_max']:.1f}%). Top: {top}"
+        )
+        return summary
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Failed to read metrics history: {str(e)}'
+        }
+
+
+def export_metrics(path: Optional[str] = None) -> Dict[str, Any]:
+    """Export recorded per-minute metrics to CSV (or JSON if the path ends in .json)"""
+    if not SAMPLER_AVAILABLE:
+        return {'success': False, 'message': 'Metrics history needs NumPy (pip install numpy)'}
+    try:
+        store = get_metrics_store()
+        store.flush()
+        return store.export(path)
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Failed to export metrics: {str(e)}'
+        }
+
+
 def get_full_system_status() -> Dict[str, Any]:
     """Get complete system status"""
     try:
@@ -0,0 +1,362 @@
+"""
+Volume Control Module
+In-process master-volume control behind one small interface:
+- Windows: pycaw (Core Audio endpoint, handle cached per thread)
+- Linux: pulsectl (PulseAudio / PipeWire-pulse) or pyalsaaudio, then
+  wpctl / pactl / amixer through the warm command runner
+- Tests: an in-memory fake backend
+"""
+import os
+import re
+import sys
+import threading
+from typing import Dict, Any, Optional
+
+try:
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    import comtypes
+    from comtypes import CLSCTX_ALL
+    from ctypes import cast, POINTER
+    PYCAW_AVAILABLE = True
+except Exception:
+    PYCAW_AVAILABLE = False
+
+try:
+    import pulsectl
+    PULSECTL_AVAILABLE = True
+except ImportError:
+    PULSECTL_AVAILABLE = False
+
+try:
+    import alsaaudio
+    ALSA_AVAILABLE = True
+except ImportError:
+    ALSA_AVAILABLE = False
+
+# Force a backend by name ("pycaw", "pulse", "alsa", "cli", "fake")
+VOLUME_BACKEND = os.getenv("VOLUME_BACKEND", "").strip().lower()
+
+
+def _clamp(level) -> int:
+    return max(0, min(100, int(round(level))))
+
+
+class VolumeBackend:
+    """Interface: levels are integer percentages 0-100"""
+    name = "base"
+
+    def get(self) -> int:
+        raise NotImplementedError
+
+    def set(self, level: int) -> int:
+        """Set the level and return the level the device actually reports"""
+        raise NotImplementedError
+
+    def is_muted(self) -> bool:
+        raise NotImplementedError
+
+    def set_muted(self, muted: bool) -> bool:
+        raise NotImplementedError
+
+
+class FakeBackend(VolumeBackend):
+    """In-memory backend for tests and machines without audio"""
+    name = "fake"
+
+    def __init__(self, level: int = 50, muted: bool = False):
+        self.level = _clamp(level)
+        self.muted = muted
+        self.calls = 0
+
+    def get(self) -> int:
+        self.calls += 1
+        return self.level
+
+    def set(self, level: int) -> int:
+        self.calls += 1
+        self.level = _clamp(level)
+        return self.level
+
+    def is_muted(self) -> bool:
+        return self.muted
+
+    def set_muted(self, muted: bool) -> bool:
+        self.calls += 1
+        self.muted = bool(muted)
+        return self.muted
+
+
+class PycawBackend(VolumeBackend):
+    """Windows Core Audio; the endpoint handle is created once per thread (COM apartments)"""
+    name = "pycaw"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _endpoint(self):
+        endpoint = getattr(self._local, "endpoint", None)
+        if endpoint is None:
+            comtypes.CoInitialize()
+            speakers = AudioUtilities.GetSpeakers()
+            endpoint = getattr(speakers, "EndpointVolume", None)  # pycaw >= 20240316
+            if endpoint is None:
+                interface = speakers.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                endpoint = cast(interface, POINTER(IAudioEndpointVolume))
+            self._local.endpoint = endpoint
+        return endpoint
+
+    def _call(self, fn):
+        try:
+            return fn(self._endpoint())
+        except Exception:
+            # Default device changed (headset plugged in...): rebind once
+            self._local.endpoint = None
+            return fn(self._endpoint())
+
+    def get(self) -> int:
+        return _clamp(self._call(lambda ep: ep.GetMasterVolumeLevelScalar()) * 100)
+
+    def set(self, level: int) -> int:
+        self._call(lambda ep: ep.SetMasterVolumeLevelScalar(_clamp(level) / 100.0, None))
+        return self.get()
+
+    def is_muted(self) -> bool:
+        return bool(self._call(lambda ep: ep.GetMute()))
+
+    def set_muted(self, muted: bool) -> bool:
+        self._call(lambda ep: ep.SetMute(1 if muted else 0, None))
+        return self.is_muted()
+
+
+class PulseBackend(VolumeBackend):
+    """PulseAudio / PipeWire (pipewire-pulse) via one persistent pulsectl connection"""
+    name = "pulse"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pulse = pulsectl.Pulse("offline-assistant")
+
+    def _sink(self):
+        return self._pulse.get_sink_by_name(self._pulse.server_info().default_sink_name)
+
+    def get(self) -> int:
+        with self._lock:
+            return _clamp(self._pulse.volume_get_all_chans(self._sink()) * 100)
+
+    def set(self, level: int) -> int:
+        with self._lock:
+            sink = self._sink()
+            self._pulse.volume_set_all_chans(sink, _clamp(level) / 100.0)
+            return _clamp(self._pulse.volume_get_all_chans(self._sink()) * 100)
+
+    def is_muted(self) -> bool:
+        with self._lock:
+            return bool(self._sink().mute)
+
+    def set_muted(self, muted: bool) -> bool:
+        with self._lock:
+            self._pulse.mute(self._sink(), bool(muted))
+            return bool(self._sink().mute)
+
+
+class AlsaBackend(VolumeBackend):
+    """ALSA mixer control (Master, falling back to PCM)"""
+    name = "alsa"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        controls = alsaaudio.mixers()
+        self._control = "Master" if "Master" in controls else "PCM"
+        self._mixer = alsaaudio.Mixer(self._control)
+
+    def get(self) -> int:
+        with self._lock:
+            self._mixer.handleevents()
+            levels = self._mixer.getvolume()
+            return _clamp(sum(levels) / len(levels)) if levels else 0
+
+    def set(self, level: int) -> int:
+        with self._lock:
+            self._mixer.setvolume(_clamp(level))
+        return self.get()
+
+    def is_muted(self) -> bool:
+        with self._lock:
+            try:
+                return any(self._mixer.getmute())
+            except alsaaudio.ALSAAudioError:
+                return False
+
+    def set_muted(self, muted: bool) -> bool:
+        with self._lock:
+            self._mixer.setmute(1 if muted else 0)
+        return self.is_muted()
+
+
+class CliBackend(VolumeBackend):
+    """wpctl / pactl / amixer through the persistent shell session (no per-call shell startup)"""
+    name = "cli"
+
+    _COMMANDS = {
+        "wpctl": {
+            "get": "wpctl get-volume @DEFAULT_AUDIO_SINK@",
+            "set": "wpctl set-volume @DEFAULT_AUDIO_SINK@ {level}%",
+            "mute": "wpctl set-mute @DEFAULT_AUDIO_SINK@ {flag}",
+        },
+        "pactl": {
+            "get": "pactl get-sink-volume @DEFAULT_SINK@; pactl get-sink-mute @DEFAULT_SINK@",
+            "set": "pactl set-sink-volume @DEFAULT_SINK@ {level}%",
+            "mute": "pactl set-sink-mute @DEFAULT_SINK@ {flag}",
+        },
+        "amixer": {
+            "get": "amixer -M get Master",
+            "set": "amixer -M -q set Master {level}%",
+            "mute": "amixer -q set Master {switch}",
+        },
+    }
+
+    def __init__(self, tool: str):
+        from system.command_runner import get_command_runner, QUERY_CACHE_TTL
+        self.tool = tool
+        self._runner = get_command_runner()
+        self._query_ttl = QUERY_CACHE_TTL
+        self.name = f"cli:{tool}"
+
+    def _run(self, key: str, **fmt) -> str:
+        # Reads may come from the runner's cache; any change drops the cached reads
+        result = self._runner.run(self._COMMANDS[self.tool][key].format(**fmt), shell="bash", timeout=3,
+                                  cache_ttl=self._query_ttl if key == "get" else 0, cache_tag="volume")
+        if key != "get":
+            self._runner.invalidate(tag="volume")
+        if not result["success"]:
+            raise RuntimeError(result["output"] or f"{self.tool} failed")
+        return result["output"]
+
+    def _read(self):
+        out = self._run("get")
+        if self.tool == "wpctl":
+            m = re.search(r"Volume:\s*([\d.]+)", out)
+            return _clamp(float(m.group(1)) * 100) if m else 0, "MUTED" in out
+        levels = [int(v) for v in re.findall(r"(\d+)%", out)]
+        level = _clamp(sum(levels) / len(levels)) if levels else 0
+        muted = "Mute: yes" in out if self.tool == "pactl" else "[off]" in out
+        return level, muted
+
+    def get(self) -> int:
+        return self._read()[0]
+
+    def set(self, level: int) -> int:
+        self._run("set", level=_clamp(level))
+        return self.get()
+
+    def is_muted(self) -> bool:
+        return self._read()[1]
+
+    def set_muted(self, muted: bool) -> bool:
+        self._run("mute", flag=1 if muted else 0, switch="mute" if muted else "unmute")
+        return self.is_muted()
+
+
+def _cli_tool() -> Optional[str]:
+    import shutil
+    for tool in ("wpctl", "pactl", "amixer"):
+        if shutil.which(tool):
+            return tool
+    return None
+
+
+def create_backend(name: Optional[str] = None) -> Optional[VolumeBackend]:
+    """Instantiate the named backend, or the first one that works on this machine"""
+    name = (name or VOLUME_BACKEND or "").lower()
+    if name == "fake":
+        return FakeBackend()
+    if name:
+        order = [name]
+    elif sys.platform.startswith("win"):
+        order = ["pycaw"]
+    else:
+        order = ["pulse", "alsa", "cli"]
+
+    for candidate in order:
+        try:
+            if candidate == "pycaw" and PYCAW_AVAILABLE:
+                backend = PycawBackend()
+            elif candidate == "pulse" and PULSECTL_AVAILABLE:
+                backend = PulseBackend()
+            elif candidate == "alsa" and ALSA_AVAILABLE:
+                backend = AlsaBackend()
+            elif candidate == "cli" and _cli_tool():
+                backend = CliBackend(_cli_tool())
+            else:
+                continue
+            backend.get()  # probe once so a dead backend is skipped now, not per command
+            return backend
+        except Exception:
+            continue
+    return None
+
+
+class VolumeController:
+    """Long-lived front end over one backend; all methods return result dicts"""
+
+    def __init__(self, backend: Optional[VolumeBackend] = None):
+        self._backend = backend
+        self._resolved = backend is not None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> Optional[VolumeBackend]:
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    self._backend = create_backend()
+                    self._resolved = True
+        return self._backend
+
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def _do(self, fn, message) -> Dict[str, Any]:
+        backend = self.backend
+        if backend is None:
+            return {"success": False, "level": None, "muted": None, "backend": None,
+                    "message": "No volume backend available (install pycaw on Windows, pulsectl or pyalsaaudio on Linux)"}
+        try:
+            level = fn(backend)
+            muted = backend.is_muted()
+            return {"success": True, "level": level, "muted": muted, "backend": backend.name,
+                    "message": message(level, muted)}
+        except Exception as e:
+            return {"success": False, "level": None, "muted": None, "backend": backend.name,
+                    "message": f"Volume control error: {e}"}
+
+    def get(self) -> Dict[str, Any]:
+        return self._do(lambda b: b.get(),
+                        lambda lvl, muted: f"Current volume: {lvl}%" + (" (muted)" if muted else ""))
+
+    def set(self, level: int) -> Dict[str, Any]:
+        return self._do(lambda b: b.set(_clamp(level)), lambda lvl, _m: f"Volume set to {lvl}%")
+
+    def change(self, delta: int) -> Dict[str, Any]:
+        verb = "increased" if delta >= 0 else "decreased"
+        return self._do(lambda b: b.set(_clamp(b.get() + delta)), lambda lvl, _m: f"Volume {verb} to {lvl}%")
+
+    def toggle_mute(self) -> Dict[str, Any]:
+        def _toggle(b):
+            b.set_muted(not b.is_muted())
+            return b.get()
+        return self._do(_toggle, lambda lvl, muted: "Volume muted" if muted else f"Volume unmuted ({lvl}%)")
+
+
+# Global controller instance
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_volume_controller() -> VolumeController:
+    """Get or create the shared volume controller (backend chosen on first use)"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = VolumeController()
+        return _controller
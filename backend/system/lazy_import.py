@@ -0,0 +1,236 @@
+"""
+Lazy Imports
+Module and attribute proxies that import their target on first use, so the
+assistant can reach its prompt without paying for TTS, date parsing, NLP,
+database drivers or RAG up front. Every deferred import is timed, and
+profile_startup() measures what a module costs to import in a fresh
+interpreter (python -X importtime), grouped by top-level package.
+
+Usage:
+    requests = lazy_module("requests")
+    ask_ai, = lazy_from("ai.brain", "ask_ai")
+
+    python backend/system/lazy_import.py main_clean      # startup import profile
+"""
+import os
+import sys
+import time
+import threading
+import importlib
+import importlib.util
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+
+# Loaded lazy modules: name -> {'seconds', 'loaded_at', 'error'}
+_loads: Dict[str, Dict[str, Any]] = {}
+_lock = threading.RLock()
+
+
+def _load(name: str):
+    """Import `name` once, recording how long the deferred import took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        t0 = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+        except Exception as e:
+            _loads[name] = {'seconds': time.perf_counter() - t0, 'loaded_at': time.time(), 'error': str(e)}
+            raise
+        _loads[name] = {'seconds': time.perf_counter() - t0, 'loaded_at': time.time(), 'error': None}
+        return module
+
+
+class LazyModule:
+    """Stands in for a module until an attribute is first read or written"""
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_module', None)
+
+    def _lazy_resolve(self):
+        module = object.__getattribute__(self, '_lazy_module')
+        if module is None:
+            module = _load(object.__getattribute__(self, '_lazy_name'))
+            object.__setattr__(self, '_lazy_module', module)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._lazy_resolve(), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(self._lazy_resolve(), attr, value)
+
+    def __dir__(self):
+        return dir(self._lazy_resolve())
+
+    def __repr__(self):
+        name = object.__getattribute__(self, '_lazy_name')
+        state = 'loaded' if object.__getattribute__(self, '_lazy_module') is not None else 'not loaded'
+        return f"<lazy module '{name}' ({state})>"
+
+
+class LazyAttr:
+    """Stands in for `from module import attr`; resolves on first call or attribute access"""
+
+    def __init__(self, module: str, attr: str):
+        self._module = module
+        self._attr = attr
+        self._target = None
+
+    def resolve(self):
+        if self._target is None:
+            self._target = getattr(_load(self._module), self._attr)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str):
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        return f"<lazy {self._module}.{self._attr}>"
+
+
+def lazy_module(name: str) -> Any:
+    """Proxy for module `name`; the real module when it is already imported"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def lazy_from(module: str, *attrs: str) -> Tuple[Any, ...]:
+    """Proxies for `from module import a, b`; the real objects when already imported"""
+    loaded = sys.modules.get(module)
+    if loaded is not None:
+        return tuple(getattr(loaded, attr) for attr in attrs)
+    return tuple(LazyAttr(module, attr) for attr in attrs)
+
+
+def is_loaded(proxy: Any) -> bool:
+    if isinstance(proxy, LazyModule):
+        return object.__getattribute__(proxy, '_lazy_module') is not None
+    if isinstance(proxy, LazyAttr):
+        return proxy._target is not None
+    return True
+
+
+def is_available(target: Any) -> bool:
+    """Whether a proxy (or module name) can actually be imported; imports it on the way"""
+    try:
+        if isinstance(target, str):
+            _load(target)
+        elif isinstance(target, LazyModule):
+            target._lazy_resolve()
+        elif isinstance(target, LazyAttr):
+            target.resolve()
+        return True
+    except Exception:
+        return False
+
+
+def module_exists(name: str) -> bool:
+    """Installed check without importing (the package itself may still fail to load)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_report() -> List[Dict[str, Any]]:
+    """Deferred imports that have happened so far, slowest first"""
+    with _lock:
+        rows = [{'module': name, **info} for name, info in _loads.items()]
+    return sorted(rows, key=lambda r: r['seconds'], reverse=True)
+
+
+# ----------------------------------------------------------------------
+# Startup profiler
+# ----------------------------------------------------------------------
+
+def _parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, depth) rows from -X importtime stderr"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            rows.append((name.strip(), int(self_us), int(cumulative_us),
+                         (len(name) - len(name.lstrip(' ')) - 1) // 2))
+        except ValueError:
+            continue
+    return rows
+
+
+def _subtree(rows: List[Tuple[str, int, int, int]], target: str) -> List[Tuple[str, int, int, int]]:
+    """Rows imported because of `target` (children are printed before their parent)"""
+    end = next((i for i, row in enumerate(rows) if row[0] == target and row[3] == 0), None)
+    if end is None:
+        return rows
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def profile_startup(target: str = 'main_clean', top: int = 15, cwd: Optional[str] = None,
+                    timeout: float = 120.0) -> Dict[str, Any]:
+    """Import `target` in a fresh interpreter and report import cost per top-level package"""
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+                              cwd=cwd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'success': False, 'message': f"Importing {target} took longer than {timeout:.0f}s"}
+    wall = time.perf_counter() - t0
+
+    rows = _subtree(_parse_importtime(proc.stderr), target)
+    if proc.returncode != 0 or not rows:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output'
+        return {'success': False, 'message': f"Importing {target} failed: {error}"}
+
+    # Self time summed per top-level package; cumulative time of each first-level import
+    packages: Dict[str, int] = {}
+    for name, self_us, _, _ in rows:
+        root = name.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+    total_us = rows[-1][2] if rows[-1][0] == target else sum(r[1] for r in rows)
+    direct = [(name, cum) for name, _, cum, depth in rows if depth == 1]
+
+    return {
+        'success': True,
+        'target': target,
+        'import_ms': round(total_us / 1000, 1),
+        'process_ms': round(wall * 1000, 1),
+        'modules': len(rows),
+        'packages': [{'package': p, 'ms': round(us / 1000, 1)}
+                     for p, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]],
+        'direct_imports': [{'module': m, 'ms': round(us / 1000, 1)}
+                           for m, us in sorted(direct, key=lambda kv: kv[1], reverse=True)[:top]],
+        'message': f"import {target}: {total_us / 1000:.0f} ms ({len(rows)} modules)",
+    }
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    if not profile.get('success'):
+        return f"❌ {profile.get('message')}"
+    lines = [f"⏱️ {profile['message']}, interpreter total {profile['process_ms']:.0f} ms",
+             "", "Slowest packages (self time):"]
+    lines += [f"   {row['package']:<28} {row['ms']:8.1f} ms" for row in profile['packages']]
+    lines += ["", f"Imports made directly by {profile['target']} (cumulative):"]
+    lines += [f"   {row['module']:<28} {row['ms']:8.1f} ms" for row in profile['direct_imports']]
+    deferred = lazy_report()
+    if deferred:
+        lines += ["", "Deferred imports loaded in this session:"]
+        lines += [f"   {row['module']:<28} {row['seconds'] * 1000:8.1f} ms" + (" (failed)" if row['error'] else "")
+                  for row in deferred]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_profile(profile_startup(sys.argv[1] if len(sys.argv) > 1 else 'main_clean')))
@@ -0,0 +1,246 @@
+"""
+System Metrics Sampler
+A background thread samples CPU (total and per core), memory, disk,
+network and battery at a fixed rate into fixed-size NumPy ring buffers, so
+metric commands read the latest values instantly and can answer windowed
+questions (average CPU over 5 minutes, network throughput) without blocking.
+"""
+import os
+import time
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+import psutil
+
+# Sampling period (seconds) and number of samples kept in memory
+DEFAULT_INTERVAL = float(os.getenv("METRICS_INTERVAL", "1.0") or 1.0)
+DEFAULT_HISTORY = int(os.getenv("METRICS_HISTORY", "3600") or 3600)
+
+# Battery status is slow on some platforms and changes slowly: read it every N samples
+_BATTERY_EVERY = 10
+
+# Filesystem whose usage is sampled
+DISK_PATH = os.getenv("METRICS_DISK_PATH", "C:\\" if os.name == "nt" else "/")
+
+# Scalar series kept per sample; *_sent/_recv/_read/_write are cumulative counters
+SERIES = (
+    "cpu", "mem_percent", "mem_used", "mem_available", "disk_percent",
+    "disk_read", "disk_write", "net_sent", "net_recv", "battery", "plugged",
+)
+COUNTERS = {"disk_read", "disk_write", "net_sent", "net_recv"}
+
+
+class MetricsSampler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL, history: int = DEFAULT_HISTORY,
+                 disk_path: str = DISK_PATH):
+        self.interval = interval
+        self.history = max(2, int(history))
+        self.disk_path = disk_path
+        self.cores = psutil.cpu_count() or 1
+
+        self._ts = np.zeros(self.history, dtype=np.float64)
+        self._series = {name: np.full(self.history, np.nan, dtype=np.float64) for name in SERIES}
+        self._per_core = np.full((self.history, self.cores), np.nan, dtype=np.float32)
+        self._count = 0      # samples written in total
+        self._lock = threading.Lock()
+        self._first = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._battery = (np.nan, np.nan)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "MetricsSampler":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait_ready(self, timeout: float = 1.0) -> bool:
+        """Block until the first sample exists (only matters right after start)"""
+        return self._first.wait(timeout)
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """`callback(sample)` runs on the sampler thread after every sample"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        psutil.cpu_percent(percpu=True)  # prime the per-core counters
+        # First sample quickly so early commands don't wait a whole interval
+        if self._stop.wait(min(0.1, self.interval)):
+            return
+        tick = 0
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._sample(tick)
+            except Exception as e:
+                print(f"Metrics sampler error: {e}")
+            tick += 1
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay < 0:  # fell behind (suspend/resume): don't burst to catch up
+                next_at = time.monotonic()
+                delay = 0
+            if self._stop.wait(delay):
+                break
+
+    def _sample(self, tick: int):
+        now = time.time()
+        per_core = psutil.cpu_percent(percpu=True)
+        mem = psutil.virtual_memory()
+        try:
+            disk_percent = psutil.disk_usage(self.disk_path).percent
+        except Exception:
+            disk_percent = np.nan
+        try:
+            dio = psutil.disk_io_counters()
+            disk_read, disk_write = (dio.read_bytes, dio.write_bytes) if dio else (np.nan, np.nan)
+        except Exception:
+            disk_read = disk_write = np.nan
+        try:
+            nio = psutil.net_io_counters()
+            net_sent, net_recv = nio.bytes_sent, nio.bytes_recv
+        except Exception:
+            net_sent = net_recv = np.nan
+        if tick % _BATTERY_EVERY == 0:
+            try:
+                battery = psutil.sensors_battery()
+                self._battery = (battery.percent, float(battery.power_plugged)) if battery else (np.nan, np.nan)
+            except Exception:
+                self._battery = (np.nan, np.nan)
+
+        values = {
+            "cpu": float(np.mean(per_core)) if per_core else np.nan,
+            "mem_percent": mem.percent,
+            "mem_used": mem.used,
+            "mem_available": mem.available,
+            "disk_percent": disk_percent,
+            "disk_read": disk_read,
+            "disk_write": disk_write,
+            "net_sent": net_sent,
+            "net_recv": net_recv,
+            "battery": self._battery[0],
+            "plugged": self._battery[1],
+        }
+        with self._lock:
+            i = self._count % self.history
+            self._ts[i] = now
+            for name, value in values.items():
+                self._series[name][i] = value
+            self._per_core[i, :len(per_core)] = per_core[:self.cores]
+            self._count += 1
+            listeners = list(self._listeners)
+        self._first.set()
+
+        if listeners:
+            sample = self.latest()
+            for callback in listeners:
+                try:
+                    callback(sample)
+                except Exception as e:
+                    print(f"Metrics listener error: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _ordered(self, arr):
+        """Chronological view of a ring buffer (caller holds the lock)"""
+        n = min(self._count, self.history)
+        if self._count <= self.history:
+            return arr[:n]
+        i = self._count % self.history
+        return np.concatenate((arr[i:], arr[:i]))
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The most recent sample, or None before the first one"""
+        with self._lock:
+            if not self._count:
+                return None
+            i = (self._count - 1) % self.history
+            sample = {name: self._series[name][i].item() for name in SERIES}
+            sample["timestamp"] = self._ts[i].item()
+            sample["per_core"] = [round(v, 1) for v in self._per_core[i].tolist()]
+        for name in ("battery", "plugged"):
+            if sample[name] != sample[name]:  # NaN -> no battery
+                sample[name] = None
+        return sample
+
+    def window(self, name: str, seconds: float):
+        """(timestamps, values) for the last `seconds` of one series ("per_core" is 2-D)"""
+        with self._lock:
+            ts = self._ordered(self._ts)
+            values = self._ordered(self._per_core if name == "per_core" else self._series[name])
+        if not len(ts):
+            return ts, values
+        start = np.searchsorted(ts, ts[-1] - seconds, side="left")
+        return ts[start:], values[start:]
+
+    def average(self, name: str, seconds: float) -> Optional[float]:
+        """Mean of a series over the last `seconds` (None without data)"""
+        _ts, values = self.window(name, seconds)
+        if not len(values) or np.all(np.isnan(values)):
+            return None
+        return float(np.nanmean(values))
+
+    def peak(self, name: str, seconds: float) -> Optional[float]:
+        _ts, values = self.window(name, seconds)
+        if not len(values) or np.all(np.isnan(values)):
+            return None
+        return float(np.nanmax(values))
+
+    def rate(self, name: str, seconds: float = 5.0) -> Optional[float]:
+        """Per-second rate of a cumulative counter (e.g. net_recv -> bytes/s)"""
+        if name not in COUNTERS:
+            raise ValueError(f"{name} is not a counter series")
+        ts, values = self.window(name, seconds)
+        if len(ts) < 2 or ts[-1] <= ts[0]:
+            # Window shorter than one interval: use the last two samples
+            ts, values = self.window(name, self.interval * 2.5)
+            if len(ts) < 2 or ts[-1] <= ts[0]:
+                return None
+            ts, values = ts[-2:], values[-2:]
+        delta = values[-1] - values[0]
+        if delta != delta or delta < 0:  # NaN or counter reset
+            return None
+        return float(delta / (ts[-1] - ts[0]))
+
+
+# Global sampler instance
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_metrics_sampler(start: bool = True) -> MetricsSampler:
+    """Get or create the shared sampler (started on first use)"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler()
+        if start and not _sampler.running:
+            _sampler.start()
+        return _sampler
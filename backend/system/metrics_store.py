@@ -0,0 +1,393 @@
+"""
+Metrics Store
+Compact on-disk history of system metrics, fed by the background sampler:
+- per-minute and per-hour rollups as fixed-width binary records (one
+  NumPy structured dtype, appended to minute.bin / hour.bin, read back
+  through np.memmap)
+- the top CPU-consuming processes of every minute, so questions like
+  "what was using my CPU this afternoon" can be answered
+- records are written in batches, old data is trimmed by retention
+- CSV/JSON export for plotting
+"""
+import os
+import csv
+import json
+import time
+import atexit
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+METRICS_STORE_DIR = os.getenv(
+    "METRICS_STORE_DIR",
+    os.path.join(os.path.expanduser("~"), ".offline_assistant", "metrics")
+)
+
+# Minute records buffered in memory before one append to disk
+BATCH_MINUTES = int(os.getenv("METRICS_BATCH_MINUTES", "5") or 5)
+
+# Retention per resolution (days)
+MINUTE_RETENTION_DAYS = float(os.getenv("METRICS_MINUTE_RETENTION_DAYS", "7") or 7)
+HOUR_RETENTION_DAYS = float(os.getenv("METRICS_HOUR_RETENTION_DAYS", "365") or 365)
+
+TOP_PROCESSES = 3
+
+# One record per bucket; rates are per second, cpu of processes is % of the whole machine
+RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"),             # bucket start (unix time)
+    ("samples", "<u4"),
+    ("cpu", "<f4"),
+    ("cpu_max", "<f4"),
+    ("mem", "<f4"),
+    ("disk", "<f4"),
+    ("net_recv", "<f4"),
+    ("net_sent", "<f4"),
+    ("disk_read", "<f4"),
+    ("disk_write", "<f4"),
+    ("battery", "<f4"),
+    ("top_names", "S24", (TOP_PROCESSES,)),
+    ("top_cpu", "<f4", (TOP_PROCESSES,)),
+])
+
+# Named parts of the day for period questions
+_DAY_PARTS = {
+    "morning": (6, 12),
+    "afternoon": (12, 17),
+    "evening": (17, 22),
+    "tonight": (18, 24),
+    "night": (22, 24),
+}
+
+
+class _Bucket:
+    """Running aggregate of sampler samples for one time bucket"""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.n = 0
+        self.sums = {"cpu": 0.0, "mem": 0.0, "disk": 0.0, "battery": 0.0}
+        self.battery_n = 0
+        self.cpu_max = 0.0
+        self.first: Optional[Dict[str, Any]] = None
+        self.last: Optional[Dict[str, Any]] = None
+
+    def add(self, sample: Dict[str, Any]):
+        self.n += 1
+        self.sums["cpu"] += sample["cpu"]
+        self.sums["mem"] += sample["mem_percent"]
+        self.sums["disk"] += sample["disk_percent"]
+        if sample.get("battery") is not None:
+            self.sums["battery"] += sample["battery"]
+            self.battery_n += 1
+        self.cpu_max = max(self.cpu_max, sample["cpu"])
+        if self.first is None:
+            self.first = sample
+        self.last = sample
+
+    def _rate(self, name: str) -> float:
+        if self.first is None or self.last is None:
+            return np.nan
+        dt = self.last["timestamp"] - self.first["timestamp"]
+        delta = self.last[name] - self.first[name]
+        if dt <= 0 or delta != delta or delta < 0:
+            return np.nan
+        return delta / dt
+
+    def record(self, top: List[Tuple[str, float]]) -> np.ndarray:
+        rec = np.zeros(1, dtype=RECORD_DTYPE)
+        n = max(1, self.n)
+        rec["ts"] = self.start
+        rec["samples"] = self.n
+        rec["cpu"] = self.sums["cpu"] / n
+        rec["cpu_max"] = self.cpu_max
+        rec["mem"] = self.sums["mem"] / n
+        rec["disk"] = self.sums["disk"] / n
+        for name in ("net_recv", "net_sent", "disk_read", "disk_write"):
+            rec[name] = self._rate(name)
+        rec["battery"] = self.sums["battery"] / self.battery_n if self.battery_n else np.nan
+        _set_top(rec, top)
+        return rec
+
+
+def _set_top(rec: np.ndarray, top: List[Tuple[str, float]]):
+    for i, (name, cpu) in enumerate(top[:TOP_PROCESSES]):
+        rec["top_names"][0, i] = name.encode("utf-8", "replace")[:24]
+        rec["top_cpu"][0, i] = cpu
+
+
+def _rollup(minutes: np.ndarray, start: float) -> np.ndarray:
+    """Combine minute records into one hour record (means weighted by sample count)"""
+    rec = np.zeros(1, dtype=RECORD_DTYPE)
+    weights = minutes["samples"].astype(np.float64)
+    if not weights.sum():
+        weights = np.ones(len(minutes))
+    rec["ts"] = start
+    rec["samples"] = int(minutes["samples"].sum())
+    for name in ("cpu", "mem", "disk", "net_recv", "net_sent", "disk_read", "disk_write", "battery"):
+        values = minutes[name].astype(np.float64)
+        mask = ~np.isnan(values)
+        rec[name] = np.average(values[mask], weights=weights[mask]) if mask.any() else np.nan
+    rec["cpu_max"] = np.nanmax(minutes["cpu_max"])
+    totals: Dict[str, float] = {}
+    for names, cpus in zip(minutes["top_names"], minutes["top_cpu"]):
+        for name, cpu in zip(names, cpus):
+            if name:
+                key = name.decode("utf-8", "replace")
+                totals[key] = totals.get(key, 0.0) + float(cpu)
+    top = sorted(((n, c / len(minutes)) for n, c in totals.items()), key=lambda x: x[1], reverse=True)
+    _set_top(rec, top)
+    return rec
+
+
+class MetricsStore:
+    def __init__(self, directory: str = METRICS_STORE_DIR, batch_minutes: int = BATCH_MINUTES,
+                 minute_retention_days: float = MINUTE_RETENTION_DAYS,
+                 hour_retention_days: float = HOUR_RETENTION_DAYS):
+        self.directory = directory
+        self.batch_minutes = max(1, batch_minutes)
+        self.retention = {"minute": minute_retention_days * 86400, "hour": hour_retention_days * 86400}
+        self._pending: Dict[str, List[np.ndarray]] = {"minute": [], "hour": []}
+        self._bucket: Optional[_Bucket] = None
+        self._hour_start: Optional[float] = None
+        self._hour_minutes: List[np.ndarray] = []
+        self._lock = threading.RLock()
+        self._cores = psutil.cpu_count() or 1
+        self._sampler = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, resolution: str) -> str:
+        return os.path.join(self.directory, f"{resolution}.bin")
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def attach(self, sampler) -> "MetricsStore":
+        """Record every sample of a MetricsSampler"""
+        self._sampler = sampler
+        self._top_processes()  # prime per-process cpu counters
+        self._seed_hour(time.time())
+        sampler.add_listener(self.add_sample)
+        atexit.register(self.close)
+        return self
+
+    def close(self):
+        if self._sampler is not None:
+            self._sampler.remove_listener(self.add_sample)
+            self._sampler = None
+        with self._lock:
+            if self._bucket is not None and self._bucket.n:
+                self._close_minute(self._bucket)
+                self._bucket = None
+            self.flush()
+
+    def _seed_hour(self, now: float):
+        """After a restart, continue the current hour's rollup from what is on disk"""
+        hour_start = now - now % 3600
+        with self._lock:
+            # Hours that ended while the assistant wasn't running still get their rollup
+            hours = self._read_file("hour")
+            since = float(hours["ts"][-1]) + 3600 if len(hours) else 0.0
+            del hours
+            leftover = self.query(since, hour_start, "minute")
+            if len(leftover):
+                buckets = leftover["ts"] - leftover["ts"] % 3600
+                for start in np.unique(buckets):
+                    self._pending["hour"].append(_rollup(leftover[buckets == start], float(start)))
+                self.flush()
+            self._hour_start = hour_start
+            existing = self.query(hour_start, now + 60, "minute")
+            self._hour_minutes = [existing[i:i + 1].copy() for i in range(len(existing))]
+
+    def _top_processes(self) -> List[Tuple[str, float]]:
+        """Processes using the most CPU since the previous call (% of the whole machine)"""
+        totals: Dict[str, float] = {}
+        for proc in psutil.process_iter(["name"]):
+            try:
+                cpu = proc.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            name = proc.info.get("name") or ""
+            if cpu and name and proc.pid != 0:  # pid 0 is "System Idle Process" on Windows
+                totals[name] = totals.get(name, 0.0) + cpu / self._cores
+        return sorted(totals.items(), key=lambda x: x[1], reverse=True)[:TOP_PROCESSES]
+
+    def add_sample(self, sample: Dict[str, Any]):
+        """Sampler listener: aggregate into the current minute, close finished minutes"""
+        ts = sample["timestamp"]
+        minute_start = ts - ts % 60
+        with self._lock:
+            if self._bucket is not None and self._bucket.start != minute_start:
+                self._close_minute(self._bucket)
+                self._bucket = None
+            if self._bucket is None:
+                self._bucket = _Bucket(minute_start)
+            self._bucket.add(sample)
+
+    def _close_minute(self, bucket: _Bucket):
+        rec = bucket.record(self._top_processes())
+        hour_start = bucket.start - bucket.start % 3600
+        if self._hour_start is not None and hour_start != self._hour_start and self._hour_minutes:
+            self._pending["hour"].append(_rollup(np.concatenate(self._hour_minutes), self._hour_start))
+            self._hour_minutes = []
+            self.flush()
+            self.apply_retention()
+        self._hour_start = hour_start
+        self._hour_minutes.append(rec)
+        self._pending["minute"].append(rec)
+        if len(self._pending["minute"]) >= self.batch_minutes:
+            self.flush()
+
+    def flush(self):
+        """Append buffered records to disk (one write per resolution)"""
+        with self._lock:
+            for resolution, records in self._pending.items():
+                if not records:
+                    continue
+                try:
+                    with open(self.path(resolution), "ab") as f:
+                        np.concatenate(records).tofile(f)
+                    self._pending[resolution] = []
+                except OSError as e:
+                    print(f"Metrics store: could not write {resolution} data: {e}")
+
+    def apply_retention(self, now: Optional[float] = None):
+        """Drop records older than each resolution's retention"""
+        now = now or time.time()
+        with self._lock:
+            for resolution, keep in self.retention.items():
+                data = self._read_file(resolution)
+                if not len(data):
+                    continue
+                cut = int(np.searchsorted(data["ts"], now - keep, side="left"))
+                if cut == 0:
+                    continue
+                tail = np.array(data[cut:])
+                del data
+                tmp = self.path(resolution) + ".tmp"
+                tail.tofile(tmp)
+                os.replace(tmp, self.path(resolution))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _read_file(self, resolution: str) -> np.ndarray:
+        path = self.path(resolution)
+        try:
+            if os.path.getsize(path) < RECORD_DTYPE.itemsize:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            count = os.path.getsize(path) // RECORD_DTYPE.itemsize  # ignore a torn last record
+            return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+        except (OSError, ValueError):
+            return np.zeros(0, dtype=RECORD_DTYPE)
+
+    def query(self, start: float, end: float, resolution: str = "auto") -> np.ndarray:
+        """Records with start <= ts < end, including ones not yet flushed"""
+        if resolution == "auto":
+            resolution = "minute" if start >= time.time() - self.retention["minute"] else "hour"
+        with self._lock:
+            data = self._read_file(resolution)
+            lo, hi = np.searchsorted(data["ts"], [start, end], side="left") if len(data) else (0, 0)
+            parts = [np.array(data[lo:hi])]
+            parts += [r for r in self._pending[resolution] if start <= r["ts"][0] < end]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+
+    def top_processes(self, records: np.ndarray, limit: int = 5) -> List[Tuple[str, float]]:
+        """Average CPU share per process over the records (% of the whole machine)"""
+        totals: Dict[str, float] = {}
+        for names, cpus in zip(records["top_names"], records["top_cpu"]):
+            for name, cpu in zip(names, cpus):
+                if name:
+                    key = name.decode("utf-8", "replace")
+                    totals[key] = totals.get(key, 0.0) + float(cpu)
+        n = max(1, len(records))
+        return sorted(((k, v / n) for k, v in totals.items()), key=lambda x: x[1], reverse=True)[:limit]
+
+    def summarize(self, start: float, end: float) -> Dict[str, Any]:
+        records = self.query(start, end)
+        if not len(records):
+            return {"success": False, "records": 0, "message": "No metrics recorded for that period"}
+        weights = np.maximum(records["samples"].astype(np.float64), 1)
+        return {
+            "success": True,
+            "records": int(len(records)),
+            "cpu_avg": float(np.average(records["cpu"], weights=weights)),
+            "cpu_max": float(np.nanmax(records["cpu_max"])),
+            "mem_avg": float(np.average(records["mem"], weights=weights)),
+            "top": self.top_processes(records),
+        }
+
+    def export(self, path: Optional[str] = None, start: float = 0, end: Optional[float] = None,
+               resolution: str = "minute", fmt: Optional[str] = None) -> Dict[str, Any]:
+        """Write records to CSV or JSON (by extension) for plotting"""
+        end = end or time.time() + 60
+        records = self.query(start, end, resolution)
+        if path is None:
+            path = os.path.join(self.directory, f"export_{resolution}_{datetime.now():%Y%m%d_%H%M%S}.csv")
+        fmt = fmt or ("json" if path.lower().endswith(".json") else "csv")
+        rows = []
+        for rec in records:
+            row = {"time": datetime.fromtimestamp(rec["ts"]).isoformat(timespec="minutes")}
+            for name in RECORD_DTYPE.names:
+                if name in ("ts", "top_names", "top_cpu"):
+                    continue
+                value = rec[name].item()
+                row[name] = None if value != value else round(value, 2)
+            for i in range(TOP_PROCESSES):
+                row[f"top{i + 1}"] = rec["top_names"][i].decode("utf-8", "replace")
+                row[f"top{i + 1}_cpu"] = round(float(rec["top_cpu"][i]), 2)
+            rows.append(row)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if fmt == "json":
+                json.dump(rows, f, indent=1)
+            elif rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        return {"success": True, "path": path, "rows": len(rows),
+                "message": f"Exported {len(rows)} {resolution} records to {path}"}
+
+
+def parse_period(text: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime, str]:
+    """Turn phrases like "this afternoon", "yesterday", "last 3 hours" into (start, end, label)"""
+    import re
+    now = now or datetime.now()
+    text = (text or "").lower()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = today - timedelta(days=1) if "yesterday" in text else today
+
+    m = re.search(r"(?:last|past)\s+(\d+)?\s*(minute|min|hour|hr|day)s?", text)
+    if m:
+        amount = int(m.group(1) or 1)
+        unit = m.group(2)
+        delta = timedelta(days=amount) if unit == "day" else \
+            timedelta(hours=amount) if unit in ("hour", "hr") else timedelta(minutes=amount)
+        return now - delta, now, f"the last {amount} {unit}{'s' if amount > 1 else ''}"
+
+    for part, (h0, h1) in _DAY_PARTS.items():
+        if part in text:
+            start, end = day + timedelta(hours=h0), day + timedelta(hours=h1)
+            label = f"{'yesterday' if day != today else 'this'} {part}".replace("this tonight", "tonight")
+            return start, min(end, now) if day == today else end, label
+    if "yesterday" in text:
+        return day, today, "yesterday"
+    return today, now, "today"
+
+
+# Global store instance
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metrics_store() -> MetricsStore:
+    """Get or create the shared metrics store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MetricsStore()
+        return _store
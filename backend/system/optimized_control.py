@@ -18,6 +18,13 @@ try:
 except ImportError:
     PSUTIL_AVAILABLE = False
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from system.command_runner import get_command_runner
+from system.control.volume import get_volume_controller
+from system.control.brightness import get_brightness_controller
+if PSUTIL_AVAILABLE:
+    from system.control.process_watch import snapshot_pids, wait_for_app
+
 try:
     import ctypes
     from ctypes import wintypes, Structure
@@ -31,6 +38,10 @@ _cache = {}
 _cache_lock = threading.Lock()
 CACHE_DURATION = 5  # seconds
 
+# Launch check on the fast path: as short as the old fixed sleep; apps that
+# take longer still count when the spawned process is alive at the deadline
+QUICK_LAUNCH_WAIT = 0.1  # seconds
+
 def _get_cached(key: str, func, *args, **kwargs):
     """Get cached result or compute and cache"""
     with _cache_lock:
@@ -58,95 +69,89 @@ def _run_fast_command(cmd: list, timeout: float = 2.0) -> str:
     except Exception as e:
         return f"Error: {e}"
 
-# Volume Control (Windows optimized)
-def quick_volume_control(action: str, level: int = 10) -> str:
-    """Ultra-fast volume control for Windows using proper Windows Audio API"""
-    if not WINDOWS_API_AVAILABLE:
-        return "Windows API not available"
+def _run_powershell(script: str, timeout: float = 2.0, cache_ttl: float = 0, cache_tag: Optional[str] = None) -> str:
+    """Run a PowerShell snippet in the warm PowerShell session (no per-call startup).
 
+    Read-only status queries pass `cache_ttl` to reuse a recent answer.
+    """
     try:
-        if action == "up":
-            # Send volume up key
-            ctypes.windll.user32.keybd_event(0xAF, 0, 0, 0)  # VK_VOLUME_UP
-            ctypes.windll.user32.keybd_event(0xAF, 0, 2, 0)  # Key up
-            return "Volume increased"
-        elif action == "down":
-            # Send volume down key
-            ctypes.windll.user32.keybd_event(0xAE, 0, 0, 0)  # VK_VOLUME_DOWN
-            ctypes.windll.user32.keybd_event(0xAE, 0, 2, 0)  # Key up
-            return "Volume decreased"
-        elif action == "mute":
-            # Send mute key
-            ctypes.windll.user32.keybd_event(0xAD, 0, 0, 0)  # VK_VOLUME_MUTE
-            ctypes.windll.user32.keybd_event(0xAD, 0, 2, 0)  # Key up
-            return "Volume toggled"
-        elif action == "set":
-            # Use a dedicated volume control script for reliable operation
-            try:
-                import os
-                import subprocess
+        result = get_command_runner().run(script, shell="powershell", timeout=timeout,
+                                          cache_ttl=cache_ttl, cache_tag=cache_tag)
+        if result.get("timed_out"):
+            return "Timeout"
+        if result.get("returncode") != 0:
+            return f"Error: {result.get('returncode')}"
+        return (result.get("output") or "").strip()
+    except Exception as e:
+        return f"Error: {e}"
 
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                volume_script = os.path.join(script_dir, "..", "volume_control.py")
+# Volume Control (in-process audio backend)
+def _volume_keys(vk: int, presses: int = 1):
+    """Send media volume keys (last resort when no audio backend is available)"""
+    for _ in range(presses):
+        ctypes.windll.user32.keybd_event(vk, 0, 0, 0)
+        ctypes.windll.user32.keybd_event(vk, 0, 2, 0)  # Key up
 
-                if os.path.exists(volume_script):
-                    try:
-                        # Use our dedicated volume control script
-                        result = subprocess.run([sys.executable, volume_script, "set", str(level)],
-                                              capture_output=True, text=True, timeout=3.0)
+def quick_volume_control(action: str, level: int = 10) -> str:
+    """Fast volume control through the long-lived in-process volume backend.
 
-                        if result.returncode == 0 and "Successfully set volume" in result.stdout:
-                            return f"Volume set to {level}%"
-                        else:
-                            return f"Volume set to {level}% (script method - check audio settings)"
+    For "up"/"down", `level` is the step in percent; for "set" it is the target.
+    """
+    controller = get_volume_controller()
+    try:
+        if controller.available():
+            if action == "up":
+                return controller.change(abs(level))["message"]
+            elif action == "down":
+                return controller.change(-abs(level))["message"]
+            elif action == "mute":
+                return controller.toggle_mute()["message"]
+            elif action == "set":
+                return controller.set(level)["message"]
+            elif action == "get":
+                return controller.get()["message"]
+            return f"Volume action: {action}"
 
-                    except subprocess.TimeoutExpired:
-                        return f"Volume set to {level}% (timeout - check audio settings)"
-                    except Exception as e:
-                        return f"Volume set to {level}% (script error: {e})"
-                else:
-                    return f"Volume set to {level}% (script not found - using fallback method)"
+        if not WINDOWS_API_AVAILABLE:
+            return controller.get()["message"]
 
-            except Exception as e:
-                return f"Volume set to {level}% (method unavailable - check audio drivers)"
-        elif action == "get":
-            # Try to get current volume level
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                devices = AudioUtilities.GetSpeakers()
-                interface = devices.Activate(IAudioEndpointVolume._iid_, 0, None)
-                volume = interface.QueryInterface(IAudioEndpointVolume)
-
-                # Get current volume as percentage
-                current_level = int(volume.GetMasterVolumeLevelScalar() * 100)
-                return f"Current volume: {current_level}%"
-            except ImportError:
-                return "Volume check not implemented - install pycaw for precise readings"
-            except Exception as e:
-                return "Volume check not implemented - use system tray"
-        else:
-            return f"Volume action: {action}"
+        # No audio backend: media keys move the volume 2% per press
+        if action == "up":
+            _volume_keys(0xAF, max(1, abs(level) // 2))  # VK_VOLUME_UP
+            return f"Volume increased by {max(1, abs(level) // 2) * 2}%"
+        elif action == "down":
+            _volume_keys(0xAE, max(1, abs(level) // 2))  # VK_VOLUME_DOWN
+            return f"Volume decreased by {max(1, abs(level) // 2) * 2}%"
+        elif action == "mute":
+            _volume_keys(0xAD)  # VK_VOLUME_MUTE
+            return "Volume toggled"
+        return "Volume level control needs pycaw - install it with 'pip install pycaw'"
     except Exception as e:
         return f"Volume control error: {e}"
 
 # Brightness Control (Windows optimized)
 def quick_brightness_control(action: str, level: int = 10) -> str:
-    """Fast brightness control"""
+    """Fast brightness control from the cached backlight level.
+
+    For "up"/"down", `level` is the step in percent; for "set" it is the target.
+    The reply waits for the write, so a failure is reported instead of claimed done;
+    commands arriving within the coalescing window share that write.
+    """
+    controller = get_brightness_controller()
     try:
         if action == "up":
-            _run_fast_command(["powershell", "-Command", "(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,100)"], timeout=1.0)
-            return "Brightness increased"
+            return controller.change(abs(level), wait=True)["message"]
         elif action == "down":
-            _run_fast_command(["powershell", "-Command", "(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,50)"], timeout=1.0)
-            return "Brightness decreased"
+            return controller.change(-abs(level), wait=True)["message"]
         elif action == "set":
-            # Use the level parameter to set specific brightness
-            _run_fast_command(["powershell", "-Command", f"(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,{level})"], timeout=1.0)
-            return f"Brightness set to {level}%"
+            return controller.set(level, wait=True)["message"]
+        elif action == "get":
+            return controller.get()["message"]
         else:
             return f"Brightness action: {action}"
     except Exception as e:
         return f"Brightness control error: {e}"
+
 def get_quick_performance() -> str:
     """Get essential system performance info with caching"""
     def _fetch_performance():
@@ -243,11 +248,17 @@ def quick_app_launch(app_name: str) -> str:
         # Try each executable option
         for executable in executables:
             try:
+                baseline = snapshot_pids() if PSUTIL_AVAILABLE else None
                 process = subprocess.Popen(executable, shell=True, 
                                          stdout=subprocess.DEVNULL, 
                                          stderr=subprocess.DEVNULL)
-                # Give it a moment to start
-                time.sleep(0.1)
+                
+                # Wait for the launched process (or its children) to show up
+                if PSUTIL_AVAILABLE:
+                    launch = wait_for_app([app_name, executable], pid=process.pid,
+                                          baseline=baseline, timeout=QUICK_LAUNCH_WAIT)
+                    if launch['success']:
+                        return f"Successfully launched {app_name}"
                 
                 # Check if process started successfully
                 if process.poll() is None:  # Process is still running
@@ -302,14 +313,12 @@ def quick_process_kill(process_name: str) -> str:
                     return f"Successfully closed Task Manager"
                 
                 # Method 2: Use PowerShell to stop the process
-                ps_cmd = ['powershell', '-Command', 'Stop-Process -Name "Taskmgr" -Force']
-                result = _run_fast_command(ps_cmd, timeout=5.0)
+                result = _run_powershell('Stop-Process -Name "Taskmgr" -Force', timeout=5.0)
                 if "Error:" not in result:
                     return f"Task Manager closed via PowerShell"
                 
                 # Method 3: Try with WMI
-                wmi_cmd = ['powershell', '-Command', 'Get-Process "Taskmgr" | Stop-Process -Force']
-                result = _run_fast_command(wmi_cmd, timeout=5.0)
+                result = _run_powershell('Get-Process "Taskmgr" | Stop-Process -Force', timeout=5.0)
                 if "Error:" not in result:
                     return f"Task Manager closed via WMI"
                 
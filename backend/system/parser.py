@@ -131,6 +131,28 @@ def parse_command(command: str) -> Tuple[Optional[str], Any]:
     # SYSTEM INFO COMMANDS
     # ============================================================================
     
+    elif re.search(r"(average|avg|mean)\s+(cpu|processor)", command):
+        # "average cpu over 5 minutes", "average cpu last 30 seconds"
+        m = re.search(r"(\d+)\s*(second|sec|minute|min|hour|hr)", command)
+        seconds = 300
+        if m:
+            unit = m.group(2)
+            seconds = int(m.group(1)) * (3600 if unit.startswith("h") else 1 if unit.startswith("s") else 60)
+        return ("get_cpu_average", seconds)
+
+    elif re.search(r"(what|who)\s+(was|has been)\s+using\s+(my\s+|the\s+)?(cpu|processor)", command) \
+            or command.startswith("cpu history"):
+        # "what was using my cpu this afternoon", "cpu history yesterday"
+        return ("get_cpu_history", command)
+
+    elif command.startswith("export metrics"):
+        # "export metrics" or "export metrics C:\\temp\\metrics.csv"
+        path = command[len("export metrics"):].strip()
+        return ("export_metrics", path or None)
+
+    elif command in ["network speed", "network throughput", "bandwidth", "network usage"]:
+        return ("get_network_throughput", None)
+
     elif command in ["cpu usage", "check cpu", "processor usage", "cpu"]:
         return ("get_cpu_usage", None)
     
@@ -184,6 +206,10 @@ def get_command_help() -> str:
 
 🖥️ System Info:
   • cpu usage                - Check CPU usage
+  • average cpu over 5 min   - CPU average/peak over a time window
+  • network speed            - Current download/upload rate
+  • what was using my cpu this afternoon - CPU history and top apps
+  • export metrics [path]    - Save recorded metrics as CSV/JSON
   • memory usage             - Check RAM usage
   • battery status           - Check battery level
   • disk space               - Check disk space
@@ -0,0 +1,233 @@
+"""
+Process Start Monitor
+Reacts to process-creation events instead of rescanning every process:
+- Linux: kernel proc connector (netlink), needs root / CAP_NET_ADMIN
+- Windows: WMI Win32_ProcessStartTrace events, needs Administrator
+- Elsewhere (or without privileges): pid snapshot diffs that only look at new pids
+"""
+import os
+import re
+import socket
+import struct
+import threading
+from typing import Callable, Iterable, Optional, Set
+
+import psutil
+
+try:
+    import wmi
+    import pythoncom
+    WMI_AVAILABLE = True
+except ImportError:
+    wmi = None
+    pythoncom = None
+    WMI_AVAILABLE = False
+
+# Snapshot-diff polling interval (seconds); only used by the fallback backend
+DEFAULT_INTERVAL = float(os.getenv("PROCESS_MONITOR_INTERVAL", "0.5") or 0.5)
+
+# Linux proc connector constants (linux/connector.h, linux/cn_proc.h)
+_NETLINK_CONNECTOR = 11
+_CN_IDX_PROC = 1
+_CN_VAL_PROC = 1
+_NLMSG_DONE = 3
+_PROC_CN_MCAST_LISTEN = 1
+_PROC_CN_MCAST_IGNORE = 2
+_PROC_EVENT_EXEC = 0x00000002
+_NLMSG_HDR = struct.Struct("=IHHII")      # len, type, flags, seq, pid
+_CN_MSG_HDR = struct.Struct("=IIIIHH")    # idx, val, seq, ack, len, flags
+_PROC_EVENT_HDR = struct.Struct("=IIQ")   # what, cpu, timestamp_ns
+_EXEC_EVENT = struct.Struct("=II")        # process_pid, process_tgid
+
+
+def compile_matcher(targets: Iterable[str]) -> Callable[[str], Optional[str]]:
+    """Build a single precompiled matcher for the target app names.
+
+    Returns a function mapping a process name to the target it matches
+    (case-insensitive substring, longest target first) or None.
+    """
+    cleaned = sorted({t.strip().lower() for t in targets if t and t.strip()}, key=len, reverse=True)
+    if not cleaned:
+        return lambda _name: None
+    pattern = re.compile("|".join(re.escape(t) for t in cleaned))
+
+    def _match(name: str) -> Optional[str]:
+        m = pattern.search((name or "").lower())
+        return m.group(0) if m else None
+
+    return _match
+
+
+def _proc_name(pid: int) -> Optional[str]:
+    try:
+        return psutil.Process(pid).name()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+class ProcessStartMonitor:
+    def __init__(self, callback: Callable[[int, str], None], interval: float = DEFAULT_INTERVAL,
+                 backend: Optional[str] = None):
+        """`callback(pid, name)` is called from the monitor thread for every new process"""
+        self.callback = callback
+        self.interval = interval
+        self.requested_backend = backend
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._sock = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> str:
+        """Start watching; returns the backend in use"""
+        if self._thread and self._thread.is_alive():
+            return self.backend
+        self._stop.clear()
+        order = [self.requested_backend] if self.requested_backend else ["proc_connector", "wmi", "snapshot"]
+        for name in order:
+            if name == "proc_connector" and self._open_proc_connector():
+                target = self._run_proc_connector
+            elif name == "wmi" and WMI_AVAILABLE and os.name == "nt":
+                target = self._run_wmi
+            elif name == "snapshot":
+                target = self._run_snapshot
+            else:
+                continue
+            self.backend = name
+            self._thread = threading.Thread(target=target, name=f"process-monitor-{name}", daemon=True)
+            self._thread.start()
+            return name
+        # Requested backend unavailable: always fall back to snapshots
+        self.backend = "snapshot"
+        self._thread = threading.Thread(target=self._run_snapshot, name="process-monitor-snapshot", daemon=True)
+        self._thread.start()
+        return self.backend
+
+    def stop(self):
+        self._stop.set()
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+            self._sock = None
+
+    def _emit(self, pid: int, name: Optional[str] = None):
+        if name is None:
+            name = _proc_name(pid)
+        if not name:
+            return
+        try:
+            self.callback(pid, name)
+        except Exception as e:
+            print(f"Process monitor callback error: {e}")
+
+    # ------------------------------------------------------------------
+    # Linux proc connector
+    # ------------------------------------------------------------------
+
+    def _proc_connector_message(self, op: int) -> bytes:
+        payload = struct.pack("=I", op)
+        cn = _CN_MSG_HDR.pack(_CN_IDX_PROC, _CN_VAL_PROC, 0, 0, len(payload), 0)
+        total = _NLMSG_HDR.size + len(cn) + len(payload)
+        return _NLMSG_HDR.pack(total, _NLMSG_DONE, 0, 0, os.getpid()) + cn + payload
+
+    def _open_proc_connector(self) -> bool:
+        if not hasattr(socket, "AF_NETLINK"):
+            return False
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_CONNECTOR)
+            sock.bind((0, _CN_IDX_PROC))
+            sock.send(self._proc_connector_message(_PROC_CN_MCAST_LISTEN))
+            sock.settimeout(1.0)
+            self._sock = sock
+            return True
+        except (OSError, AttributeError):
+            return False
+
+    def _run_proc_connector(self):
+        sock = self._sock
+        header_size = _NLMSG_HDR.size + _CN_MSG_HDR.size
+        data_offset = header_size + _PROC_EVENT_HDR.size
+        try:
+            while not self._stop.is_set():
+                try:
+                    data = sock.recv(4096)
+                except socket.timeout:
+                    continue
+                except OSError as e:
+                    if not self._stop.is_set():
+                        print(f"Process monitor: proc connector failed ({e}), switching to snapshots")
+                    break
+                if len(data) < data_offset + _EXEC_EVENT.size:
+                    continue
+                what, _cpu, _ts = _PROC_EVENT_HDR.unpack_from(data, header_size)
+                if what != _PROC_EVENT_EXEC:
+                    continue
+                _pid, tgid = _EXEC_EVENT.unpack_from(data, data_offset)
+                self._emit(tgid)
+        finally:
+            try:
+                sock.send(self._proc_connector_message(_PROC_CN_MCAST_IGNORE))
+            except Exception:
+                pass
+            try:
+                sock.close()
+            except Exception:
+                pass
+            self._sock = None
+        if not self._stop.is_set():
+            self.backend = "snapshot"
+            self._run_snapshot()
+
+    # ------------------------------------------------------------------
+    # Windows WMI
+    # ------------------------------------------------------------------
+
+    def _run_wmi(self):
+        try:
+            pythoncom.CoInitialize()
+            conn = wmi.WMI()
+            watcher = conn.watch_for(raw_wql="SELECT * FROM Win32_ProcessStartTrace")
+        except Exception:
+            # Not elevated or WMI unavailable: degrade to snapshots
+            self.backend = "snapshot"
+            self._run_snapshot()
+            return
+        try:
+            while not self._stop.is_set():
+                try:
+                    event = watcher(timeout_ms=1000)
+                except wmi.x_wmi_timed_out:
+                    continue
+                except Exception as e:
+                    print(f"Process monitor: WMI event watch failed ({e}), switching to snapshots")
+                    break
+                self._emit(int(event.ProcessID), event.ProcessName)
+        finally:
+            try:
+                pythoncom.CoUninitialize()
+            except Exception:
+                pass
+        # The watcher broke (WMI service restarted, connection lost): keep monitoring with snapshots
+        if not self._stop.is_set():
+            self.backend = "snapshot"
+            self._run_snapshot()
+
+    # ------------------------------------------------------------------
+    # Snapshot diff fallback
+    # ------------------------------------------------------------------
+
+    def _run_snapshot(self):
+        known: Set[int] = set(psutil.pids())
+        while not self._stop.wait(self.interval):
+            try:
+                current = set(psutil.pids())
+            except Exception:
+                continue
+            for pid in current - known:
+                self._emit(pid)
+            known = current
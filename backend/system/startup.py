@@ -0,0 +1,162 @@
+"""
+Startup Orchestrator
+Runs each subsystem's initialization (TTS warmup, Ollama check, database,
+face analysis, ...) concurrently as a named future, so the assistant can show
+its prompt immediately. Features wait only on the futures they need: an AI
+question waits for Ollama, a task command for the database, and local
+commands for nothing.
+"""
+import time
+import threading
+from concurrent.futures import Future, CancelledError, TimeoutError as FutureTimeout, wait as wait_futures
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class DependencyUnavailable(RuntimeError):
+    """A feature needed a subsystem whose startup failed or returned nothing"""
+
+
+class StartupOrchestrator:
+    def __init__(self):
+        self._futures: Dict[str, Future] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def launch(self, name: str, func: Callable, *args, requires: Iterable[str] = (), **kwargs) -> Future:
+        """Start `func` in the background once the `requires` futures have finished"""
+        deps = [self._futures[dep] for dep in requires]
+
+        future: Future = Future()
+
+        # Daemon threads rather than an executor: a slow check (Ollama) must not hold up exit
+        def _run():
+            if deps:
+                wait_futures(deps)
+            if not future.set_running_or_notify_cancel():
+                return
+            t0 = time.perf_counter()
+            with self._lock:
+                self._timings[name] = {'start': t0 - self.started}
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                self._finish(name, t0)
+                future.set_exception(e)
+            else:
+                self._finish(name, t0)
+                future.set_result(result)
+
+        with self._lock:
+            if name in self._futures:
+                raise ValueError(f"Startup task '{name}' already launched")
+            self._futures[name] = future
+        threading.Thread(target=_run, name=f"startup-{name}", daemon=True).start()
+        return future
+
+    def _finish(self, name: str, t0: float):
+        with self._lock:
+            self._timings[name]['seconds'] = time.perf_counter() - t0
+
+    def future(self, name: str) -> Optional[Future]:
+        return self._futures.get(name)
+
+    def ready(self, name: str) -> bool:
+        """Finished without raising (never blocks)"""
+        future = self._futures.get(name)
+        return bool(future and future.done() and not future.cancelled() and future.exception() is None)
+
+    def done(self, name: str) -> bool:
+        future = self._futures.get(name)
+        return bool(future and future.done())
+
+    def wait(self, name: str, timeout: Optional[float] = None, default: Any = None) -> Any:
+        """Result of `name`, or `default` if it failed, timed out or was never launched"""
+        future = self._futures.get(name)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=timeout)
+        except (FutureTimeout, CancelledError):
+            return default
+        except Exception:
+            return default
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """Result if already available, otherwise `default` (never blocks)"""
+        return self.wait(name, timeout=0, default=default) if self.done(name) else default
+
+    def require(self, name: str, timeout: Optional[float] = None, what: Optional[str] = None) -> Any:
+        """Result of `name`; DependencyUnavailable if it failed or produced nothing"""
+        result = self.wait(name, timeout=timeout)
+        if result is None or result is False:
+            raise DependencyUnavailable(f"{what or name} is not available")
+        return result
+
+    def deferred(self, name: str, what: Optional[str] = None) -> "Deferred":
+        return Deferred(self, name, what)
+
+    def on_ready(self, name: str, callback: Callable[[Any, Optional[BaseException]], None]):
+        """callback(result, error) when `name` finishes (immediately if it already has)"""
+        def _done(future: Future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            try:
+                callback(None if error else future.result(), error)
+            except Exception:
+                pass
+        self._futures[name].add_done_callback(_done)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        with self._lock:
+            timings = {name: dict(t) for name, t in self._timings.items()}
+        for name, future in self._futures.items():
+            if not future.done():
+                state = 'running' if name in timings else 'waiting'
+            elif future.cancelled():
+                state = 'cancelled'
+            elif future.exception() is not None:
+                state = 'failed'
+            else:
+                state = 'ready' if future.result() not in (None, False) else 'unavailable'
+            entry = {'state': state, **timings.get(name, {})}
+            if state == 'failed':
+                entry['error'] = str(future.exception())
+            report[name] = entry
+        return report
+
+    def summary(self) -> str:
+        parts = []
+        for name, info in self.status().items():
+            seconds = info.get('seconds')
+            timing = f" {seconds:.2f}s" if seconds is not None else ""
+            parts.append(f"{name}: {info['state']}{timing}")
+        return ", ".join(parts)
+
+    def shutdown(self):
+        """Cancel tasks still waiting on their dependencies; running ones finish in the background"""
+        for future in self._futures.values():
+            future.cancel()
+
+
+class Deferred:
+    """Object produced by a startup task; attribute access waits for it"""
+
+    def __init__(self, startup: StartupOrchestrator, name: str, what: Optional[str] = None):
+        self._startup = startup
+        self._name = name
+        self._what = what or name
+
+    def resolve(self, timeout: Optional[float] = None):
+        return self._startup.require(self._name, timeout=timeout, what=self._what)
+
+    def __getattr__(self, attr: str):
+        return getattr(self.resolve(), attr)
+
+    def __bool__(self):
+        return self._startup.wait(self._name) not in (None, False)
+
+    def __repr__(self):
+        return f"<deferred {self._name} ({'ready' if self._startup.ready(self._name) else 'pending'})>"
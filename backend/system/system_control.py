@@ -3,7 +3,6 @@ import time
 import subprocess
 from typing import List, Tuple, Dict, Any
 import json
-import winreg
 from pathlib import Path
 
 import psutil
@@ -28,31 +27,36 @@ except ImportError:
     WMI_AVAILABLE = False
     wmi = None
 
-def run_system_command(command):
+def run_system_command(command, timeout: float = None, on_output=None):
     """Run a system command and return a detailed result.
 
-    - Captures stdout and stderr.
+    - Runs in a warm bash session instead of spawning a new shell per call
+      (on Windows through cmd.exe, as before); see system.command_runner.
+    - Captures stdout and stderr; `on_output(text)` receives output as it streams.
     - Returns non-zero exit codes as errors with captured output.
-    - Uses shell execution so common commands (PowerShell/CMD) work on Windows.
+    - Enforces a timeout (COMMAND_TIMEOUT, default 60 s) and caps output size.
     """
+    from system.command_runner import get_command_runner, DEFAULT_TIMEOUT
+
     try:
-        result = subprocess.run(
+        result = get_command_runner().run(
             command,
-            shell=True,
-            capture_output=True,
-            text=True,
+            timeout=timeout or DEFAULT_TIMEOUT,
+            on_output=on_output,
         )
-        out = (result.stdout or '').strip()
-        err = (result.stderr or '').strip()
-        if result.returncode == 0:
+        out = result.get("output") or ""
+        if result.get("timed_out"):
+            partial = f"\n{out}" if out else ""
+            return f"Command timed out after {timeout or DEFAULT_TIMEOUT:g}s: {command}{partial}"
+        if result.get("returncode") == 0:
             # Prefer stdout if available, otherwise a generic success message
             if out:
                 return out
             return f"Command succeeded: {command}"
         else:
-            # Include both stdout and stderr for better diagnostics
-            combined = "\n".join([p for p in [out, err] if p]) or "No output captured."
-            return f"Command failed (exit {result.returncode}): {command}\n{combined}"
+            # Output already includes stderr (merged in the session)
+            combined = out or "No output captured."
+            return f"Command failed (exit {result.get('returncode')}): {command}\n{combined}"
     except Exception as e:
         return f"Error running command: {e}"
 
@@ -108,177 +112,64 @@ def _is_admin() -> bool:
         return False
 
 
-def block_app_by_name(app_name: str, seconds: int, tick_callback=None, label: str = None) -> str:
-    """Suspend all processes that match app_name for N seconds, then resume.
-
-    - Prefers exact process name match (case-insensitive), otherwise substring match.
-    - Reports how many were suspended and which failed due to permissions.
-    - On Windows, suggests running as Administrator if nothing could be suspended due to AccessDenied.
-    """
-    seconds = max(0, int(seconds))
-    procs = _find_processes_by_name_part(app_name)
-    if not procs:
-        return f"No running processes matched '{app_name}'."
-
-    suspended: List[Tuple[int, str]] = []  # (pid, name)
-    denied: List[Tuple[int, str]] = []
-    other_fail: List[Tuple[int, str]] = []
-
-    for p in procs:
-        try:
-            name = p.info.get('name') or p.name()
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-        try:
-            p.suspend()
-            suspended.append((p.pid, name))
-        except psutil.AccessDenied:
-            denied.append((p.pid, name))
-        except psutil.NoSuchProcess:
-            continue
-        except Exception:
-            other_fail.append((p.pid, name))
-
-    if not suspended:
-        if denied and platform.system().lower() == 'windows' and not _is_admin():
-            details = ", ".join(f"{n}({pid})" for pid, n in denied[:5])
-            more = " ..." if len(denied) > 5 else ""
-            return (
-                f"Found processes for '{app_name}' but could not suspend any due to permissions (e.g., {details}{more}). "
-                f"Please run the terminal as Administrator and try again."
-            )
-        return f"Found processes for '{app_name}', but none could be suspended."
-
-    # Keep suspended for the requested duration
-    if seconds > 0:
-        width = 30
-        for elapsed in range(0, seconds):
-            remaining = seconds - elapsed
-            filled = int((elapsed / seconds) * width)
-            bar = '#' * filled + '-' * (width - filled)
-            print(f"Blocking '{app_name}' [{bar}] {remaining:>3}s remaining", end='\r', flush=True)
-            if tick_callback and (remaining == seconds or remaining % 5 == 0 or remaining <= 3):
-                try:
-                    tick_callback(remaining, seconds, label or app_name)
-                except Exception:
-                    pass
-            time.sleep(1)
-        # Clear the line after countdown
-        print(" " * 80, end='\r')
-
-    # Resume those we suspended
-    resumed = 0
-    for pid, _ in suspended:
-        try:
-            psutil.Process(pid).resume()
-            resumed += 1
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-
-    # Build a detailed, but concise, message
+def _format_block_result(result: Dict[str, Any], subject: str, seconds: int) -> str:
+    if not result.get("success"):
+        return result.get("message", f"Could not block {subject}.")
+    suspended = result.get("suspended", [])
+    denied = result.get("denied", [])
     suspended_preview = ", ".join(f"{name}({pid})" for pid, name in suspended[:5])
     if len(suspended) > 5:
         suspended_preview += " ..."
     parts = [
-        f"Blocked '{app_name}' for {seconds} seconds",
+        f"Blocking {subject} for {seconds} seconds",
         f"suspended {len(suspended)} process(es)"
     ]
     if denied:
         parts.append(f"denied on {len(denied)} process(es)")
     if suspended_preview:
         parts.append(f"[{suspended_preview}]")
-    return " (".join([parts[0], ", ".join(parts[1:])]) + ")"
+    return " (".join([parts[0], ", ".join(parts[1:])]) + "); they will resume automatically"
+
+
+def block_app_by_name(app_name: str, seconds: int, tick_callback=None, label: str = None) -> str:
+    """Suspend all processes that match app_name for N seconds, then resume.
+
+    - Prefers exact process name match (case-insensitive), otherwise substring match.
+    - Returns immediately; the resume is scheduled by the block manager, so
+      several blocks can overlap and the REPL stays responsive.
+    - On Windows, suggests running as Administrator if nothing could be suspended due to AccessDenied.
+    """
+    from system.block_manager import get_block_manager
+
+    seconds = max(0, int(seconds))
+    result = get_block_manager().block([app_name], seconds, tick_callback=tick_callback, label=label or app_name)
+    if not result.get("success") and "No running processes matched" in result.get("message", ""):
+        return f"No running processes matched '{app_name}'."
+    return _format_block_result(result, f"'{app_name}'", seconds)
 
 
 def block_apps_by_names(app_names: List[str], seconds: int, tick_callback=None, label: str = None) -> str:
     """Suspend all processes matching any of the provided names for N seconds, then resume.
 
     - Accepts multiple names and prefers exact (case-insensitive) match; falls back to substring.
-    - Returns a concise summary including counts and a preview of suspended processes.
+    - Returns immediately with a concise summary; the block manager resumes the processes later.
     - On Windows, suggests running as Administrator if nothing could be suspended due to permissions.
     """
+    from system.block_manager import get_block_manager
+
     seconds = max(0, int(seconds))
-    # Normalize requested names
     requested = [n.strip() for n in (app_names or []) if (n or "").strip()]
-    if not requested:
-        return "No application names provided to block."
-
-    # Collect candidate processes across all requested names (avoid PID duplicates)
-    seen_pids = set()
-    procs: List[psutil.Process] = []
-    for name in requested:
-        for p in _find_processes_by_name_part(name):
-            if p.pid not in seen_pids:
-                seen_pids.add(p.pid)
-                procs.append(p)
-
-    if not procs:
-        return f"No running processes matched: {', '.join(requested)}."
-
-    suspended: List[Tuple[int, str]] = []  # (pid, name)
-    denied: List[Tuple[int, str]] = []
-    other_fail: List[Tuple[int, str]] = []
-
-    for p in procs:
-        try:
-            name = p.info.get('name') or p.name()
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-        try:
-            p.suspend()
-            suspended.append((p.pid, name))
-        except psutil.AccessDenied:
-            denied.append((p.pid, name))
-        except psutil.NoSuchProcess:
-            continue
-        except Exception:
-            other_fail.append((p.pid, name))
+    result = get_block_manager().block(requested, seconds, tick_callback=tick_callback, label=label)
+    return _format_block_result(result, f"{len(requested)} app name(s)", seconds)
 
-    if not suspended:
-        if denied and platform.system().lower() == 'windows' and not _is_admin():
-            details = ", ".join(f"{n}({pid})" for pid, n in denied[:5])
-            more = " ..." if len(denied) > 5 else ""
-            return (
-                f"Found processes for {', '.join(requested)} but could not suspend any due to permissions (e.g., {details}{more}). "
-                f"Please run the terminal as Administrator and try again."
-            )
-        return f"Found processes for {', '.join(requested)}, but none could be suspended."
 
-    if seconds > 0:
-        names_preview = ", ".join(requested[:3]) + (" ..." if len(requested) > 3 else "")
-        width = 30
-        for elapsed in range(0, seconds):
-            remaining = seconds - elapsed
-            filled = int((elapsed / seconds) * width)
-            bar = '#' * filled + '-' * (width - filled)
-            print(f"Blocking [{names_preview}] [{bar}] {remaining:>3}s remaining", end='\r', flush=True)
-            if tick_callback and (remaining == seconds or remaining % 5 == 0 or remaining <= 3):
-                try:
-                    tick_callback(remaining, seconds, label or names_preview)
-                except Exception:
-                    pass
-            time.sleep(1)
-        # Clear the line after countdown
-        print(" " * 80, end='\r')
+def unblock_app(app_name: str) -> str:
+    """Resume a blocked app before its block expires"""
+    from system.block_manager import get_block_manager
+    return get_block_manager().release_by_name(app_name)["message"]
 
-    resumed = 0
-    for pid, _ in suspended:
-        try:
-            psutil.Process(pid).resume()
-            resumed += 1
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
 
-    # Build message
-    suspended_preview = ", ".join(f"{name}({pid})" for pid, name in suspended[:5])
-    if len(suspended) > 5:
-        suspended_preview += " ..."
-    parts = [
-        f"Blocked {len(requested)} app name(s) for {seconds} seconds",
-        f"suspended {len(suspended)} process(es)"
-    ]
-    if denied:
-        parts.append(f"denied on {len(denied)} process(es)")
-    if suspended_preview:
-        parts.append(f"[{suspended_preview}]")
-    return " (".join([parts[0], ", ".join(parts[1:])]) + ")"
+def get_block_status() -> str:
+    """Describe the currently active app blocks"""
+    from system.block_manager import format_block_status
+    return format_block_status()
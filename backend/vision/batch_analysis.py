@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Offline Face Analysis
+Runs the face pipeline over video files and image folders instead of a live
+camera. Videos are split into frame ranges and image folders into chunks;
+the shards are analyzed in a process pool (one FaceAnalyzer per worker
+process) and per-frame results are written in order as JSONL or Parquet,
+followed by throughput statistics.
+
+Usage:
+    python backend/vision/batch_analysis.py session.mp4 frames_dir/ -o results.jsonl
+    python backend/vision/batch_analysis.py session.mp4 -o results.parquet --workers 4 --stride 2
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_AVAILABLE = False
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+# Frames per shard: small enough to balance workers, large enough that seeking is rare
+SHARD_FRAMES = 300
+IMAGES_PER_SHARD = 64
+
+
+# ----------------------------------------------------------------------
+# Work planning
+# ----------------------------------------------------------------------
+
+def _video_info(path: str) -> Tuple[int, float]:
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return 0, 0.0
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        if count <= 0:  # some containers don't report a count: decode to find out
+            while cap.grab():
+                count += 1
+        return count, fps
+    finally:
+        cap.release()
+
+
+def plan_shards(inputs: Iterable[str], shard_frames: int = SHARD_FRAMES,
+                images_per_shard: int = IMAGES_PER_SHARD) -> List[Dict[str, Any]]:
+    """Split inputs into independent work units, in output order"""
+    shards = []
+    for path in inputs:
+        if os.path.isdir(path):
+            images = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+            for start in range(0, len(images), images_per_shard):
+                shards.append({"kind": "images", "source": path, "start": start,
+                               "files": images[start:start + images_per_shard]})
+        elif os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+            shards.append({"kind": "images", "source": os.path.dirname(path) or ".", "start": 0,
+                           "files": [path]})
+        else:
+            count, fps = _video_info(path)
+            for start in range(0, count, shard_frames):
+                shards.append({"kind": "video", "source": path, "start": start,
+                               "end": min(count, start + shard_frames), "fps": fps})
+    for index, shard in enumerate(shards):
+        shard["index"] = index
+    return shards
+
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    """One analyzer (and its models) per worker process"""
+    global _worker_analyzer
+    import cv2
+    cv2.setNumThreads(1)  # parallelism comes from the pool
+    from vision.face_analyzer import FaceAnalyzer
+    _worker_analyzer = FaceAnalyzer()
+
+
+def _record(source: str, frame_index: int, timestamp: Optional[float], result: Dict, latency: float) -> Dict:
+    faces = []
+    for face in result.get("analysis") or []:
+        emotion = face.get("emotion") or {}
+        age_gender = face.get("age_gender") or {}
+        liveness = face.get("liveness") or {}
+        faces.append({
+            "bbox": [int(v) for v in face.get("bbox", (0, 0, 0, 0))],
+            "confidence": float(face.get("confidence", 0.0)),
+            "emotion": emotion.get("emotion"),
+            "emotion_confidence": float(emotion.get("confidence", 0.0)),
+            "age_range": age_gender.get("age_range"),
+            "gender": age_gender.get("gender"),
+            "liveness": liveness.get("liveness"),
+        })
+    return {
+        "source": source,
+        "frame": frame_index,
+        "timestamp": timestamp,
+        "faces_detected": int(result.get("faces_detected", 0)),
+        "faces": faces,
+        "latency_ms": round(latency * 1000, 3),
+    }
+
+
+def _analyze_shard(shard: Dict[str, Any], stride: int, track: bool) -> Tuple[int, List[Dict], float]:
+    """(shard index, records, CPU seconds) for one work unit"""
+    import cv2
+    analyzer = _worker_analyzer
+    if analyzer is None:
+        _init_worker()
+        analyzer = _worker_analyzer
+    analyze = analyzer.analyze_face
+    if track:
+        from vision.face_tracker import TrackedFaceAnalysis
+        analyze = TrackedFaceAnalysis(analyzer)
+
+    cpu0 = time.process_time()
+    records = []
+
+    def _run(frame, index, timestamp, source):
+        t0 = time.perf_counter()
+        result = analyze(frame)
+        records.append(_record(source, index, timestamp, result, time.perf_counter() - t0))
+
+    if shard["kind"] == "images":
+        for offset, path in enumerate(shard["files"]):
+            index = shard["start"] + offset
+            if index % stride:
+                continue
+            frame = cv2.imread(path)
+            if frame is not None:
+                _run(frame, index, None, path)
+    else:
+        cap = cv2.VideoCapture(shard["source"])
+        try:
+            if shard["start"]:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, shard["start"])
+            fps = shard.get("fps") or 0.0
+            for index in range(shard["start"], shard["end"]):
+                if index % stride:
+                    if not cap.grab():  # skip without decoding
+                        break
+                    continue
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                _run(frame, index, round(index / fps, 3) if fps else None, shard["source"])
+        finally:
+            cap.release()
+    return shard["index"], records, time.process_time() - cpu0
+
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+
+class _JsonlWriter:
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, records: List[Dict]):
+        for record in records:
+            self.f.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.f.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        face = pa.struct([
+            ("bbox", pa.list_(pa.int32())), ("confidence", pa.float32()),
+            ("emotion", pa.string()), ("emotion_confidence", pa.float32()),
+            ("age_range", pa.string()), ("gender", pa.string()), ("liveness", pa.string()),
+        ])
+        self.schema = pa.schema([
+            ("source", pa.string()), ("frame", pa.int64()), ("timestamp", pa.float64()),
+            ("faces_detected", pa.int32()), ("faces", pa.list_(face)), ("latency_ms", pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, records: List[Dict]):
+        if records:
+            self.writer.write_table(pa.Table.from_pylist(records, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def _open_writer(path: str):
+    if path.lower().endswith(".parquet"):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        return _ParquetWriter(path)
+    return _JsonlWriter(path)
+
+
+# ----------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------
+
+def analyze_batch(inputs: List[str], output: str, workers: Optional[int] = None, stride: int = 1,
+                  track: bool = False, shard_frames: int = SHARD_FRAMES) -> Dict[str, Any]:
+    """Analyze videos/image folders into `output` (.jsonl or .parquet); returns stats"""
+    missing = [p for p in inputs if not os.path.exists(p)]
+    if missing:
+        return {"success": False, "message": f"Not found: {', '.join(missing)}"}
+    stride = max(1, int(stride))
+    t0 = time.perf_counter()
+    shards = plan_shards(inputs, shard_frames)
+    if not shards:
+        return {"success": False, "message": "No frames or images found in the inputs"}
+    workers = max(1, min(workers or (os.cpu_count() or 2) - 1, len(shards)))
+
+    try:
+        writer = _open_writer(output)
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+    frames = faces = 0
+    cpu = 0.0
+    latencies = []
+    pending: List[Tuple[int, List[Dict]]] = []   # finished shards waiting for their turn
+    next_index = 0
+    try:
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+            futures = [pool.submit(_analyze_shard, shard, stride, track) for shard in shards]
+            for future in as_completed(futures):
+                index, records, shard_cpu = future.result()
+                cpu += shard_cpu
+                heapq.heappush(pending, (index, records))
+                # Write shards strictly in input order as soon as the next one is available
+                while pending and pending[0][0] == next_index:
+                    _, ready = heapq.heappop(pending)
+                    writer.write(ready)
+                    frames += len(ready)
+                    faces += sum(r["faces_detected"] for r in ready)
+                    latencies.extend(r["latency_ms"] for r in ready)
+                    next_index += 1
+    except Exception as e:
+        return {"success": False, "message": f"Batch analysis failed: {e}"}
+    finally:
+        writer.close()
+
+    wall = time.perf_counter() - t0
+    stats = {
+        "frames": frames,
+        "faces": faces,
+        "shards": len(shards),
+        "workers": workers,
+        "wall_seconds": round(wall, 3),
+        "frames_per_second": round(frames / wall, 2) if wall else 0.0,
+        "cpu_seconds": round(cpu, 3),
+        "latency_ms_mean": round(float(np.mean(latencies)), 3) if latencies else None,
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3) if latencies else None,
+    }
+    return {"success": True, "output": output, "stats": stats,
+            "message": f"Analyzed {frames} frames ({faces} faces) in {wall:.1f}s "
+                       f"({stats['frames_per_second']} fps, {workers} workers) -> {output}"}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline face analysis of videos and image folders")
+    parser.add_argument("inputs", nargs="+", help="video files, image files or image folders")
+    parser.add_argument("-o", "--output", default="face_analysis.jsonl", help=".jsonl or .parquet")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: cores - 1)")
+    parser.add_argument("--stride", type=int, default=1, help="analyze every Nth frame")
+    parser.add_argument("--track", action="store_true", help="detect-then-track within each shard")
+    parser.add_argument("--shard-frames", type=int, default=SHARD_FRAMES, help="video frames per work unit")
+    args = parser.parse_args()
+
+    result = analyze_batch(args.inputs, args.output, args.workers, args.stride, args.track, args.shard_frames)
+    print(result["message"])
+    if result["success"]:
+        print(json.dumps(result["stats"], indent=2))
+    sys.exit(0 if result["success"] else 1)
@@ -0,0 +1,237 @@
+"""
+Emotion Models
+Pluggable face-emotion classifiers. Every model takes a batch of FaceRegions
+(all faces of one frame) and returns one {'emotion', 'confidence'} dict per
+face. The ONNX classifier (an int8 FER+ network by default) is loaded on the
+first prediction and runs CPU-only through onnxruntime, or OpenCV DNN when
+onnxruntime isn't installed; without a model file the brightness heuristics
+are used. `python download_emotion_model.py` fetches the model into models/.
+"""
+import os
+import threading
+import importlib.util
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+# onnxruntime is located now but imported only when a model is loaded
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
+
+# "auto" (ONNX when the model file exists), "onnx" or "heuristic"
+EMOTION_MODEL = os.getenv("EMOTION_MODEL", "auto").strip().lower()
+# Relative paths are taken from the project root, not the directory the assistant was started in
+EMOTION_MODEL_PATH = os.path.join(PROJECT_ROOT, os.getenv("EMOTION_MODEL_PATH", os.path.join('models', 'emotion-ferplus-12-int8.onnx')))
+# FER+ (ONNX model zoo): the int8 build is used as-is, the float one is quantized locally
+FERPLUS_URL = "https://github.com/onnx/models/raw/main/validated/vision/body_analysis/emotion_ferplus/model"
+EMOTION_MODEL_URL = os.getenv("EMOTION_MODEL_URL", f"{FERPLUS_URL}/emotion-ferplus-12-int8.onnx")
+EMOTION_MODEL_FLOAT_URL = os.getenv("EMOTION_MODEL_FLOAT_URL", f"{FERPLUS_URL}/emotion-ferplus-12.onnx")
+# Inference threads; one or two keep the model from competing with STT/TTS
+EMOTION_THREADS = int(os.getenv("EMOTION_THREADS", "1") or 1)
+
+# FER+ class order, mapped onto the mood names the assistant uses
+FERPLUS_LABELS = ("neutral", "happy", "surprised", "sad", "angry", "disgusted", "fearful", "contempt")
+
+
+class EmotionModel:
+    """Interface: one result dict per region, in order"""
+    name = "base"
+
+    def predict(self, regions: Sequence) -> List[Dict]:
+        raise NotImplementedError
+
+
+class HeuristicEmotionModel(EmotionModel):
+    """Mouth brightness / eye darkness rules (the original placeholder)"""
+    name = "heuristic"
+
+    def predict(self, regions: Sequence) -> List[Dict]:
+        results = []
+        for region in regions:
+            try:
+                gray = region.gray
+                height, width = gray.shape
+
+                # Analyze different regions
+                eyes_region = gray[height//4:height//2, width//4:3*width//4]
+                mouth_region = gray[height//2:3*height//4, width//3:2*width//3]
+
+                eye_darkness = np.mean(eyes_region) if eyes_region.size > 0 else 128
+                mouth_brightness = np.mean(mouth_region) if mouth_region.size > 0 else 128
+
+                # Very basic emotion detection
+                if mouth_brightness > 140:  # Bright mouth = smiling
+                    emotion = "happy"
+                    confidence = 0.8
+                elif eye_darkness < 80:  # Dark eyes = possibly tired/sad
+                    emotion = "sad"
+                    confidence = 0.7
+                else:
+                    emotion = "neutral"
+                    confidence = 0.9
+
+                results.append({
+                    'emotion': emotion,
+                    'confidence': confidence,
+                    'brightness': int(mouth_brightness),
+                    'eye_darkness': int(eye_darkness)
+                })
+            except Exception as e:
+                results.append({'emotion': 'unknown', 'confidence': 0.0, 'error': str(e)})
+        return results
+
+
+class OnnxEmotionModel(EmotionModel):
+    """Grayscale-input CNN classifier (FER+ layout: 1x64x64, raw 0-255 pixels, 8 logits)"""
+    name = "onnx"
+
+    def __init__(self, path: str = EMOTION_MODEL_PATH, labels: Sequence[str] = FERPLUS_LABELS,
+                 input_size: int = 64, threads: int = EMOTION_THREADS, fallback: Optional[EmotionModel] = None):
+        self.path = path
+        self.labels = tuple(labels)
+        self.input_size = input_size
+        self.threads = max(1, threads)
+        self.fallback = fallback or HeuristicEmotionModel()
+        self._lock = threading.Lock()
+        self._session = None
+        self._net = None
+        self._input_name = None
+        self._batched = True
+        self.load_error: Optional[str] = None
+        self.runtime: Optional[str] = None
+
+    def _load(self) -> bool:
+        """Load the model on first use; False (and load_error) when it can't be"""
+        if self._session is not None or self._net is not None:
+            return True
+        if self.load_error is not None:
+            return False
+        with self._lock:
+            if self._session is not None or self._net is not None:
+                return True
+            try:
+                if not os.path.exists(self.path):
+                    raise FileNotFoundError(f"Emotion model not found at {self.path}")
+                if ONNXRUNTIME_AVAILABLE:
+                    import onnxruntime as ort
+                    options = ort.SessionOptions()
+                    options.intra_op_num_threads = self.threads
+                    options.inter_op_num_threads = 1
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                    session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+                    model_input = session.get_inputs()[0]
+                    self._input_name = model_input.name
+                    # Models exported with a fixed batch of 1 are fed one face at a time
+                    self._batched = not isinstance(model_input.shape[0], int) or model_input.shape[0] != 1
+                    self._session = session
+                    self.runtime = "onnxruntime"
+                else:
+                    net = cv2.dnn.readNetFromONNX(self.path)
+                    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+                    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+                    self._net = net
+                    self.runtime = "opencv-dnn"
+                return True
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"Emotion model unavailable, using heuristics: {e}")
+                return False
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None or self._net is not None
+
+    def preprocess(self, regions: Sequence) -> np.ndarray:
+        """N x 1 x S x S float32 batch from the regions' grayscale views"""
+        size = self.input_size
+        batch = np.empty((len(regions), 1, size, size), dtype=np.float32)
+        for i, region in enumerate(regions):
+            batch[i, 0] = cv2.resize(region.gray, (size, size), interpolation=cv2.INTER_AREA)
+        return batch
+
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        if self._session is not None:
+            if self._batched:
+                return self._session.run(None, {self._input_name: batch})[0]
+            return np.concatenate([self._session.run(None, {self._input_name: batch[i:i+1]})[0]
+                                   for i in range(len(batch))])
+        with self._lock:  # cv2.dnn.Net is not thread-safe
+            self._net.setInput(batch)
+            return self._net.forward()
+
+    def predict(self, regions: Sequence) -> List[Dict]:
+        regions = list(regions)
+        if not regions:
+            return []
+        if not self._load():
+            return self.fallback.predict(regions)
+        try:
+            logits = np.asarray(self._infer(self.preprocess(regions)), dtype=np.float32).reshape(len(regions), -1)
+        except Exception as e:
+            print(f"Emotion model error, using heuristics: {e}")
+            return self.fallback.predict(regions)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        results = []
+        for row in probs:
+            best = int(row.argmax())
+            results.append({
+                'emotion': self.labels[best] if best < len(self.labels) else 'unknown',
+                'confidence': round(float(row[best]), 3),
+                'scores': {label: round(float(p), 3) for label, p in zip(self.labels, row)},
+                'model': self.name,
+            })
+        return results
+
+
+def create_emotion_model(name: Optional[str] = None, path: Optional[str] = None) -> EmotionModel:
+    """The configured model; "auto" picks ONNX only when its file exists (loading stays lazy)"""
+    name = (name or EMOTION_MODEL or "auto").lower()
+    path = os.path.join(PROJECT_ROOT, path) if path else EMOTION_MODEL_PATH
+    if name == "heuristic":
+        return HeuristicEmotionModel()
+    if name == "onnx" or (name == "auto" and os.path.exists(path)):
+        return OnnxEmotionModel(path)
+    return HeuristicEmotionModel()
+
+
+def quantize_emotion_model(src: str, dst: str) -> Dict:
+    """Write an int8 (dynamic, weight-only) copy of a float ONNX model"""
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        return {"success": False, "message": "onnxruntime is required for quantization (pip install onnxruntime)"}
+    try:
+        quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+        return {"success": True, "message": f"Quantized model written to {dst}",
+                "size_before": os.path.getsize(src), "size_after": os.path.getsize(dst)}
+    except Exception as e:
+        return {"success": False, "message": f"Quantization failed: {e}"}
+
+
+def download_emotion_model(dst: str = EMOTION_MODEL_PATH, quantize: bool = False, timeout: float = 60.0) -> Dict:
+    """Fetch FER+ into dst: the published int8 build, or the float model quantized here"""
+    import urllib.request
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    url = EMOTION_MODEL_FLOAT_URL if quantize else EMOTION_MODEL_URL
+    tmp = dst + (".float.tmp" if quantize else ".tmp")
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response, open(tmp, "wb") as f:
+            while True:
+                chunk = response.read(1 << 16)
+                if not chunk:
+                    break
+                f.write(chunk)
+        if not quantize:
+            os.replace(tmp, dst)
+            return {"success": True, "message": f"Emotion model saved to {dst}", "size": os.path.getsize(dst)}
+        return quantize_emotion_model(tmp, dst)
+    except Exception as e:
+        return {"success": False, "message": f"Could not download {url}: {e}"}
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -11,82 +11,86 @@ from typing import Dict, List, Tuple, Optional
 import json
 import os
 import warnings
+import threading
+import importlib.util
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
-# Initialize variables at module level
-MEDIAPIPE_AVAILABLE = False
-DLIB_AVAILABLE = False
+# Optional detectors are only located here; they are imported (MediaPipe pulls in
+# TensorFlow Lite and protobuf) the first time a frame actually needs them
+MEDIAPIPE_AVAILABLE = importlib.util.find_spec("mediapipe") is not None
+DLIB_AVAILABLE = importlib.util.find_spec("dlib") is not None
 mp = None
-dlib = None
-
-# Try to import mediapipe, but make it optional
-try:
-    import mediapipe as mp
-    MEDIAPIPE_AVAILABLE = True
-except ImportError:
-    mp = None
-    MEDIAPIPE_AVAILABLE = False
-except Exception as e:
-    mp = None
-    MEDIAPIPE_AVAILABLE = False
-
-# Try to import dlib for better face detection
-try:
-    import dlib
-    DLIB_AVAILABLE = True
-except ImportError:
-    dlib = None
-    DLIB_AVAILABLE = False
-except Exception as e:
-    dlib = None
-    DLIB_AVAILABLE = False
+
+
+def _import_mediapipe():
+    """Import mediapipe on first use; None (and MEDIAPIPE_AVAILABLE off) when it fails"""
+    global mp, MEDIAPIPE_AVAILABLE
+    if mp is None and MEDIAPIPE_AVAILABLE:
+        try:
+            import mediapipe
+            mp = mediapipe
+        except Exception:
+            MEDIAPIPE_AVAILABLE = False
+    return mp
+
+from vision.frame_context import FrameContext, FaceRegion
+from vision.emotion_model import create_emotion_model
+from vision.live_analysis import LiveFaceAnalysis, open_camera, EMPTY_ANALYSIS
+from vision.face_tracker import TrackedFaceAnalysis
+
+# Live video uses detect-then-track (set VISION_TRACKING=0 to detect on every frame)
+VISION_TRACKING = os.getenv("VISION_TRACKING", "1").strip() not in ("0", "false", "False")
 
 class FaceAnalyzer:
     def __init__(self):
-        """Initialize face analysis components"""
+        """Initialize face analysis components (detectors are built on first use)"""
         self.cap = None
         self.is_active = False
+        self._lock = threading.Lock()
+        self._face_detection = None
+        self._face_cascade = None
+        self._cascade_loaded = False
 
-        # Initialize available solutions
-        if globals().get('MEDIAPIPE_AVAILABLE', False) and globals().get('mp') is not None:
-            try:
-                mp_module = globals().get('mp')
-                self.mp_face_detection = mp_module.solutions.face_detection
-                self.mp_face_mesh = mp_module.solutions.face_mesh
-
-                # Initialize MediaPipe solutions
-                self.face_detection = self.mp_face_detection.FaceDetection(
-                    model_selection=1,  # Use full range model for better accuracy
-                    min_detection_confidence=0.5
-                )
-                self.face_mesh = self.mp_face_mesh.FaceMesh(
-                    max_num_faces=1,
-                    refine_landmarks=True,
-                    min_detection_confidence=0.5,
-                    min_tracking_confidence=0.5
-                )
-            except Exception as e:
-                print(f"Error initializing MediaPipe: {e}")
-                globals()['MEDIAPIPE_AVAILABLE'] = False
-
-        # Try to load OpenCV's built-in face detector
-        self.face_cascade = None
-        if hasattr(cv2, 'data'):
-            try:
-                # Try to use OpenCV's Haar cascades
-                cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-                if os.path.exists(cascade_path):
-                    self.face_cascade = cv2.CascadeClassifier(cascade_path)
-            except Exception:
-                pass
-
-        # Emotion detection variables
-        self.emotion_model = None
+        # Emotion classifier (ONNX model loaded on first use, heuristics otherwise)
+        self.emotion_model = create_emotion_model()
         self.age_gender_model = None
 
+    @property
+    def face_detection(self):
+        """MediaPipe FaceDetection, created on first use (None when unavailable)"""
+        if self._face_detection is None and MEDIAPIPE_AVAILABLE:
+            with self._lock:
+                if self._face_detection is None and MEDIAPIPE_AVAILABLE:
+                    try:
+                        mp_module = _import_mediapipe()
+                        if mp_module is not None:
+                            self._face_detection = mp_module.solutions.face_detection.FaceDetection(
+                                model_selection=1,  # Use full range model for better accuracy
+                                min_detection_confidence=0.5
+                            )
+                    except Exception as e:
+                        print(f"Error initializing MediaPipe: {e}")
+                        globals()['MEDIAPIPE_AVAILABLE'] = False
+        return self._face_detection
+
+    @property
+    def face_cascade(self):
+        """OpenCV Haar cascade, loaded on first use (None when missing)"""
+        if not self._cascade_loaded:
+            with self._lock:
+                if not self._cascade_loaded:
+                    try:
+                        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+                        if os.path.exists(cascade_path):
+                            self._face_cascade = cv2.CascadeClassifier(cascade_path)
+                    except Exception:
+                        pass
+                    self._cascade_loaded = True
+        return self._face_cascade
+
     def start_camera(self, camera_id: int = 0) -> bool:
         """Start camera capture"""
         try:
@@ -110,7 +114,10 @@ class FaceAnalyzer:
         if self.cap:
             self.cap.release()
         self.is_active = False
-        cv2.destroyAllWindows()
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            pass  # headless OpenCV builds have no HighGUI
 
     def capture_frame(self) -> Optional[np.ndarray]:
         """Capture a single frame from camera"""
@@ -122,19 +129,23 @@ class FaceAnalyzer:
             return frame
         return None
 
-    def detect_faces(self, frame: np.ndarray) -> List[Dict]:
-        """Detect faces in frame using available methods"""
+    def detect_faces(self, frame, fallback: bool = True) -> List[Dict]:
+        """Detect faces in frame using available methods
+
+        `frame` is a BGR image or a FrameContext. With `fallback`, a bright
+        frame without a detection yields a guessed centre "face" (method
+        'brightness_fallback').
+        """
         try:
+            ctx = FrameContext.of(frame)
+            frame = ctx.bgr
             faces = []
 
             # Try MediaPipe first if available
-            if globals().get('MEDIAPIPE_AVAILABLE', False) and globals().get('mp') is not None and hasattr(self, 'face_detection'):
+            if MEDIAPIPE_AVAILABLE and self.face_detection is not None:
                 try:
-                    # Convert BGR to RGB
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                    # Process frame
-                    results = self.face_detection.process(rgb_frame)
+                    # Process frame (RGB conversion shared through the context)
+                    results = self.face_detection.process(ctx.rgb)
 
                     if results.detections:
                         for detection in results.detections:
@@ -164,9 +175,8 @@ class FaceAnalyzer:
             # Fallback to OpenCV Haar cascades if MediaPipe failed or unavailable
             if not faces and self.face_cascade is not None:
                 try:
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
                     detected_faces = self.face_cascade.detectMultiScale(
-                        gray,
+                        ctx.gray,
                         scaleFactor=1.1,
                         minNeighbors=5,
                         minSize=(30, 30)
@@ -183,11 +193,10 @@ class FaceAnalyzer:
                     print(f"OpenCV detection error: {e}")
 
             # If no face detection methods worked, try simple motion detection
-            if not faces:
+            if not faces and fallback:
                 try:
                     # Simple brightness-based detection as last resort
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    brightness = np.mean(gray)
+                    brightness = np.mean(ctx.gray)
 
                     # If frame is reasonably bright, assume there's a face
                     if brightness > 50:
@@ -211,119 +220,75 @@ class FaceAnalyzer:
             print(f"Error in face detection: {e}")
             return []
 
-    def analyze_emotion(self, face_image: np.ndarray) -> Dict:
-        """Analyze emotion from face image (simplified version)"""
-        try:
-            # This is a simplified emotion detection
-            # In a real implementation, you'd use a trained model
-
-            # Analyze image characteristics for basic emotion detection
-            gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
-
-            # Simple emotion detection based on facial features
-            # This is a placeholder - real implementation needs ML model
-
-            height, width = gray.shape
+    # ------------------------------------------------------------------
+    # Per-face stages. Each takes a batch of FaceRegions (views into one
+    # FrameContext) so grayscale and texture are computed once per face.
+    # ------------------------------------------------------------------
 
-            # Analyze different regions
-            eyes_region = gray[height//4:height//2, width//4:3*width//4]
-            mouth_region = gray[height//2:3*height//4, width//3:2*width//3]
+    def emotions(self, regions: List[FaceRegion]) -> List[Dict]:
+        """Emotion for every face of a frame (one batched model call)"""
+        return self.emotion_model.predict(regions)
 
-            # Simple heuristics (this would be replaced with actual ML model)
-            eye_darkness = np.mean(eyes_region) if eyes_region.size > 0 else 128
-            mouth_brightness = np.mean(mouth_region) if mouth_region.size > 0 else 128
-
-            # Very basic emotion detection
-            if mouth_brightness > 140:  # Bright mouth = smiling
-                emotion = "happy"
-                confidence = 0.8
-            elif eye_darkness < 80:  # Dark eyes = possibly tired/sad
-                emotion = "sad"
-                confidence = 0.7
-            else:
-                emotion = "neutral"
-                confidence = 0.9
-
-            return {
-                'emotion': emotion,
-                'confidence': confidence,
-                'brightness': int(mouth_brightness),
-                'eye_darkness': int(eye_darkness)
-            }
-
-        except Exception as e:
-            return {'emotion': 'unknown', 'confidence': 0.0, 'error': str(e)}
-
-    def analyze_age_gender(self, face_image: np.ndarray) -> Dict:
-        """Analyze age and gender (simplified version)"""
-        try:
-            # This is a simplified implementation
-            # Real version would use a trained CNN model
-
-            gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
-            height, width = gray.shape
-
-            # Simple age estimation based on skin texture and face shape
-            # This is very basic and would need a proper ML model
-
-            # Analyze skin texture (wrinkles = older)
-            laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-
-            # Simple heuristics
-            if laplacian_var > 500:  # High texture variance = older
-                age_range = "adult"
-                age_confidence = 0.6
-            elif laplacian_var > 200:
-                age_range = "young_adult"
-                age_confidence = 0.7
-            else:
-                age_range = "teen"
-                age_confidence = 0.5
-
-            # Very basic gender detection (face shape)
-            # This is highly inaccurate and needs proper ML model
-            aspect_ratio = width / height
-
-            if aspect_ratio > 0.8:  # Wider face = possibly male
-                gender = "male"
-                gender_confidence = 0.6
-            else:
-                gender = "female"
-                gender_confidence = 0.6
-
-            return {
-                'age_range': age_range,
-                'age_confidence': age_confidence,
-                'gender': gender,
-                'gender_confidence': gender_confidence
-            }
-
-        except Exception as e:
-            return {
-                'age_range': 'unknown',
-                'age_confidence': 0.0,
-                'gender': 'unknown',
-                'gender_confidence': 0.0,
-                'error': str(e)
-            }
-
-    def check_liveness(self, frame: np.ndarray, face_bbox: Tuple) -> Dict:
-        """Check if detected face is real (not photo/spoof)"""
-        try:
-            x, y, w, h = face_bbox
+    def ages_genders(self, regions: List[FaceRegion]) -> List[Dict]:
+        """Age range and gender for every face of a frame (simplified heuristics)"""
+        results = []
+        for region in regions:
+            try:
+                height, width = region.gray.shape
+
+                # Analyze skin texture (wrinkles = older)
+                laplacian_var = region.laplacian_var
+
+                # Simple heuristics
+                if laplacian_var > 500:  # High texture variance = older
+                    age_range = "adult"
+                    age_confidence = 0.6
+                elif laplacian_var > 200:
+                    age_range = "young_adult"
+                    age_confidence = 0.7
+                else:
+                    age_range = "teen"
+                    age_confidence = 0.5
 
-            # Simple liveness detection based on movement and texture
-            # Real implementation would need more sophisticated methods
+                # Very basic gender detection (face shape)
+                # This is highly inaccurate and needs proper ML model
+                aspect_ratio = width / height
 
-            if w > 0 and h > 0:
-                face_roi = frame[y:y+h, x:x+w]
-                gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+                if aspect_ratio > 0.8:  # Wider face = possibly male
+                    gender = "male"
+                    gender_confidence = 0.6
+                else:
+                    gender = "female"
+                    gender_confidence = 0.6
+
+                results.append({
+                    'age_range': age_range,
+                    'age_confidence': age_confidence,
+                    'gender': gender,
+                    'gender_confidence': gender_confidence
+                })
+            except Exception as e:
+                results.append({
+                    'age_range': 'unknown',
+                    'age_confidence': 0.0,
+                    'gender': 'unknown',
+                    'gender_confidence': 0.0,
+                    'error': str(e)
+                })
+        return results
+
+    def liveness_checks(self, regions: List[FaceRegion]) -> List[Dict]:
+        """Real-vs-photo guess for every face of a frame (texture and brightness)"""
+        results = []
+        for region in regions:
+            try:
+                if region.size == 0:
+                    results.append({'liveness': 'unknown', 'confidence': 0.0})
+                    continue
 
                 # Check texture variance (photos usually have less texture)
-                texture_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-
-                # Simple movement detection (would need frame comparison in real implementation)
-                brightness = np.mean(gray)
+                texture_var = region.laplacian_var
+                brightness = region.brightness
 
                 # Basic heuristics
                 if texture_var > 100 and brightness > 50:  # Good texture and brightness
@@ -333,58 +298,79 @@ class FaceAnalyzer:
                     liveness = "uncertain"
                     confidence = 0.4
 
-                return {
+                results.append({
                     'liveness': liveness,
                     'confidence': confidence,
                     'texture_variance': texture_var,
                     'brightness': brightness
-                }
+                })
+            except Exception:
+                results.append({'liveness': 'unknown', 'confidence': 0.0})
+        return results
 
-        except Exception as e:
-            pass
+    # Single-face wrappers kept for existing callers
 
-        return {'liveness': 'unknown', 'confidence': 0.0}
+    def analyze_emotion(self, face_image: np.ndarray) -> Dict:
+        """Analyze emotion from face image (simplified version)"""
+        h, w = face_image.shape[:2]
+        return self.emotions([FrameContext(face_image).region((0, 0, w, h))])[0]
+
+    def analyze_age_gender(self, face_image: np.ndarray) -> Dict:
+        """Analyze age and gender (simplified version)"""
+        h, w = face_image.shape[:2]
+        return self.ages_genders([FrameContext(face_image).region((0, 0, w, h))])[0]
 
-    def analyze_face(self, frame: np.ndarray) -> Dict:
+    def check_liveness(self, frame: np.ndarray, face_bbox: Tuple) -> Dict:
+        """Check if detected face is real (not photo/spoof)"""
+        return self.liveness_checks([FrameContext.of(frame).region(face_bbox)])[0]
+
+    def analyze_face(self, frame) -> Dict:
         """Complete face analysis"""
         try:
-            faces = self.detect_faces(frame)
+            ctx = FrameContext.of(frame)
+            return self.analyze_detected(ctx, self.detect_faces(ctx))
+        except Exception as e:
+            return {
+                'faces_detected': 0,
+                'analysis': [],
+                'error': str(e)
+            }
 
+    def analyze_detected(self, frame, faces: List[Dict]) -> Dict:
+        """Emotion/age/liveness for faces already located in `frame` (detector or tracker)"""
+        try:
             if not faces:
                 return {
                     'faces_detected': 0,
                     'analysis': []
                 }
 
-            analysis_results = []
-
-            for face in faces:
-                x, y, w, h = face['bbox']
-                face_image = face.get('frame')
+            ctx = FrameContext.of(frame)
+            faces = [f for f in faces if f['bbox'][2] > 0 and f['bbox'][3] > 0]
+            regions = [ctx.region(f['bbox']) for f in faces]
 
-                if face_image is None or face_image.size == 0:
-                    continue
+            # Each stage sees the whole batch of faces
+            emotions = self.emotions(regions)
+            ages_genders = self.ages_genders(regions)
+            liveness = self.liveness_checks(regions)
 
-                # Perform all analyses
-                emotion = self.analyze_emotion(face_image)
-                age_gender = self.analyze_age_gender(face_image)
-                liveness = self.check_liveness(frame, (x, y, w, h))
-
-                face_analysis = {
-                    'bbox': (x, y, w, h),
+            now = time.time()
+            analysis_results = [
+                {
+                    'bbox': region.bbox,
                     'confidence': face['confidence'],
                     'emotion': emotion,
                     'age_gender': age_gender,
-                    'liveness': liveness,
-                    'timestamp': time.time()
+                    'liveness': live,
+                    'timestamp': now
                 }
-
-                analysis_results.append(face_analysis)
+                for face, region, emotion, age_gender, live in zip(faces, regions, emotions, ages_genders, liveness)
+            ]
 
             return {
                 'faces_detected': len(faces),
                 'analysis': analysis_results,
-                'frame_shape': frame.shape
+                'frame_shape': ctx.shape
             }
 
         except Exception as e:
@@ -401,49 +387,84 @@ class FaceAnalyzer:
             return self.analyze_face(frame)
         return {'faces_detected': 0, 'analysis': []}
 
-# Global analyzer instance - initialize after imports
+# Global analyzer instance - created on first use, not at import
 face_analyzer = None
+_analyzer_lock = threading.Lock()
 
-# Initialize after all imports are complete
-try:
-    face_analyzer = FaceAnalyzer()
-except Exception as e:
-    print(f"Error initializing face analyzer: {e}")
-    face_analyzer = None
+def get_face_analyzer() -> Optional[FaceAnalyzer]:
+    """Get or create the shared analyzer (None if it cannot be built)"""
+    global face_analyzer
+    with _analyzer_lock:
+        if face_analyzer is None:
+            try:
+                face_analyzer = FaceAnalyzer()
+            except Exception as e:
+                print(f"Error initializing face analyzer: {e}")
+        return face_analyzer
+
+# Run camera and analysis in a separate process (shared-memory results)
+VISION_PROCESS = os.getenv("VISION_PROCESS", "0").strip() not in ("", "0", "false", "False")
+
+# Live pipeline (camera thread + analysis worker, or the vision process) behind the module functions
+_live = None
+_live_lock = threading.Lock()
 
 def start_face_analysis(camera_id: int = 0) -> bool:
-    """Start face analysis system"""
-    if face_analyzer is None:
-        return False
-    return face_analyzer.start_camera(camera_id)
+    """Start face analysis system (camera and analysis run in the background)"""
+    global _live
+    with _live_lock:
+        if _live is not None and _live.running:
+            return True
+        if VISION_PROCESS:
+            from vision.vision_process import VisionProcess
+            process = VisionProcess(camera_id)
+            if not process.start():
+                print(f"Vision process unavailable: {process.error}")
+                return False
+            _live = process
+            return True
+        analyzer = get_face_analyzer()
+        if analyzer is None:
+            return False
+        capture = open_camera(camera_id)
+        if capture is None:
+            return False
+        analyze = TrackedFaceAnalysis(analyzer) if VISION_TRACKING else analyzer.analyze_face
+        # The camera is released after CAMERA_IDLE_TIMEOUT without mood reads and reopened on the next one
+        _live = LiveFaceAnalysis(analyze, capture, reopen=lambda: open_camera(camera_id)).start()
+    return True
 
 def stop_face_analysis():
     """Stop face analysis system"""
+    global _live
+    with _live_lock:
+        live, _live = _live, None
+    if live is not None:
+        live.stop()
     if face_analyzer is not None:
         face_analyzer.stop_camera()
 
 def get_current_analysis() -> Dict:
-    """Get current face analysis"""
-    if face_analyzer is None:
-        return {'faces_detected': 0, 'analysis': []}
-    return face_analyzer.get_live_analysis()
+    """Latest published face analysis (read-only; never blocks on the camera)"""
+    live = _live
+    if live is None:
+        return EMPTY_ANALYSIS
+    return live.analysis()
 
 def detect_user_mood() -> str:
-    """Detect current user mood for assistant response"""
+    """Smoothed user mood for assistant response ("no_face" when nobody is in view)"""
     try:
-        analysis = get_current_analysis()
-
-        if analysis.get('faces_detected', 0) == 0:
+        live = _live
+        if live is None:
             return "no_face"
 
-        face = analysis['analysis'][0] if analysis['analysis'] else {}
-
-        emotion = face.get('emotion', {}).get('emotion', 'neutral')
-        confidence = face.get('emotion', {}).get('confidence', 0)
+        mood, confidence = live.mood()
+        if mood == "no_face":
+            return mood
 
         # Only return emotion if confidence is reasonable
         if confidence > 0.4:
-            return emotion
+            return mood
 
         return "neutral"
 
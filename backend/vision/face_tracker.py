@@ -0,0 +1,167 @@
+"""
+Detect-Then-Track Face Pipeline
+Full face detection runs only every N frames, on a downscaled copy of the
+frame; in between, boxes are carried forward with sparse Lucas-Kanade optical
+flow, and frames that barely differ from the previous one are skipped
+outright. Detection is also re-run as soon as a track loses its points.
+"""
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from vision.frame_context import FrameContext
+
+# Run the detector every N analyzed frames (tracking in between)
+DETECT_EVERY = int(os.getenv("VISION_DETECT_EVERY", "5") or 5)
+# Width the frame is downscaled to for detection and tracking
+DETECT_WIDTH = int(os.getenv("VISION_DETECT_WIDTH", "320") or 320)
+# A frame is static when fewer than this fraction of thumbnail pixels changed noticeably
+STATIC_THRESHOLD = float(os.getenv("VISION_STATIC_THRESHOLD", "0.005") or 0.005)
+# Never reuse a result for more than this many static frames in a row
+MAX_STATIC_FRAMES = 30
+
+_THUMB_SIZE = (80, 60)
+_PIXEL_DELTA = 12         # grey-level change that counts (sensor noise is well below this)
+_MIN_POINTS = 6           # fewer surviving flow points -> track lost, detect again
+_LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                  criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class _Track:
+    __slots__ = ("box", "confidence", "points")
+
+    def __init__(self, box, confidence):
+        self.box = np.asarray(box, dtype=np.float32)   # x, y, w, h in downscaled coordinates
+        self.confidence = float(confidence)
+        self.points = None
+
+
+class FaceTracker:
+    """`detect(small)` gets a downscaled FrameContext and returns faces with 'bbox' and
+    'confidence' in its coordinates"""
+
+    def __init__(self, detect: Callable[[np.ndarray], List[Dict]], detect_every: int = DETECT_EVERY,
+                 detect_width: int = DETECT_WIDTH, static_threshold: float = STATIC_THRESHOLD,
+                 max_static: int = MAX_STATIC_FRAMES):
+        self.detect = detect
+        self.detect_every = max(1, detect_every)
+        self.detect_width = detect_width
+        self.static_threshold = static_threshold
+        self.max_static = max_static
+        self.tracks: List[_Track] = []
+        self._prev_gray = None
+        self._prev_thumb = None
+        self._since_detect = None   # frames since the last detection (None -> detect now)
+        self._static_run = 0
+        self.stats = {"detect": 0, "track": 0, "static": 0}
+
+    def reset(self):
+        self.tracks = []
+        self._prev_gray = self._prev_thumb = None
+        self._since_detect = None
+        self._static_run = 0
+
+    def _is_static(self, gray: np.ndarray) -> bool:
+        thumb = cv2.resize(gray, _THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        prev, self._prev_thumb = self._prev_thumb, thumb
+        if prev is None or self._static_run >= self.max_static:
+            self._static_run = 0
+            return False
+        changed = np.count_nonzero(cv2.absdiff(thumb, prev) > _PIXEL_DELTA) / thumb.size
+        if changed < self.static_threshold:
+            self._static_run += 1
+            return True
+        self._static_run = 0
+        return False
+
+    def _seed_points(self, gray: np.ndarray, track: _Track):
+        x, y, w, h = track.box.astype(int)
+        mask = np.zeros_like(gray)
+        mask[max(0, y):y + h, max(0, x):x + w] = 255
+        track.points = cv2.goodFeaturesToTrack(gray, maxCorners=40, qualityLevel=0.01, minDistance=4, mask=mask)
+
+    def _track(self, gray: np.ndarray) -> bool:
+        """Move every box by the median flow of its points; False when a track is lost"""
+        for track in self.tracks:
+            if track.points is None or len(track.points) < _MIN_POINTS:
+                return False
+            new, status, _err = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, track.points, None, **_LK_PARAMS)
+            good = status.reshape(-1) == 1
+            if good.sum() < _MIN_POINTS:
+                return False
+            old_pts, new_pts = track.points[good].reshape(-1, 2), new[good].reshape(-1, 2)
+            dx, dy = np.median(new_pts - old_pts, axis=0)
+            # Scale from the spread of the points around their centre
+            old_spread = np.median(np.linalg.norm(old_pts - old_pts.mean(axis=0), axis=1))
+            new_spread = np.median(np.linalg.norm(new_pts - new_pts.mean(axis=0), axis=1))
+            s = float(np.clip(new_spread / old_spread, 0.9, 1.1)) if old_spread > 1e-3 else 1.0
+            x, y, w, h = track.box
+            cx, cy = x + w / 2 + dx, y + h / 2 + dy
+            w, h = w * s, h * s
+            track.box = np.array([cx - w / 2, cy - h / 2, w, h], dtype=np.float32)
+            track.points = new_pts.reshape(-1, 1, 2)
+        return True
+
+    def update(self, frame) -> Tuple[List[Dict], str]:
+        """Faces in full-frame coordinates and how they were obtained: detect, track or static
+
+        `frame` is a BGR image or a FrameContext (whose downscaled copy is then shared).
+        """
+        ctx = FrameContext.of(frame)
+        small, scale = ctx.downscaled(self.detect_width)
+        gray = small.gray
+
+        if self._is_static(gray):
+            mode = "static"
+        else:
+            due = self._since_detect is None or self._since_detect + 1 >= self.detect_every
+            # With nobody in view there is nothing to track: wait for the next scheduled detection
+            mode = "detect" if due or (self.tracks and not self._track(gray)) else "track"
+            if mode == "detect":
+                self.tracks = [_Track(f['bbox'], f.get('confidence', 0.0)) for f in self.detect(small)]
+                self._since_detect = 0
+            else:
+                self._since_detect += 1
+            for track in self.tracks:
+                self._seed_points(gray, track)
+            self._prev_gray = gray
+        self.stats[mode] += 1
+        return self._faces(ctx.bgr, scale), mode
+
+    def _faces(self, frame: np.ndarray, scale: float) -> List[Dict]:
+        ih, iw = frame.shape[:2]
+        faces = []
+        for track in self.tracks:
+            x, y, w, h = (track.box / scale).round().astype(int).tolist()
+            x, y = max(0, x), max(0, y)
+            w, h = min(w, iw - x), min(h, ih - y)
+            if w <= 0 or h <= 0:
+                continue
+            faces.append({
+                'bbox': (x, y, w, h),
+                'confidence': track.confidence,
+                'frame': frame[y:y+h, x:x+w],
+            })
+        return faces
+
+
+class TrackedFaceAnalysis:
+    """FaceAnalyzer.analyze_face() replacement for video: detect-then-track, static frames reuse the last result"""
+
+    def __init__(self, analyzer, **tracker_options):
+        self.analyzer = analyzer
+        # The brightness fallback invents a face; a tracker would happily follow it
+        self.tracker = FaceTracker(lambda small: analyzer.detect_faces(small, fallback=False), **tracker_options)
+        self._last: Optional[Dict] = None
+
+    def __call__(self, frame) -> Dict:
+        ctx = FrameContext.of(frame)
+        faces, mode = self.tracker.update(ctx)
+        if mode == "static" and self._last is not None:
+            return self._last
+        result = self.analyzer.analyze_detected(ctx, faces)
+        result['mode'] = mode
+        self._last = result
+        return result
@@ -0,0 +1,102 @@
+"""
+Per-Frame Context
+Colour conversions, downscaled copies and per-face measurements are computed
+at most once per frame and shared by every analysis stage. Face regions are
+NumPy slices of the frame (no copies); a region's grayscale is a slice of the
+frame's grayscale when that already exists, otherwise only the ROI is converted.
+"""
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class FaceRegion:
+    """One face's views into a FrameContext, with lazily computed measurements"""
+    __slots__ = ("ctx", "bbox", "bgr", "_gray", "_laplacian_var", "_brightness")
+
+    def __init__(self, ctx: "FrameContext", bbox: Tuple[int, int, int, int]):
+        x, y, w, h = (int(v) for v in bbox)
+        self.ctx = ctx
+        self.bbox = (x, y, w, h)
+        self.bgr = ctx.bgr[y:y+h, x:x+w]
+        self._gray = None
+        self._laplacian_var = None
+        self._brightness = None
+
+    @property
+    def size(self) -> int:
+        return self.bgr.size
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            x, y, w, h = self.bbox
+            if self.ctx.has_gray:
+                self._gray = self.ctx.gray[y:y+h, x:x+w]
+            else:
+                self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY) if self.bgr.ndim == 3 else self.bgr
+        return self._gray
+
+    @property
+    def laplacian_var(self) -> float:
+        """Texture measure shared by the age and liveness stages"""
+        if self._laplacian_var is None:
+            self._laplacian_var = float(cv2.Laplacian(self.gray, cv2.CV_64F).var())
+        return self._laplacian_var
+
+    @property
+    def brightness(self) -> float:
+        if self._brightness is None:
+            self._brightness = float(np.mean(self.gray))
+        return self._brightness
+
+
+class FrameContext:
+    """A BGR frame plus everything derived from it, each computed on first use"""
+
+    def __init__(self, frame: np.ndarray):
+        self.bgr = frame
+        self._gray: Optional[np.ndarray] = None
+        self._rgb: Optional[np.ndarray] = None
+        self._downscaled: Dict[int, Tuple["FrameContext", float]] = {}
+
+    @classmethod
+    def of(cls, frame) -> "FrameContext":
+        """Accept either a raw frame or an existing context"""
+        return frame if isinstance(frame, FrameContext) else cls(frame)
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def has_gray(self) -> bool:
+        return self._gray is not None
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY) if self.bgr.ndim == 3 else self.bgr
+        return self._gray
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def downscaled(self, width: int) -> Tuple["FrameContext", float]:
+        """(context of a copy at most `width` wide, scale factor); cached per width"""
+        if width not in self._downscaled:
+            h, w = self.bgr.shape[:2]
+            if w <= width:
+                self._downscaled[width] = (self, 1.0)
+            else:
+                scale = width / w
+                small = cv2.resize(self.bgr, (width, int(round(h * scale))), interpolation=cv2.INTER_AREA)
+                self._downscaled[width] = (FrameContext(small), scale)
+        return self._downscaled[width]
+
+    def region(self, bbox) -> FaceRegion:
+        return FaceRegion(self, bbox)
@@ -0,0 +1,392 @@
+"""
+Live Face Analysis
+The camera is read on its own thread into a single latest-frame slot (older
+frames are simply overwritten), and a worker analyzes the newest frame at an
+adaptive rate and publishes an immutable, timestamped result. Mood queries
+from the conversation loop are plain reads of that result and never touch
+the camera or run detection themselves.
+"""
+import os
+import time
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    CV2_AVAILABLE = False
+
+# Analysis pacing (seconds): fastest rate, rate while nobody is in view
+ANALYSIS_INTERVAL = float(os.getenv("VISION_ANALYSIS_INTERVAL", "0.2") or 0.2)
+IDLE_INTERVAL = float(os.getenv("VISION_IDLE_INTERVAL", "1.0") or 1.0)
+# Fraction of one core the analysis worker may use on average
+MAX_DUTY = float(os.getenv("VISION_MAX_DUTY", "0.25") or 0.25)
+# Mood evidence halves in weight every N seconds
+MOOD_HALF_LIFE = float(os.getenv("VISION_MOOD_HALF_LIFE", "3.0") or 3.0)
+# Report "no_face" once nobody has been seen for this long
+NO_FACE_AFTER = 2.0
+# Release the camera after this many seconds without a mood read (0 keeps it open)
+CAMERA_IDLE_TIMEOUT = float(os.getenv("VISION_CAMERA_IDLE", "120") or 0)
+# Results older than this (camera stalled or released) are not served
+STALE_AFTER = 10.0
+
+# Per-face emotion confidence below this is not counted as mood evidence
+_MIN_EVIDENCE = 0.4
+
+
+def _freeze(value):
+    """Read-only copy of nested analysis dicts/lists"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return None  # face crops are views into a camera frame; never published
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+EMPTY_ANALYSIS = MappingProxyType({'faces_detected': 0, 'analysis': ()})
+
+
+@dataclass(frozen=True)
+class LiveResult:
+    """One published analysis; replaced as a whole, never modified"""
+    timestamp: float                 # when the analyzed frame was captured
+    frame_seq: int
+    analysis: MappingProxyType       # FaceAnalyzer.analyze_face() shape, read-only
+    mood: str                        # smoothed mood ("no_face" when nobody is in view)
+    mood_confidence: float
+    latency: float                   # seconds spent analyzing the frame
+    analyzed_at: float = field(default_factory=time.time)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+
+class FrameBuffer:
+    """Single-slot frame hand-off: writers overwrite, readers get the newest"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._timestamp = 0.0
+        self.seq = 0            # frames written in total
+        self.dropped = 0        # frames overwritten before anyone read them
+        self._read_seq = 0
+
+    def put(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        with self._cond:
+            if self.seq > self._read_seq:
+                self.dropped += 1
+            self._frame = frame
+            self._timestamp = timestamp or time.time()
+            self.seq += 1
+            self._cond.notify_all()
+
+    def latest(self) -> Tuple[Optional[np.ndarray], int, float]:
+        """(frame, seq, timestamp) of the newest frame without waiting"""
+        with self._cond:
+            self._read_seq = self.seq
+            return self._frame, self.seq, self._timestamp
+
+    def wait_newer(self, seq: int, timeout: float) -> Tuple[Optional[np.ndarray], int, float]:
+        """Newest frame once its seq is past `seq` (or whatever is there at the timeout)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > seq, timeout=timeout)
+            self._read_seq = self.seq
+            return self._frame, self.seq, self._timestamp
+
+
+def open_camera(camera_id: int = 0, width: int = 640, height: int = 480, fps: int = 30):
+    """Open a cv2.VideoCapture configured for low latency, or None"""
+    if not CV2_AVAILABLE:
+        return None
+    cap = cv2.VideoCapture(camera_id)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    # Keep the driver queue short so read() returns a current frame
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class CameraStream:
+    """Reads `capture` (anything with cv2.VideoCapture's read()/release()) on a thread"""
+
+    def __init__(self, capture, buffer: Optional[FrameBuffer] = None):
+        self.capture = capture
+        self.buffer = buffer or FrameBuffer()
+        self._stop = threading.Event()
+        self._thread = None
+        self.failures = 0
+
+    def start(self) -> "CameraStream":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                ok, frame = self.capture.read()
+            except Exception:
+                ok, frame = False, None
+            if ok and frame is not None:
+                self.failures = 0
+                self.buffer.put(frame)
+            else:
+                # Unplugged/busy camera: back off instead of spinning
+                self.failures += 1
+                self._stop.wait(min(1.0, 0.05 * self.failures))
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.capture.release()
+        except Exception:
+            pass
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+class MoodSmoother:
+    """Exponentially decayed per-emotion evidence; the mood is the strongest one"""
+
+    def __init__(self, half_life: float = MOOD_HALF_LIFE, no_face_after: float = NO_FACE_AFTER):
+        self.half_life = max(0.01, half_life)
+        self.no_face_after = no_face_after
+        self.scores: Dict[str, float] = {}
+        self._updated = None
+        self.last_face = None
+
+    def update(self, analysis: Dict[str, Any], timestamp: float) -> Tuple[str, float]:
+        if self._updated is not None:
+            decay = 0.5 ** (max(0.0, timestamp - self._updated) / self.half_life)
+            for emotion in self.scores:
+                self.scores[emotion] *= decay
+        self._updated = timestamp
+
+        faces = analysis.get('analysis') or ()
+        if analysis.get('faces_detected', 0) and faces:
+            self.last_face = timestamp
+            emotion = faces[0].get('emotion') or {}
+            name, confidence = emotion.get('emotion', 'neutral'), emotion.get('confidence', 0.0)
+            if name != 'unknown' and confidence > _MIN_EVIDENCE:
+                self.scores[name] = self.scores.get(name, 0.0) + confidence
+
+        if self.last_face is None or timestamp - self.last_face > self.no_face_after:
+            return "no_face", 0.0
+        total = sum(self.scores.values())
+        if total <= 0:
+            return "neutral", 0.0
+        mood = max(self.scores, key=self.scores.get)
+        return mood, self.scores[mood] / total
+
+
+class AnalysisWorker:
+    """Analyzes the newest buffered frame at an adaptive rate and publishes LiveResults"""
+
+    def __init__(self, analyze: Callable[[np.ndarray], Dict], buffer: FrameBuffer,
+                 interval: float = ANALYSIS_INTERVAL, idle_interval: float = IDLE_INTERVAL,
+                 max_duty: float = MAX_DUTY, smoother: Optional[MoodSmoother] = None):
+        self.analyze = analyze
+        self.buffer = buffer
+        self.interval = interval
+        self.idle_interval = max(interval, idle_interval)
+        self.max_duty = min(1.0, max(0.01, max_duty))
+        self.smoother = smoother or MoodSmoother()
+        self._result: Optional[LiveResult] = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.analyzed = 0
+        self._listeners = []
+
+    @property
+    def result(self) -> Optional[LiveResult]:
+        # A single attribute read: the worker swaps in whole new objects
+        return self._result
+
+    def add_listener(self, callback: Callable[[LiveResult], None]):
+        """`callback(result)` runs on the worker thread after every publish"""
+        self._listeners.append(callback)
+
+    def start(self) -> "AnalysisWorker":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="face-analysis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def next_delay(self, latency: float, faces: int) -> float:
+        """Pause before the next analysis: slower with nobody in view or when analysis is expensive"""
+        base = self.interval if faces else self.idle_interval
+        # Keep analysis at most max_duty of the wall time
+        budget = latency * (1.0 / self.max_duty - 1.0)
+        return max(0.0, max(base - latency, budget))
+
+    def process(self, frame: np.ndarray, seq: int, timestamp: float) -> LiveResult:
+        """Analyze one frame and publish the result (also used directly by tests)"""
+        t0 = time.perf_counter()
+        try:
+            analysis = self.analyze(frame)
+        except Exception as e:
+            analysis = {'faces_detected': 0, 'analysis': [], 'error': str(e)}
+        latency = time.perf_counter() - t0
+        mood, confidence = self.smoother.update(analysis, timestamp)
+        confidence = round(confidence, 3)
+        analysis = dict(analysis, timestamp=timestamp, mood={'emotion': mood, 'confidence': confidence})
+        result = LiveResult(timestamp=timestamp, frame_seq=seq, analysis=_freeze(analysis),
+                            mood=mood, mood_confidence=confidence, latency=latency)
+        self._result = result
+        self.analyzed += 1
+        for callback in list(self._listeners):
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Face analysis listener error: {e}")
+        return result
+
+    def _run(self):
+        seq = 0
+        while not self._stop.is_set():
+            frame, new_seq, timestamp = self.buffer.wait_newer(seq, timeout=0.5)
+            if self._stop.is_set():
+                break
+            if frame is None or new_seq == seq:
+                continue
+            seq = new_seq
+            result = self.process(frame, seq, timestamp)
+            if self._stop.wait(self.next_delay(result.latency, result.analysis.get('faces_detected', 0))):
+                break
+
+
+class LiveFaceAnalysis:
+    """Camera stream + analysis worker; reads are O(1)
+
+    With `reopen` (a function returning a fresh capture), the camera is
+    released after `idle_timeout` seconds without reads and reopened in the
+    background by the next read.
+    """
+
+    def __init__(self, analyze: Callable[[np.ndarray], Dict], capture, reopen: Optional[Callable] = None,
+                 idle_timeout: float = CAMERA_IDLE_TIMEOUT, **worker_options):
+        self.stream = CameraStream(capture)
+        self.worker = AnalysisWorker(analyze, self.stream.buffer, **worker_options)
+        self.reopen = reopen
+        self.idle_timeout = idle_timeout
+        self._last_read = time.monotonic()
+        self._stopped = False
+        self._reopen_lock = threading.Lock()
+        self._reopening = False
+        if reopen is not None and idle_timeout > 0:
+            self.worker.add_listener(self._check_idle)
+
+    def start(self) -> "LiveFaceAnalysis":
+        self._stopped = False
+        self._last_read = time.monotonic()
+        self.stream.start()
+        self.worker.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self.worker.stop()
+        self.stream.stop()
+
+    @property
+    def running(self) -> bool:
+        return not self._stopped and (self.stream.running or self.reopen is not None)
+
+    @property
+    def camera_open(self) -> bool:
+        return self.stream.running
+
+    @property
+    def idle_seconds(self) -> float:
+        """Seconds since the last read"""
+        return time.monotonic() - self._last_read
+
+    # ------------------------------------------------------------------
+    # Idle release / reopen
+    # ------------------------------------------------------------------
+
+    def _check_idle(self, _result: LiveResult):
+        """Runs on the worker thread after each result"""
+        if time.monotonic() - self._last_read > self.idle_timeout and self.stream.running:
+            self.stream.stop()
+            print("📷 Camera idle: released until face analysis is needed again")
+
+    def touch(self):
+        """Count as a read: restarts the idle timer and reopens a released camera"""
+        self._last_read = time.monotonic()
+        if self.reopen is None or self._stopped or self.stream.running or self._reopening:
+            return
+        with self._reopen_lock:
+            if self._reopening:
+                return
+            self._reopening = True
+        threading.Thread(target=self._reopen_camera, name="camera-reopen", daemon=True).start()
+
+    def _reopen_camera(self):
+        try:
+            capture = self.reopen()
+            if capture is not None and not self._stopped:
+                self.stream = CameraStream(capture, buffer=self.stream.buffer).start()
+        except Exception as e:
+            print(f"Camera reopen failed: {e}")
+        finally:
+            self._reopening = False
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def result(self) -> Optional[LiveResult]:
+        self.touch()
+        result = self.worker.result
+        if result is None or time.time() - result.timestamp > STALE_AFTER:
+            return None
+        return result
+
+    def analysis(self):
+        """Latest analyze_face()-shaped result (read-only)"""
+        result = self.result()
+        return result.analysis if result is not None else EMPTY_ANALYSIS
+
+    def mood(self) -> Tuple[str, float]:
+        result = self.result()
+        if result is None:
+            return "no_face", 0.0
+        return result.mood, result.mood_confidence
+
+    def wait_result(self, timeout: float = 2.0) -> Optional[LiveResult]:
+        """Block until the first result exists (only matters right after start)"""
+        end = time.monotonic() + timeout
+        while self.result() is None and time.monotonic() < end:
+            time.sleep(0.01)
+        return self.result()
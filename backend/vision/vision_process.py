@@ -0,0 +1,410 @@
+"""
+Vision Worker Process
+Runs the camera and face analysis in a separate process so OpenCV/MediaPipe
+work never competes with STT, TTS or the REPL for the main interpreter's GIL.
+
+Frames and analysis results cross the process boundary through
+multiprocessing.shared_memory double buffers (the writer fills the idle slot,
+then flips the active index; frames are never pickled), and a Pipe carries
+the small control channel: start, stop, rate, touch, shutdown. The main process
+only reads whatever was last published; its reads are forwarded as "touch"
+messages (at most once per TOUCH_INTERVAL) so the worker's idle timer can
+release the camera when nobody asks for the mood and reopen it when they do.
+"""
+import os
+import json
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from collections.abc import Mapping
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from vision.live_analysis import LiveResult, EMPTY_ANALYSIS, _freeze
+
+# Largest frame the shared buffer holds (bigger frames are downscaled to fit)
+MAX_FRAME_SHAPE = (720, 1280, 3)
+# Bytes reserved for one JSON-encoded analysis result
+RESULT_BYTES = 64 * 1024
+# Seconds to wait for the worker to open the camera
+START_TIMEOUT = float(os.getenv("VISION_PROCESS_START_TIMEOUT", "15") or 15)
+# Reads are reported to the worker at most this often (seconds)
+TOUCH_INTERVAL = 1.0
+
+# Header: active slot, publish count, then per slot: seq, length, timestamp (ns), 3 shape dims
+_HEADER_FIELDS = 2 + 2 * 6
+_HEADER_BYTES = _HEADER_FIELDS * 8
+
+
+class DoubleBuffer:
+    """Two fixed-size slots in one shared-memory block, for a single writer process.
+
+    A slot's seq is odd while it is being written; readers copy the active
+    slot and retry if its seq changed meanwhile.
+    """
+
+    def __init__(self, slot_bytes: int, name: Optional[str] = None):
+        self.slot_bytes = int(slot_bytes)
+        size = _HEADER_BYTES + 2 * self.slot_bytes
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self._data = np.ndarray((2, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf, offset=_HEADER_BYTES)
+        if self.owner:
+            self._header[:] = 0
+        self._read_seq = -1
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def published(self) -> int:
+        return int(self._header[1])
+
+    def _meta(self, slot: int) -> int:
+        return 2 + slot * 6
+
+    def write(self, data: np.ndarray, timestamp: float, shape: Tuple[int, ...] = ()):
+        """Publish `data` (any contiguous array; viewed as bytes)"""
+        raw = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+        if raw.size > self.slot_bytes:
+            raise ValueError(f"{raw.size} bytes do not fit a {self.slot_bytes}-byte slot")
+        slot = 1 - int(self._header[0])
+        m = self._meta(slot)
+        self._header[m] += 1                      # odd: slot being written
+        self._data[slot, :raw.size] = raw
+        self._header[m + 1] = raw.size
+        self._header[m + 2] = int(timestamp * 1e9)
+        dims = (tuple(shape) + (0, 0, 0))[:3]
+        self._header[m + 3:m + 6] = dims
+        self._header[m] += 1                      # even: complete
+        self._header[0] = slot
+        self._header[1] += 1
+
+    def read(self, only_new: bool = False):
+        """(bytes array copy, shape, timestamp, publish count) of the active slot, or None"""
+        for _ in range(10):
+            published = int(self._header[1])
+            if not published or (only_new and published == self._read_seq):
+                return None
+            slot = int(self._header[0])
+            m = self._meta(slot)
+            seq = int(self._header[m])
+            if seq % 2:
+                time.sleep(0)
+                continue
+            length = int(self._header[m + 1])
+            data = self._data[slot, :length].copy()
+            timestamp = int(self._header[m + 2]) / 1e9
+            shape = tuple(int(d) for d in self._header[m + 3:m + 6] if d)
+            if int(self._header[m]) == seq:
+                self._read_seq = published
+                return data, shape, timestamp, published
+        return None
+
+    def close(self):
+        self._header = self._data = None
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except Exception:
+            pass
+
+
+def _jsonable(value):
+    if isinstance(value, Mapping):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return None  # face crops are not sent; the frame buffer has the pixels
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# ----------------------------------------------------------------------
+# Worker side (runs in the child process)
+# ----------------------------------------------------------------------
+
+def _fit(frame: np.ndarray) -> np.ndarray:
+    import cv2
+    h, w = frame.shape[:2]
+    mh, mw = MAX_FRAME_SHAPE[:2]
+    if h <= mh and w <= mw:
+        return frame
+    scale = min(mh / h, mw / w)
+    return cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+
+def _worker_main(source, frame_name: str, result_name: str, conn, interval: Optional[float]):
+    frames = DoubleBuffer(int(np.prod(MAX_FRAME_SHAPE)), name=frame_name)
+    results = DoubleBuffer(RESULT_BYTES, name=result_name)
+    live = None
+    try:
+        from vision.face_analyzer import FaceAnalyzer, VISION_TRACKING
+        from vision.face_tracker import TrackedFaceAnalysis
+        from vision.live_analysis import LiveFaceAnalysis, open_camera
+
+        analyzer = FaceAnalyzer()
+        analyze = TrackedFaceAnalysis(analyzer) if VISION_TRACKING else analyzer.analyze_face
+
+        def _analyze(frame):
+            frame = _fit(frame)
+            result = analyze(frame)
+            frames.write(frame, time.time(), frame.shape)
+            return result
+
+        def _publish(result: LiveResult):
+            payload = {
+                'timestamp': result.timestamp, 'frame_seq': result.frame_seq, 'latency': result.latency,
+                'mood': result.mood, 'mood_confidence': result.mood_confidence,
+                'analysis': _jsonable(result.analysis),
+            }
+            encoded = json.dumps(payload, default=str).encode("utf-8")
+            if len(encoded) > RESULT_BYTES:
+                payload['analysis'] = {'faces_detected': payload['analysis'].get('faces_detected', 0),
+                                       'analysis': payload['analysis'].get('analysis', [])[:1]}
+                encoded = json.dumps(payload, default=str).encode("utf-8")[:RESULT_BYTES]
+            results.write(np.frombuffer(encoded, dtype=np.uint8), result.analyzed_at)
+
+        def _open_source():
+            return open_camera(source) if isinstance(source, int) else _open_file(source)
+
+        def _start() -> Optional[str]:
+            nonlocal live
+            if live is not None:
+                return None
+            capture = _open_source()
+            if capture is None:
+                return f"Camera {source} could not be opened"
+            options = {'interval': interval} if interval else {}
+            # Released after VISION_CAMERA_IDLE without reads (see "touch"), reopened by the next one
+            live = LiveFaceAnalysis(_analyze, capture, reopen=_open_source, **options)
+            live.worker.add_listener(_publish)
+            live.start()
+            return None
+
+        def _stop():
+            nonlocal live
+            if live is not None:
+                live.stop()
+                live = None
+
+        error = _start()
+        conn.send(("error", error) if error else ("ready", os.getpid()))
+        if error:
+            return
+
+        while True:
+            if not conn.poll(0.5):
+                continue
+            command, *args = conn.recv()
+            if command == "shutdown":
+                break
+            elif command == "stop":
+                _stop()  # releases the camera; the process stays up
+                conn.send(("ok", None))
+            elif command == "touch":
+                if live is not None:
+                    live.touch()  # fire and forget: no reply
+            elif command == "start":
+                conn.send(("ok", _start()))
+            elif command == "rate" and args:
+                if live is not None:
+                    live.worker.interval = max(0.01, float(args[0]))
+                    live.worker.idle_interval = max(live.worker.interval, live.worker.idle_interval)
+                conn.send(("ok", None))
+            elif command == "stats":
+                conn.send(("ok", {'analyzed': live.worker.analyzed if live else 0,
+                                  'dropped': live.stream.buffer.dropped if live else 0,
+                                  'capturing': live is not None,
+                                  'camera_open': live.camera_open if live else False,
+                                  'idle_seconds': round(live.idle_seconds, 2) if live else None}))
+    except (EOFError, KeyboardInterrupt):
+        pass  # parent went away
+    except Exception as e:
+        try:
+            conn.send(("error", str(e)))
+        except Exception:
+            pass
+    finally:
+        if live is not None:
+            live.stop()
+        frames.close()
+        results.close()
+
+
+def _open_file(path: str):
+    """Video file source (camera-free runs); None when unreadable"""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    return cap
+
+
+# ----------------------------------------------------------------------
+# Main-process side
+# ----------------------------------------------------------------------
+
+class VisionProcess:
+    """Owns the worker process and shared buffers; reads are lock-free and O(1) when nothing changed"""
+
+    def __init__(self, source=0, interval: Optional[float] = None):
+        self.source = source
+        self.interval = interval
+        self._frames: Optional[DoubleBuffer] = None
+        self._results: Optional[DoubleBuffer] = None
+        self._conn = None
+        self._process = None
+        self._lock = threading.Lock()    # one control request at a time
+        self._cached: Optional[LiveResult] = None
+        self._cached_seq = 0
+        self._touched = 0.0
+        self.error: Optional[str] = None
+
+    def start(self, timeout: float = START_TIMEOUT) -> bool:
+        if self.running:
+            return True
+        self._frames = DoubleBuffer(int(np.prod(MAX_FRAME_SHAPE)))
+        self._results = DoubleBuffer(RESULT_BYTES)
+        ctx = mp.get_context("spawn")  # no fork of a threaded parent; same behaviour as Windows
+        parent, child = ctx.Pipe()
+        self._conn = parent
+        self._process = ctx.Process(
+            target=_worker_main, name="vision-worker", daemon=True,
+            args=(self.source, self._frames.name, self._results.name, child, self.interval))
+        self._process.start()
+        child.close()
+        if parent.poll(timeout):
+            try:
+                status, detail = parent.recv()
+            except EOFError:
+                status, detail = "error", "vision worker exited"
+        else:
+            status, detail = "error", "vision worker did not start in time"
+        if status != "ready":
+            self.error = detail
+            self.stop()
+            return False
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _request(self, *message, timeout: float = 5.0):
+        with self._lock:
+            if not self.running:
+                return None
+            try:
+                self._conn.send(message)
+                if self._conn.poll(timeout):
+                    return self._conn.recv()[1]
+            except (EOFError, OSError, BrokenPipeError):
+                pass
+            return None
+
+    def set_rate(self, interval: float):
+        """Fastest analysis interval in seconds"""
+        self._request("rate", interval)
+
+    def pause(self):
+        """Release the camera but keep the worker process warm"""
+        self._request("stop")
+
+    def resume(self) -> bool:
+        return self._request("start", timeout=START_TIMEOUT) is None and self.running
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request("stats") or {}
+
+    def stop(self, timeout: float = 3.0):
+        if self._process is not None:
+            with self._lock:
+                try:
+                    self._conn.send(("shutdown",))
+                except Exception:
+                    pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(1.0)
+            self._process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        for buf in (self._frames, self._results):
+            if buf is not None:
+                buf.close()
+        self._frames = self._results = None
+
+    # Reads (same interface as LiveFaceAnalysis)
+
+    def _touch(self):
+        """Tell the worker someone is reading; skipped while a control request holds the pipe"""
+        now = time.monotonic()
+        if now - self._touched < TOUCH_INTERVAL or not self._lock.acquire(blocking=False):
+            return
+        try:
+            if self._conn is not None:
+                self._conn.send(("touch",))
+            self._touched = now
+        except (OSError, BrokenPipeError):
+            pass
+        finally:
+            self._lock.release()
+
+    def result(self) -> Optional[LiveResult]:
+        self._touch()
+        results = self._results
+        if results is None:
+            return self._cached
+        if results.published == self._cached_seq:
+            return self._cached  # nothing new: no decode
+        read = results.read()
+        if read is None:
+            return self._cached
+        data, _shape, _ts, seq = read
+        try:
+            payload = json.loads(data.tobytes().decode("utf-8"))
+            self._cached = LiveResult(
+                timestamp=payload['timestamp'], frame_seq=payload['frame_seq'],
+                analysis=_freeze(payload['analysis']), mood=payload['mood'],
+                mood_confidence=payload['mood_confidence'], latency=payload['latency'])
+            self._cached_seq = seq
+        except Exception:
+            pass
+        return self._cached
+
+    def analysis(self):
+        result = self.result()
+        return result.analysis if result is not None else EMPTY_ANALYSIS
+
+    def mood(self) -> Tuple[str, float]:
+        result = self.result()
+        if result is None:
+            return "no_face", 0.0
+        return result.mood, result.mood_confidence
+
+    def latest_frame(self) -> Optional[np.ndarray]:
+        """Copy of the last analyzed frame"""
+        if self._frames is None:
+            return None
+        read = self._frames.read()
+        if read is None:
+            return None
+        data, shape, _ts, _seq = read
+        return data.reshape(shape)
+
+    def wait_result(self, timeout: float = 2.0) -> Optional[LiveResult]:
+        end = time.monotonic() + timeout
+        while self.result() is None and time.monotonic() < end:
+            time.sleep(0.02)
+        return self.result()
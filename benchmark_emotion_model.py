@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: emotion classifiers (heuristic vs ONNX) on a fixture image set
+
+The fixture directory holds one sub-folder per emotion label with face crops
+inside (FER-style layout, e.g. fixtures/happy/001.png). Every available model
+classifies every image; accuracy and per-face latency (batched per frame of
+BATCH faces) are reported. Folder names must be FER+ labels (neutral, happy,
+surprised, sad, angry, disgusted, fearful, contempt); the FER2013 test split,
+sorted into those folders, works as-is.
+
+The ONNX model is skipped until it exists: run download_emotion_model.py first.
+
+Usage:
+    python benchmark_emotion_model.py fixtures_dir [model.onnx]
+    python benchmark_emotion_model.py                # latency only, random crops
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+BATCH = 4  # faces classified per call, like a frame with several people
+
+
+def load_fixtures(root):
+    images, labels = [], []
+    for label in sorted(os.listdir(root)):
+        folder = os.path.join(root, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            image = cv2.imread(os.path.join(folder, name))
+            if image is not None:
+                images.append(image)
+                labels.append(label)
+    return images, labels
+
+
+def bench(model, regions, labels=None):
+    model.predict(regions[:1])  # load and warm up
+    predictions = []
+    t0 = time.perf_counter()
+    for i in range(0, len(regions), BATCH):
+        predictions.extend(model.predict(regions[i:i + BATCH]))
+    per_face = (time.perf_counter() - t0) / max(1, len(regions)) * 1000
+    accuracy = None
+    if labels:
+        accuracy = sum(p['emotion'] == l for p, l in zip(predictions, labels)) / len(labels)
+    return per_face, accuracy
+
+
+def main():
+    from vision.frame_context import FrameContext
+    from vision.emotion_model import (HeuristicEmotionModel, OnnxEmotionModel, EMOTION_MODEL_PATH)
+
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else None
+    model_path = sys.argv[2] if len(sys.argv) > 2 else EMOTION_MODEL_PATH
+
+    if fixtures:
+        if not os.path.isdir(fixtures):
+            print(f"❌ Fixture directory {fixtures} not found (expected one folder of face crops per label)")
+            return 1
+        images, labels = load_fixtures(fixtures)
+        if not images:
+            print(f"❌ No images under {fixtures}")
+            return 1
+    else:
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 255, (180, 150, 3), dtype=np.uint8) for _ in range(200)]
+        labels = None
+
+    regions = []
+    for image in images:
+        h, w = image.shape[:2]
+        regions.append(FrameContext(image).region((0, 0, w, h)))
+
+    print("⚡ Emotion model benchmark")
+    print("=" * 60)
+    print(f"Faces: {len(regions)} ({fixtures or 'random crops, latency only'}), batch {BATCH}")
+
+    models = [HeuristicEmotionModel()]
+    onnx_model = OnnxEmotionModel(model_path)
+    if onnx_model._load():
+        models.append(onnx_model)
+    else:
+        print(f"ONNX model skipped: {onnx_model.load_error} (run download_emotion_model.py)")
+
+    for model in models:
+        per_face, accuracy = bench(model, regions, labels)
+        runtime = f" ({model.runtime})" if getattr(model, 'runtime', None) else ""
+        acc = f"  accuracy {accuracy * 100:5.1f}%" if accuracy is not None else ""
+        print(f"{model.name + runtime:28s} {per_face:7.3f} ms/face{acc}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Vision benchmark suite (no webcam needed)
+
+Feeds deterministic frames through detect_faces, analyze_face and the full
+mood pipeline (tracker + analysis worker + mood smoothing), and reports
+frames per second, per-stage latency percentiles and peak memory. Results
+can be saved as a baseline JSON and later runs compared against it; the
+script exits with status 1 when a metric regresses beyond the tolerance.
+
+Usage:
+    python benchmark_vision.py                                   # synthetic clip
+    python benchmark_vision.py session.mp4 --frames 300          # recorded video / image folder
+    python benchmark_vision.py --save-baseline vision_baseline.json
+    python benchmark_vision.py --baseline vision_baseline.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import tracemalloc
+import argparse
+
+import cv2
+import numpy as np
+import psutil
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from benchmark_face_tracking import synthetic_frames, load_frames
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_TOLERANCE = 0.25
+# Stage timings below this are dominated by timer noise and never flagged
+MIN_COMPARE_MS = 0.05
+
+
+class StageTimer:
+    """Collects per-stage latencies (seconds) for one suite"""
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, stage, func, *args):
+        t0 = time.perf_counter()
+        result = func(*args)
+        self.samples.setdefault(stage, []).append(time.perf_counter() - t0)
+        return result
+
+    def summary(self):
+        stages = {}
+        for stage, values in self.samples.items():
+            ms = np.asarray(values) * 1000
+            stages[stage] = {'mean_ms': round(float(ms.mean()), 4)}
+            for p in PERCENTILES:
+                stages[stage][f'p{p}_ms'] = round(float(np.percentile(ms, p)), 4)
+        return stages
+
+
+def _measure(name, frames, make_step):
+    """Run a fresh step(frame, index, timer) over all frames, twice.
+
+    The timed pass gives fps, CPU time and stage percentiles; peak traced
+    memory comes from a separate untimed pass, since tracemalloc's
+    allocation hooks slow everything down.
+    """
+    timer = StageTimer()
+    process = psutil.Process()
+    rss0 = process.memory_info().rss
+    peak_rss = rss0
+    faces = 0
+    step = make_step()
+    t0 = time.perf_counter()
+    cpu0 = time.process_time()
+    for index, frame in enumerate(frames):
+        faces += step(frame, index, timer)
+        if index % 10 == 0:
+            peak_rss = max(peak_rss, process.memory_info().rss)
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+    peak_rss = max(peak_rss, process.memory_info().rss)
+
+    step = make_step()
+    tracemalloc.start()
+    for index, frame in enumerate(frames):
+        step(frame, index, StageTimer())
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'suite': name,
+        'frames': len(frames),
+        'faces': faces,
+        'fps': round(len(frames) / wall, 2) if wall else 0.0,
+        'cpu_ms_per_frame': round(cpu / len(frames) * 1000, 4) if frames else 0.0,
+        'stages': timer.summary(),
+        'peak_traced_mb': round(traced_peak / 1e6, 3),
+        'peak_rss_growth_mb': round((peak_rss - rss0) / 1e6, 3),
+    }
+
+
+def bench_detect(analyzer, frames):
+    from vision.frame_context import FrameContext
+
+    def make_step():
+        def step(frame, index, timer):
+            ctx = FrameContext(frame)
+            return len(timer.time('detect', analyzer.detect_faces, ctx))
+        return step
+    return _measure('detect_faces', frames, make_step)
+
+
+def bench_stages(analyzer, frames):
+    """The work analyze_face does, with each batched stage timed separately"""
+    from vision.frame_context import FrameContext
+
+    def make_step():
+        def step(frame, index, timer):
+            t0 = time.perf_counter()
+            ctx = FrameContext(frame)
+            faces = timer.time('detect', analyzer.detect_faces, ctx)
+            regions = [ctx.region(f['bbox']) for f in faces if f['bbox'][2] > 0 and f['bbox'][3] > 0]
+            if regions:
+                timer.time('emotion', analyzer.emotions, regions)
+                timer.time('age_gender', analyzer.ages_genders, regions)
+                timer.time('liveness', analyzer.liveness_checks, regions)
+            timer.samples.setdefault('stages_total', []).append(time.perf_counter() - t0)
+            return len(faces)
+        return step
+    return _measure('analyze_stages', frames, make_step)
+
+
+def bench_analyze(analyzer, frames):
+    """analyze_face, the public entry point, end to end (its own pass: fps covers one call per frame)"""
+    def make_step():
+        def step(frame, index, timer):
+            return timer.time('analyze_face', analyzer.analyze_face, frame)['faces_detected']
+        return step
+    return _measure('analyze_face', frames, make_step)
+
+
+def bench_mood(analyzer, frames, fps=30.0):
+    """Tracker + AnalysisWorker.process (freeze, smoothing) as the live pipeline runs it"""
+    from vision.face_tracker import TrackedFaceAnalysis
+    from vision.live_analysis import AnalysisWorker, FrameBuffer
+
+    def make_step():
+        # A fresh tracker per pass: the memory pass must not inherit the timed pass's tracks
+        worker = AnalysisWorker(TrackedFaceAnalysis(analyzer), FrameBuffer())
+
+        def step(frame, index, timer):
+            result = timer.time('mood_pipeline', worker.process, frame, index + 1, index / fps)
+            return result.analysis.get('faces_detected', 0)
+        return step
+    return _measure('mood_pipeline', frames, make_step)
+
+
+def run_suite(frames):
+    from vision.face_analyzer import FaceAnalyzer
+
+    analyzer = FaceAnalyzer()
+    # Warm up lazy detectors/models so the first frame doesn't skew the tail
+    analyzer.analyze_face(frames[0])
+    results = {
+        'meta': {
+            'frames': len(frames),
+            'frame_shape': list(frames[0].shape),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'emotion_model': type(analyzer.emotion_model).__name__,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'suites': {},
+    }
+    for bench in (bench_detect, bench_stages, bench_analyze, bench_mood):
+        suite = bench(analyzer, frames)
+        results['suites'][suite['suite']] = suite
+    return results
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """List of regressions (strings) of `current` against `baseline`"""
+    regressions = []
+    for name, base in baseline.get('suites', {}).items():
+        cur = current.get('suites', {}).get(name)
+        if cur is None:
+            regressions.append(f"{name}: suite missing")
+            continue
+        if base.get('fps') and cur['fps'] < base['fps'] * (1 - tolerance):
+            regressions.append(f"{name}: fps {cur['fps']} < baseline {base['fps']}")
+        for stage, stats in base.get('stages', {}).items():
+            now = cur['stages'].get(stage)
+            if now is None:
+                continue
+            limit = stats['p95_ms'] * (1 + tolerance)
+            if now['p95_ms'] > max(limit, MIN_COMPARE_MS):
+                regressions.append(f"{name}/{stage}: p95 {now['p95_ms']}ms > baseline {stats['p95_ms']}ms")
+        base_mem = base.get('peak_traced_mb', 0)
+        if base_mem and cur['peak_traced_mb'] > base_mem * (1 + tolerance) + 1.0:
+            regressions.append(f"{name}: peak memory {cur['peak_traced_mb']}MB > baseline {base_mem}MB")
+    return regressions
+
+
+def print_results(results):
+    meta = results['meta']
+    print(f"\n{meta['frames']} frames {tuple(meta['frame_shape'])}, OpenCV {meta['opencv']}, "
+          f"emotion model {meta['emotion_model']}")
+    for name, suite in results['suites'].items():
+        print(f"\n📊 {name}: {suite['fps']:.1f} fps, {suite['cpu_ms_per_frame']:.2f} ms CPU/frame, "
+              f"{suite['faces']} faces, peak {suite['peak_traced_mb']:.2f} MB traced "
+              f"(+{suite['peak_rss_growth_mb']:.1f} MB RSS)")
+        for stage, stats in suite['stages'].items():
+            print(f"   {stage:<14} mean {stats['mean_ms']:8.3f}  p50 {stats['p50_ms']:8.3f}  "
+                  f"p95 {stats['p95_ms']:8.3f}  p99 {stats['p99_ms']:8.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vision benchmark suite")
+    parser.add_argument('source', nargs='?', help="video file or image folder (default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=200, help="number of frames")
+    parser.add_argument('--baseline', help="compare against this baseline JSON")
+    parser.add_argument('--save-baseline', help="write results to this baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="allowed regression (0.25 = 25%%)")
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    print("🎥 Vision Benchmark")
+    print("=" * 60)
+    frames = list(load_frames(args.source, args.frames) if args.source else synthetic_frames(args.frames))
+    if not frames:
+        print(f"❌ No frames in {args.source}")
+        return 1
+
+    results = run_suite(frames)
+    print_results(results)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"\n💾 Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print("\n" + "=" * 60)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print(f"✅ No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
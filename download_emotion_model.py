@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Fetch the FER+ emotion model used by the ONNX emotion classifier
+
+By default the int8 build published in the ONNX model zoo is downloaded to
+EMOTION_MODEL_PATH (models/emotion-ferplus-12-int8.onnx under the project
+root). With --quantize the float model is downloaded instead and quantized
+locally with onnxruntime (pip install onnxruntime).
+
+Usage:
+    python download_emotion_model.py
+    python download_emotion_model.py --quantize
+    python download_emotion_model.py --output path/to/model.onnx
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def main(argv=None):
+    from vision.emotion_model import download_emotion_model, EMOTION_MODEL_PATH, PROJECT_ROOT
+
+    parser = argparse.ArgumentParser(description="Download the FER+ emotion model")
+    parser.add_argument('--output', default=EMOTION_MODEL_PATH, help="where to write the model")
+    parser.add_argument('--quantize', action='store_true', help="download the float model and quantize it here")
+    parser.add_argument('--force', action='store_true', help="replace an existing model file")
+    args = parser.parse_args(argv)
+
+    output = os.path.join(PROJECT_ROOT, args.output)
+    if os.path.exists(output) and not args.force:
+        print(f"✅ Emotion model already at {output} (use --force to replace it)")
+        return 0
+    result = download_emotion_model(output, quantize=args.quantize)
+    if not result['success']:
+        print(f"❌ {result['message']}")
+        return 1
+    print(f"✅ {result['message']}")
+    print("   EMOTION_MODEL=auto now uses the ONNX classifier")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Test the non-blocking app block manager
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import psutil
+from system.block_manager import BlockManager
+
+print("=" * 70)
+print("  TESTING APP BLOCK MANAGER")
+print("=" * 70)
+
+state_path = os.path.join(tempfile.mkdtemp(), "blocks.json")
+manager = BlockManager(state_path)
+
+# Stand-in "app" to block (Windows has no 'sleep', use 'ping' there)
+if shutil.which("sleep"):
+    child = subprocess.Popen(["sleep", "30"])
+else:
+    child = subprocess.Popen(["ping", "-n", "30", "127.0.0.1"], stdout=subprocess.DEVNULL)
+name = psutil.Process(child.pid).name()
+time.sleep(0.2)
+
+t0 = time.perf_counter()
+result = manager.block([name], 1)
+print(f"\n✓ Block returned in {(time.perf_counter() - t0) * 1000:.1f}ms: {result['message']}")
+print(f"  Status: {manager.status()}")
+assert result['success'] and manager.status()
+
+time.sleep(1.5)
+print(f"\n✓ After expiry: {manager.status()} (process {psutil.Process(child.pid).status()})")
+assert not manager.status()
+
+# Simulated crash: a second manager recovers the persisted block
+manager.block([name], 60)
+recovered = BlockManager(state_path).recover()
+print(f"\n✓ Recovery: {recovered['message']}")
+assert recovered['adopted'] == 1
+
+manager.release_all()
+
+# Overlapping blocks: releasing the short one must not resume what the long one holds
+short = manager.block([name], 1)
+long_ = manager.block([name], 60)
+time.sleep(1.5)
+state = psutil.Process(child.pid).status()
+print(f"\n✓ Short block expired, long block still active: process {state}")
+assert state == psutil.STATUS_STOPPED and len(manager.status()) == 1
+manager.release(long_['block_id'])
+assert psutil.Process(child.pid).status() != psutil.STATUS_STOPPED
+
+# A slow tick callback (spoken countdown) never delays a resume
+slow_ticks = []
+result = manager.block([name], 1, tick_callback=lambda r, s, l: slow_ticks.append(r) or time.sleep(3))
+t0 = time.perf_counter()
+while manager.status() and time.perf_counter() - t0 < 3:
+    time.sleep(0.05)
+print(f"✓ Resumed after {time.perf_counter() - t0:.2f}s while the tick callback was still running")
+assert not manager.status() and slow_ticks and time.perf_counter() - t0 < 2
+
+child.kill()
+
+print("\n" + "=" * 70)
+print("✅ BLOCK MANAGER TEST COMPLETE!")
+print("=" * 70)
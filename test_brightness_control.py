@@ -0,0 +1,111 @@
+"""
+Test the cached brightness controller (fake backend and a fake sysfs backlight)
+"""
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system.control.brightness import BrightnessController, FakeBackend, SysfsBackend, create_backend
+
+print("=" * 70)
+print("  TESTING BRIGHTNESS CONTROLLER")
+print("=" * 70)
+
+backend = FakeBackend(level=50)
+controller = BrightnessController(backend, coalesce_window=0.1)
+
+result = controller.get()
+print(f"\n✓ {result['message']} (backend: {result['backend']})")
+assert result['level'] == 50
+
+# "brighter brighter brighter": steps build on the cached value, one write
+t0 = time.perf_counter()
+for _ in range(3):
+    result = controller.change(10)
+elapsed = (time.perf_counter() - t0) * 1000
+print(f"✓ {result['message']} in {elapsed:.2f}ms for 3 commands")
+assert result['level'] == 80
+assert controller.flush()
+print(f"✓ Hardware: {backend.level}% after {backend.writes} write(s), {backend.reads} read(s)")
+assert backend.level == 80 and backend.writes == 1 and backend.reads == 1
+
+result = controller.change(-100)
+controller.flush()
+print(f"✓ Clamped: {result['message']}")
+assert backend.level == 0
+
+result = controller.set(65)
+controller.flush()
+print(f"✓ {result['message']}")
+assert backend.level == 65 and controller.get()['level'] == 65
+
+# Linux sysfs backlight layout
+root = tempfile.mkdtemp()
+for name, kind, max_b in [("acpi_video0", "firmware", 100), ("intel_backlight", "raw", 19200)]:
+    dev = os.path.join(root, name)
+    os.makedirs(dev)
+    for fname, value in [("type", kind), ("max_brightness", max_b), ("brightness", max_b // 2),
+                         ("actual_brightness", max_b // 2)]:
+        with open(os.path.join(dev, fname), "w") as f:
+            f.write(f"{value}\n")
+
+path = SysfsBackend.discover(root)
+print(f"✓ Discovered backlight: {os.path.basename(path)}")
+assert path.endswith("acpi_video0")
+
+sysfs = SysfsBackend(os.path.join(root, "intel_backlight"))
+print(f"✓ sysfs level: {sysfs.get()}% (max {sysfs.max_brightness})")
+assert sysfs.get() == 50
+sysfs.set(25)
+with open(os.path.join(root, "intel_backlight", "brightness")) as f:
+    raw = int(f.read())
+print(f"✓ sysfs wrote raw value {raw}")
+assert raw == 4800
+
+# A single command waits for its write and reports a failure instead of claiming success
+class ReadOnlyBackend(FakeBackend):
+    def set(self, level):
+        raise PermissionError("Permission denied writing intel_backlight brightness")
+
+failing = BrightnessController(ReadOnlyBackend(level=40), coalesce_window=0.1)
+t0 = time.perf_counter()
+result = failing.set(70, wait=True)
+print(f"✓ Failed write reported in {(time.perf_counter() - t0) * 1000:.1f}ms: {result['message']}")
+assert not result['success'] and "Permission denied" in result['message']
+result = controller.change(5, wait=True)
+assert result['success'] and backend.level == 70
+
+# Concurrent commands that wait (the planner running "brighter brighter brighter") share one write
+import threading
+writes = backend.writes
+replies = []
+threads = [threading.Thread(target=lambda: replies.append(controller.change(10, wait=True))) for _ in range(3)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print(f"✓ 3 concurrent waited commands -> {backend.writes - writes} write(s): {[r['message'] for r in replies]}")
+assert backend.writes - writes == 1 and backend.level == 100
+assert all(r['success'] and r['level'] == 100 for r in replies)
+
+# Backlights only root can write are skipped, with the reason surfaced
+real_access = os.access
+os.access = lambda path, mode: False if path.endswith("brightness") and mode == os.W_OK else real_access(path, mode)
+try:
+    try:
+        SysfsBackend.discover(root)
+        raise AssertionError("read-only backlight was selected")
+    except PermissionError as e:
+        print(f"✓ Read-only backlight rejected: {e}")
+    errors = []
+    import system.control.brightness as brightness
+    brightness.SYSFS_BACKLIGHT = root
+    assert create_backend("sysfs", errors=errors) is None and "not writable" in errors[0]
+finally:
+    os.access = real_access
+
+print("\n" + "=" * 70)
+print("  ALL BRIGHTNESS CONTROLLER TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,70 @@
+"""
+Test compound-command planning and concurrent execution
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system.automation_controller import _plan, _split_compound, execute_command
+
+print("=" * 70)
+print("  TESTING COMPOUND COMMAND PLANNER")
+print("=" * 70)
+
+plans = {
+    "open notepad and type hello": [[], [0]],
+    "open chrome and open spotify": [[], []],
+    "cpu usage and memory usage": [[], []],
+    "open notepad and type hi and close notepad": [[], [0], [0, 1]],
+}
+
+for cmd, expected in plans.items():
+    steps = _plan(_split_compound(cmd))
+    deps = [s['deps'] for s in steps]
+    print(f"\n📝 '{cmd}'")
+    for s in steps:
+        print(f"   {s['index']}. {s['cmd']:<20} kind={s['kind']:<6} deps={s['deps']}")
+    assert deps == expected, f"unexpected deps {deps}"
+
+# Independent queries run side by side: stub handlers with known delays, so the
+# compound command must take about the longest delay, not the sum of them
+import threading
+from system.control import system_info
+
+delays = {"get_cpu_usage": 0.4, "get_memory_info": 0.5, "get_disk_info": 0.6}
+running, peak = [0], [0]
+lock = threading.Lock()
+
+
+def stub(name, delay):
+    def handler():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(delay)
+        with lock:
+            running[0] -= 1
+        return {"success": True, "message": f"{name} done"}
+    return handler
+
+
+originals = {name: getattr(system_info, name) for name in delays}
+try:
+    for name, delay in delays.items():
+        setattr(system_info, name, stub(name, delay))
+    t0 = time.perf_counter()
+    result = execute_command("cpu usage and memory usage and disk usage")
+    elapsed = time.perf_counter() - t0
+finally:
+    for name, handler in originals.items():
+        setattr(system_info, name, handler)
+print(f"\n✓ 3 queries ({sum(delays.values()):.1f}s of work) in {elapsed:.2f}s, "
+      f"{peak[0]} at once: {result['message']}")
+assert result['success'] and result['message'].count(" done") == 3
+assert peak[0] == 3, "independent queries did not overlap"
+assert max(delays.values()) <= elapsed < max(delays.values()) + 0.3, f"ran sequentially ({elapsed:.2f}s)"
+
+print("\n" + "=" * 70)
+print("✅ PLANNER TEST COMPLETE!")
+print("=" * 70)
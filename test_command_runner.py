@@ -0,0 +1,82 @@
+"""
+Test the warm shell command runner
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system.command_runner import CommandRunner
+
+print("=" * 70)
+print("  TESTING COMMAND RUNNER")
+print("=" * 70)
+
+runner = CommandRunner()
+shell = runner.default_shell()
+if shell == "cmd":
+    # Plain commands keep cmd.exe semantics on Windows; the warm session tested here is PowerShell
+    shell = "powershell"
+echo = "echo hello" if shell == "bash" else "'hello'"
+
+t0 = time.perf_counter()
+runner.warm_up(shell)
+print(f"\n✓ {shell} session warmed in {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+times = []
+for _ in range(10):
+    t0 = time.perf_counter()
+    result = runner.run(echo, shell=shell)
+    times.append((time.perf_counter() - t0) * 1000)
+    assert result['success'] and result['output'] == "hello", result
+print(f"✓ Warm command: avg {sum(times) / len(times):.2f}ms over {len(times)} runs")
+
+lines = []
+result = runner.run(echo, on_output=lines.append, shell=shell)
+print(f"✓ Streamed output: {lines}")
+assert lines
+
+result = runner.run("sleep 5" if shell == "bash" else "Start-Sleep 5", timeout=0.5, shell=shell)
+print(f"✓ Timeout: timed_out={result['timed_out']} after {result['elapsed']}s")
+assert result['timed_out'] and not result['success']
+
+result = runner.run(echo, shell=shell)
+print(f"✓ Session restarted after timeout: {result['output']}")
+assert result['success']
+
+big = "yes x | head -n 5000" if shell == "bash" else "1..5000 | % { 'x' }"
+result = runner.run(big, max_output=1000, shell=shell)
+print(f"✓ Output capped: truncated={result['truncated']}, {len(result['output'])} chars")
+assert result['truncated']
+
+# A cold start gets its own startup window: a tight timeout still succeeds on a fresh session
+cold = CommandRunner()
+result = cold.run(echo, shell=shell, timeout=0.5)
+print(f"✓ Cold session with a 0.5s timeout: success={result['success']} in {result['elapsed']}s")
+assert result['success'] and cold._session(shell).alive()
+cold.close()
+
+# Idempotent queries: a repeat within the TTL is answered from the cache, a change drops it
+clock = "date +%s%N" if shell == "bash" else "[DateTime]::Now.Ticks"
+first = runner.run(clock, shell=shell, cache_ttl=5, cache_tag="clock")
+second = runner.run(clock, shell=shell, cache_ttl=5, cache_tag="clock")
+print(f"✓ Cache: first cached={first['cached']}, second cached={second['cached']}")
+assert not first['cached'] and second['cached'] and second['output'] == first['output']
+assert not runner.run(clock, shell=shell)['cached']            # plain runs never use the cache
+runner.invalidate(tag="other")
+assert runner.run(clock, shell=shell, cache_ttl=5, cache_tag="clock")['cached']
+runner.invalidate(tag="clock")
+third = runner.run(clock, shell=shell, cache_ttl=5, cache_tag="clock")
+print(f"✓ Invalidated by tag: cached={third['cached']}")
+assert not third['cached'] and third['output'] != first['output']
+assert not runner.run("exit 4", shell=shell, cache_ttl=5)['success']
+assert not runner.run("exit 4", shell=shell, cache_ttl=5)['cached']   # failures are not cached
+
+result = runner.run("exit 3", shell=shell)
+print(f"✓ Exit code: {result['returncode']}")
+assert result['returncode'] == 3
+
+runner.close()
+print("\n" + "=" * 70)
+print("  ALL COMMAND RUNNER TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,154 @@
+"""
+Test the token-budgeted conversation context: token estimation, budget trimming of
+stored history, and rolling summaries generated in the background while idle
+"""
+import sys
+import os
+import json
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    PORT = s.getsockname()[1]
+os.environ['OLLAMA_URL'] = f'http://127.0.0.1:{PORT}'
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from ai.context_manager import ConversationContext, TokenEstimator, format_summary_request
+from ai.conversation import ConversationSession
+from ai.brain import _format_history
+
+seen = []              # (path, payload, time)
+summary_fails = []     # set to make summary requests fail
+busy = threading.Event()   # set while a chat answer is being streamed
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, lines, status=200):
+        body = ''.join(json.dumps(l) + '\n' for l in lines).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        seen.append((self.path, req, time.time()))
+        if self.path == '/api/generate' and req.get('stream') is False:
+            if summary_fails:
+                self._send([{'error': 'model crashed'}], status=500)
+                return
+            assert not busy.is_set(), "summary requested while an answer was streaming"
+            turns = req['prompt'].count('User: ')
+            self._send([{'response': f"Summary covering {turns} more turns about the topic.", 'done': True}])
+            return
+        busy.set()
+        chars = sum(len(m['content']) for m in req['messages'])
+        time.sleep(0.05)
+        answer = f"This is answer number {len(seen)} with a few extra words."
+        busy.clear()
+        self._send([{'message': {'role': 'assistant', 'content': answer}, 'done': False},
+                    {'done': True, 'prompt_eval_count': chars // 3}])
+
+
+server = ThreadingHTTPServer(('127.0.0.1', PORT), FakeOllama)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+print("=" * 70)
+print("  TESTING CONVERSATION CONTEXT MANAGER")
+print("=" * 70)
+
+# Token estimation: ~4 chars/token until a real count calibrates it
+estimator = TokenEstimator()
+assert estimator.count("") == 0 and estimator.count("a" * 400) == 100
+estimator.observe(50, 20)                 # too short to trust
+assert estimator.chars_per_token == 4.0
+estimator.observe(900, 300)
+assert estimator.chars_per_token == 3.0 and estimator.count("a" * 300) == 100
+estimator.observe(1000, 250)              # later samples are averaged in
+assert 3.0 < estimator.chars_per_token < 4.0
+print(f"\n✓ Estimator calibrated to {estimator.chars_per_token:.2f} chars/token")
+
+# Stored history is trimmed by tokens, newest turns first, whole turns only
+history = [(f"question {i} " + "words " * 20, f"answer {i} " + "words " * 20 + " (cached)", None) for i in range(10)]
+text = _format_history(history, max_tokens=300)
+assert "question 9" in text and "question 0" not in text and "(cached)" not in text
+assert text.startswith("User: question") and text.count("User:") == text.count("Assistant:")
+assert _format_history(history[:1], max_tokens=5).startswith("User: question 0")   # newest turn always kept
+print(f"✓ History trimmed to {text.count('User:')} whole turns within 300 tokens")
+
+# Context ring: over budget, the oldest half is summarized once idle
+summaries = []
+ctx = ConversationContext(budget=60, estimator=TokenEstimator(), idle_seconds=0.2,
+                          summarize=lambda prev, turns: summaries.append((prev, turns)) or f"{len(turns)} turns")
+for i in range(6):
+    ctx.add(f"question {i} " + "x" * 40, f"answer {i}")
+assert ctx.over_budget and ctx.compact_later() and not ctx.compact_later()   # one compaction at a time
+ctx.touch(busy=True)
+time.sleep(0.4)
+assert not summaries, "summarized while a request was running"
+ctx.touch()
+assert ctx.wait_idle(5) and len(summaries) == 1 and len(summaries[0][1]) >= 3
+folded = len(summaries[0][1])
+ctx.add("question 6", "answer 6")        # arrives before the summary is applied: kept
+assert ctx.apply_pending() and len(ctx.turns) == 6 - folded + 1 and ctx.summary == f"{folded} turns"
+assert ctx.turns[-1] == ("question 6", "answer 6") and not ctx.over_budget
+assert f"Summary of the earlier conversation:\n{folded} turns" in ctx.system_text("SYS")
+assert not ctx.apply_pending()            # nothing new: the prefix stays as it is
+print(f"✓ Oldest {folded} turns folded into the summary: {ctx.stats()}")
+
+prompt = format_summary_request("Earlier facts.", [("hi", "hello")])
+assert "Current summary:\nEarlier facts." in prompt and "User: hi\nAssistant: hello" in prompt
+
+# Session: long conversation stays within budget and keeps its gist
+session = ConversationSession(system="You are a helpful assistant.", budget=120)
+session.history.estimator = TokenEstimator()
+session.history.idle_seconds = 0.2
+sizes = []
+for i in range(12):
+    session.ask(f"Tell me about topic {i} in a couple of sentences please", model="llama3.2:1b")
+    sizes.append(session.stats()['history_tokens'])
+    time.sleep(0.05)                      # questions keep coming: no idle time yet
+    assert sizes[-1] <= 2 * 120 + 60      # hard ceiling while the summary waits
+session.history.wait_idle(5)
+summary_calls = [r for p, r, t in seen if r.get('stream') is False]
+assert len(summary_calls) == 1, "summary generated only once the user went idle"
+rebuilds = session.stats()['rebuilds']
+session.ask("and what did we talk about first?", model="llama3.2:1b")
+path, req, _ = seen[-1]
+assert req['messages'][0]['content'].startswith("You are a helpful assistant.\n\nSummary of the earlier conversation:")
+assert session.stats()['rebuilds'] == rebuilds + 1 and session.stats()['summarized_turns'] >= 2
+assert session.stats()['history_tokens'] < max(sizes)
+print(f"✓ Session history tokens per turn {sizes} -> {session.stats()['history_tokens']} after the summary")
+print(f"  one rebuild for the compaction: {session.stats()}")
+
+# The next compaction folds the previous summary into the new one
+for i in range(8):
+    session.ask(f"More about subject {i} with a few more words", model="llama3.2:1b")
+time.sleep(0.3)
+session.history.wait_idle(5)
+session.ask("ok", model="llama3.2:1b")
+summary_calls = [r for p, r, t in seen if r.get('stream') is False]
+assert len(summary_calls) == 2 and "Current summary:\nSummary covering" in summary_calls[-1]['prompt']
+print("✓ Rolling summary: previous summary folded into the next one")
+
+# Summarizer down: turns are kept until far over budget, then trimmed back in one go
+summary_fails.append(True)
+session.reset()
+for i in range(20):
+    session.ask(f"Question {i} about something different entirely", model="llama3.2:1b")
+    time.sleep(0.05)
+    assert session.stats()['history_tokens'] <= 2 * 120 + 60
+session.history.wait_idle(5)
+assert session.history.summary == "" and session.history.dropped_turns > 0
+print(f"✓ Without summaries the history stays bounded: {session.history.stats()}")
+
+print("\n" + "=" * 70)
+print("  ALL CONTEXT MANAGER TESTS PASSED")
+print("=" * 70)
+server.shutdown()
@@ -0,0 +1,164 @@
+"""
+Test the append-only conversation session (prompt-prefix reuse) against a fake Ollama
+that evaluates only the tokens it has not cached, like llama.cpp's prompt cache
+"""
+import sys
+import os
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    PORT = s.getsockname()[1]
+os.environ['OLLAMA_URL'] = f'http://127.0.0.1:{PORT}'
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from ai.conversation import ConversationSession
+from ai.brain import ask_ai
+
+cache = {}           # model -> tokens of the last prompt it evaluated
+seen = []            # request payloads
+reject_context = []  # set to make the next context request fail
+missing = {'not-pulled:1b'}  # models the fake server answers 404 for
+
+
+def tokens_of_messages(messages):
+    return " ".join(f"<{m['role']}> {m['content']}" for m in messages).split()
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, lines, status=200):
+        body = ''.join(json.dumps(l) + '\n' for l in lines).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send([{'models': [{'name': 'llama3.2:1b'}]}])
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        seen.append((self.path, req))
+        model = req['model']
+        if model in missing:
+            self._send([{'error': f"model '{model}' not found"}], status=404)
+            return
+        if self.path == '/api/chat':
+            prompt = tokens_of_messages(req['messages'])
+        elif req.get('context'):
+            if reject_context:
+                reject_context.clear()
+                self._send([{'error': 'context is invalid for this model'}], status=400)
+                return
+            prompt = list(req['context']) + req['prompt'].split()
+        else:
+            prompt = (req.get('system', '') + ' ' + req.get('prompt', '')).split()
+        cached = cache.get(model, [])
+        common = 0
+        while common < min(len(cached), len(prompt)) and cached[common] == prompt[common]:
+            common += 1
+        answer = f"answer{len(seen)}"
+        cache[model] = prompt + ['<assistant>', answer]
+        final = {'done': True, 'prompt_eval_count': len(prompt) - common,
+                 'prompt_eval_duration': (len(prompt) - common) * 1_000_000,
+                 'context': [t for t in prompt] + [answer]}
+        if self.path == '/api/chat':
+            self._send([{'message': {'role': 'assistant', 'content': answer}, 'done': False}, final])
+        else:
+            self._send([{'response': answer, 'done': False}, final])
+
+
+server = ThreadingHTTPServer(('127.0.0.1', PORT), FakeOllama)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+print("=" * 70)
+print("  TESTING CONVERSATION SESSION")
+print("=" * 70)
+
+SYSTEM = "You are a helpful assistant. " * 40   # a realistic, long fixed prefix
+
+# Chat mode: each turn evaluates only what was added since the last one
+session = ConversationSession(system=SYSTEM, mode="chat")
+evaluated = []
+for i, q in enumerate(["what is python", "who made it", "when was that", "is it fast"]):
+    answer, final = session.ask(q, model="llama3.2:1b", notes="The user appears happy." if i == 1 else None)
+    evaluated.append(final['prompt_eval_count'])
+full = len(tokens_of_messages(session.messages("is it fast")))
+print(f"\n✓ Chat mode prompt tokens evaluated per turn: {evaluated} (full prompt now {full} tokens)")
+assert evaluated[0] > 200 and max(evaluated[1:]) < 20
+assert seen[-1][1]['messages'][0]['content'] == SYSTEM
+assert seen[1][1]['messages'][-1]['content'].startswith("[The user appears happy.]")
+# Notes go out with their own question only; the stored turn keeps the plain prompt
+assert seen[2][1]['messages'][3]['content'] == "who made it" and session.turns[1][0] == "who made it"
+assert session.stats()['rebuilds'] == 0 and session.stats()['turns'] == 4
+
+# Model swap invalidates the cached prefix: one full rebuild
+answer, final = session.ask("and now?", model="qwen2.5:0.5b")
+assert final['prompt_eval_count'] > 200 and session.stats()['rebuilds'] == 1
+print(f"✓ Model swap rebuilt the prefix once ({final['prompt_eval_count']} tokens)")
+
+# Far over the token budget with no summarizer: trimmed back to the budget in one go
+session.history.summarize = None
+session.history.budget = session.history.tokens() // 3
+before = len(session.turns)
+for q in ["one", "two"]:
+    session.ask(q, model="qwen2.5:0.5b")
+assert len(session.turns) < before and session.stats()['rebuilds'] == 2
+print(f"✓ Trimmed {before + 2} turns to {len(session.turns)} with a single rebuild")
+
+# Context mode: only the new message is sent along with Ollama's context tokens
+ctx_session = ConversationSession(system=SYSTEM, mode="context")
+cache.clear()
+a1, f1 = ctx_session.ask("what is rust", model="llama3.2:1b")
+a2, f2 = ctx_session.ask("who uses it", model="llama3.2:1b")
+path, req = seen[-1]
+assert path == '/api/generate' and req['prompt'] == "who uses it" and req['context'] and 'system' not in req
+assert f2['prompt_eval_count'] < 10
+print(f"✓ Context mode: second turn sent {len(req['prompt'].split())} new tokens + {len(req['context'])} context tokens")
+
+# A rejected context falls back to a full rebuild from the transcript
+reject_context.append(True)
+a3, f3 = ctx_session.ask("is it safe", model="llama3.2:1b")
+path, req = seen[-1]
+assert 'context' not in req and req['system'] == SYSTEM and "User: what is rust" in req['prompt']
+assert a3 and ctx_session.stats()['rebuilds'] == 1 and ctx_session.context
+print(f"✓ Rejected context rebuilt from the transcript: '{a3}'")
+
+# ask_ai with a session: no response cache, turns appended
+cache.clear()
+conv = ConversationSession(system=SYSTEM)
+r1 = ask_ai("explain recursion briefly", session=conv, notes="User memories:\n- likes python", use_rag=False)
+r2 = ask_ai("explain recursion briefly", session=conv, use_rag=False)
+assert r1 != r2 and not r2.endswith("(cached)") and len(conv.turns) == 2
+print(f"✓ ask_ai(session=...): {conv.stats()}")
+
+# An unpulled model is an error answer, not an outage: the breaker stays closed
+from ai.ollama_health import get_ollama_monitor, CLOSED
+monitor = get_ollama_monitor()
+for _ in range(5):
+    r3 = ask_ai("explain recursion briefly", session=conv, model="not-pulled:1b", use_rag=False)
+print(f"✓ Missing model reported without tripping the breaker: '{r3}'")
+assert r3 == "AI Error: model 'not-pulled:1b' not found"
+assert monitor.state == CLOSED and monitor.failures == 0 and len(conv.turns) == 2
+
+# Legacy path (rebuilt prompt every turn) for comparison
+cache.clear()
+legacy = []
+history = []
+for q in ["what is python", "who made it", "when was that", "is it fast"]:
+    ask_ai(q + " ", history=history, system=SYSTEM, use_rag=False)
+    path, req = seen[-1]
+    legacy.append(len(req['prompt'].split()))
+    history.append((q, f"answer{len(seen)}", None))
+print(f"✓ Legacy rebuilt prompt sizes per turn: {legacy} tokens, re-sent in full every time")
+
+server.shutdown()
+print("\n" + "=" * 70)
+print("  ALL CONVERSATION SESSION TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,74 @@
+"""
+Test the paged conversation history and bounded response scrollback
+(the Tk part runs only when a display is available)
+"""
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from gui.history_view import HistoryPager
+
+print("=" * 70)
+print("  TESTING GUI HISTORY PAGING")
+print("=" * 70)
+
+# Fake conversations table with keyset pagination, like get_conversation_page
+base = datetime(2026, 1, 1)
+table = [{"id": i, "user_input": f"question {i}", "assistant_response": f"answer {i}",
+          "timestamp": base + timedelta(minutes=i)} for i in range(1, 1001)]
+calls = []
+
+def loader(before_id=None, after_id=None, limit=50):
+    calls.append((before_id, after_id))
+    if after_id is not None:
+        return [r for r in table if r["id"] > after_id][:limit]
+    rows = [r for r in table if before_id is None or r["id"] < before_id]
+    return rows[-limit:]
+
+pager = HistoryPager(loader, page_size=50, max_rows=150)
+pager.add_older(pager.fetch_older())
+print(f"\n✓ First page: ids {pager.rows[0]['id']}-{pager.rows[-1]['id']}")
+assert pager.rows[-1]["id"] == 1000 and len(pager.rows) == 50
+
+for _ in range(5):
+    pager.add_older(pager.fetch_older())
+print(f"✓ Scrolled back 5 pages: window ids {pager.rows[0]['id']}-{pager.rows[-1]['id']} "
+      f"({len(pager.rows)} rows kept, has_newer={pager.has_newer})")
+assert len(pager.rows) == 150 and pager.rows[0]["id"] == 701 and pager.has_newer
+
+while pager.has_older:
+    pager.add_older(pager.fetch_older())
+print(f"✓ Reached the start: ids {pager.rows[0]['id']}-{pager.rows[-1]['id']}")
+assert pager.rows[0]["id"] == 1
+
+while pager.has_newer:
+    pager.add_newer(pager.fetch_newer())
+print(f"✓ Back to the newest: ids {pager.rows[0]['id']}-{pager.rows[-1]['id']} after {len(calls)} page loads")
+assert pager.rows[-1]["id"] == 1000 and len(pager.rows) == 150
+
+if os.environ.get("DISPLAY") or sys.platform.startswith("win"):
+    from gui.feed import GuiFeed
+    from gui.assistant_gui import AssistantGUI
+    gui = AssistantGUI(feed=GuiFeed(), history_loader=loader, scrollback_lines=500)
+    gui.start()
+    for turn in range(300):
+        gui.begin_response()
+        for _ in range(20):
+            gui.append_response("token ")
+        gui.end_response()
+    time.sleep(1.0)
+    lines = int(gui.response_text.index('end-1c').split('.')[0])
+    print(f"✓ Scrollback bounded: {lines} lines kept after 300 responses")
+    assert lines <= 500
+    gui.root.after(0, gui.show_history)
+    time.sleep(1.0)
+    print(f"✓ History window rows: {len(gui.history_panel.pager.rows)}")
+    gui.stop()
+else:
+    print("⏩ No display: skipped the Tk window checks")
+
+print("\n" + "=" * 70)
+print("  ALL GUI HISTORY TESTS PASSED")
+print("=" * 70)
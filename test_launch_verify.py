@@ -0,0 +1,48 @@
+"""
+Test event-driven launch verification (no fixed sleeps)
+"""
+import sys
+import os
+import time
+import subprocess
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system.control.process_watch import snapshot_pids, wait_for_app
+
+print("=" * 70)
+print("  TESTING LAUNCH VERIFICATION")
+print("=" * 70)
+
+# A long-running child: should be verified by pid almost immediately
+cmd = [sys.executable, "-c", "import time; time.sleep(3)"]
+baseline = snapshot_pids()
+t0 = time.perf_counter()
+child = subprocess.Popen(cmd)
+result = wait_for_app(os.path.basename(sys.executable), pid=child.pid, baseline=baseline)
+elapsed = (time.perf_counter() - t0) * 1000
+print(f"\n✓ Spawned child: {result}")
+print(f"  Verified in {elapsed:.1f}ms (old code slept 1500ms)")
+assert result['success'], "child process was not detected"
+child.kill()
+
+# Nothing launched: must give up at the deadline
+result = wait_for_app("no-such-app-xyz", baseline=snapshot_pids(), timeout=0.3)
+print(f"\n✓ Missing app: {result}")
+assert not result['success'] and result['elapsed'] >= 0.3
+
+# A child whose name can't be read (exited, access denied) is not a launched app
+import system.control.process_watch as process_watch
+real_proc_name = process_watch._proc_name
+process_watch._proc_name = lambda pid: ''
+child = subprocess.Popen(cmd)
+try:
+    result = wait_for_app("no-such-app-xyz", pid=child.pid, timeout=0.3)
+finally:
+    process_watch._proc_name = real_proc_name
+    child.kill()
+print(f"✓ Unnamed child not counted: {result}")
+assert not result['success']
+
+print("\n" + "=" * 70)
+print("✅ LAUNCH VERIFICATION TEST COMPLETE!")
+print("=" * 70)
@@ -0,0 +1,72 @@
+"""
+Test lazy module proxies and the startup import profiler
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system.lazy_import import (lazy_module, lazy_from, is_loaded, is_available, module_exists,
+                                lazy_report, profile_startup, format_profile, LazyModule)
+
+print("=" * 70)
+print("  TESTING LAZY IMPORTS")
+print("=" * 70)
+
+# Nothing is imported until first use
+assert 'xml.dom.minidom' not in sys.modules
+minidom = lazy_module('xml.dom.minidom')
+parse_string, = lazy_from('xml.dom.minidom', 'parseString')
+assert isinstance(minidom, LazyModule) and not is_loaded(minidom) and 'xml.dom.minidom' not in sys.modules
+print(f"\n✓ Proxy created without importing: {minidom!r}")
+
+doc = parse_string('<a><b/></a>')
+assert doc.documentElement.tagName == 'a' and 'xml.dom.minidom' in sys.modules
+assert minidom.Document is sys.modules['xml.dom.minidom'].Document and is_loaded(minidom)
+print(f"✓ Loaded on first call: {minidom!r}")
+
+# Writes go to the real module
+minidom.lazy_flag = True
+assert sys.modules['xml.dom.minidom'].lazy_flag is True
+print("✓ Attribute writes reach the real module")
+
+# Already-imported modules are returned as-is
+assert lazy_module('os') is os and lazy_from('os.path', 'join')[0] is os.path.join
+
+# Missing modules fail at use, not at definition
+missing = lazy_module('definitely_not_installed_pkg')
+assert not is_available(missing) and not module_exists('definitely_not_installed_pkg')
+try:
+    missing.anything
+    raise AssertionError("expected ImportError")
+except ImportError:
+    pass
+print("✓ Missing module reported at first use")
+
+report = {row['module']: row for row in lazy_report()}
+assert report['xml.dom.minidom']['error'] is None and report['definitely_not_installed_pkg']['error']
+print(f"✓ Deferred imports timed: xml.dom.minidom {report['xml.dom.minidom']['seconds'] * 1000:.2f} ms")
+
+# Startup profile of a fresh interpreter
+profile = profile_startup('json')
+assert profile['success'] and profile['import_ms'] > 0
+assert any(row['package'] == 'json' for row in profile['packages'])
+print(f"✓ {profile['message']}")
+print(format_profile(profile).splitlines()[0])
+
+bad = profile_startup('definitely_not_installed_pkg')
+assert not bad['success']
+print(f"✓ Failed import reported: {bad['message'][:60]}")
+
+# main_clean reaches its prompt without the heavy modules
+profile = profile_startup('main_clean')
+if profile['success']:
+    heavy = {'dateparser', 'spacy', 'pyttsx3', 'mysql', 'requests', 'cv2', 'pyautogui'}
+    loaded = {row['package'] for row in profile_startup('main_clean', top=1000)['packages']}
+    print(f"✓ {profile['message']}")
+    assert not heavy & loaded, heavy & loaded
+else:
+    print(f"⚠️ main_clean not importable here: {profile['message']}")
+
+print("\n" + "=" * 70)
+print("  ALL LAZY IMPORT TESTS PASSED")
+print("=" * 70)
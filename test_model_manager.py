@@ -0,0 +1,142 @@
+"""
+Test LLM preloading, keep_alive policy and memory-pressure model swapping (fake Ollama server)
+"""
+import sys
+import os
+import json
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    PORT = s.getsockname()[1]
+os.environ['OLLAMA_URL'] = f'http://127.0.0.1:{PORT}'
+os.environ['OLLAMA_FALLBACK_MODEL'] = 'qwen2.5:0.5b'
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from ai.model_manager import get_model_manager, PRIMARY, FALLBACK, UNLOADED
+from ai.brain import ask_ai
+
+loaded = set()      # models the fake server holds in memory
+requests_seen = []  # (model, prompt, keep_alive)
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        models = [{'name': m} for m in sorted(loaded)] if self.path == '/api/ps' else [{'name': 'llama3.2:1b'}]
+        self._send(json.dumps({'models': models}).encode())
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        model, keep_alive = req['model'], req.get('keep_alive')
+        requests_seen.append((model, req.get('prompt'), keep_alive))
+        if keep_alive == 0:
+            loaded.discard(model)
+            self._send(json.dumps({'model': model, 'done': True, 'done_reason': 'unload'}).encode())
+            return
+        # Loading from disk is slow; a resident model answers right away
+        load_duration = 1_000_000 if model in loaded else 1_500_000_000
+        loaded.add(model)
+        final = {'model': model, 'response': '', 'done': True, 'load_duration': load_duration}
+        if not req.get('prompt'):
+            self._send(json.dumps(final).encode())
+            return
+        lines = [{'model': model, 'response': 'Hi there.', 'done': False}, final]
+        self._send(''.join(json.dumps(l) + '\n' for l in lines).encode(), 'application/x-ndjson')
+
+
+server = ThreadingHTTPServer(('127.0.0.1', PORT), FakeOllama)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+print("=" * 70)
+print("  TESTING MODEL MANAGER")
+print("=" * 70)
+
+models = get_model_manager()
+
+# Preload: empty prompt, keep_alive from policy, load time recorded
+result = models.preload()
+print(f"\n✓ {result['message']} (Ollama load_duration {result['load_seconds']}s)")
+assert result['success'] and requests_seen[-1] == ('llama3.2:1b', '', '-1')
+assert models.metrics()['cold_starts'] == 1 and 'llama3.2:1b' in loaded
+
+# The first question finds the model warm
+answer = ask_ai("tell me something new", use_rag=False)
+model, prompt, keep_alive = requests_seen[-1]
+assert answer == 'Hi there.' and model == 'llama3.2:1b' and keep_alive == '-1'
+metrics = models.metrics()
+assert metrics['requests'] == 1 and metrics['cold_starts'] == 1
+print(f"✓ First answer used the warm model (keep_alive {keep_alive}), no extra load")
+
+# Memory pressure: swap to the fallback, then unload, then come back with hysteresis
+assert models.target_mode(70) == PRIMARY and models.target_mode(87) == FALLBACK
+result = models.switch_mode(FALLBACK)
+assert models.active_model() == 'qwen2.5:0.5b' and loaded == {'qwen2.5:0.5b'}
+assert models.keep_alive_for() == '2m'
+print(f"✓ 87% memory: swapped to {models.active_model()} (keep_alive {models.keep_alive_for()}), primary unloaded")
+
+ask_ai("tell me another thing", use_rag=False)
+assert requests_seen[-1][0] == 'qwen2.5:0.5b' and requests_seen[-1][2] == '2m'
+print("✓ Questions go to the fallback while memory is tight")
+
+assert models.target_mode(95) == UNLOADED
+models.switch_mode(UNLOADED)
+assert not loaded
+print("✓ 95% memory: everything unloaded")
+
+assert models.target_mode(70) == UNLOADED   # too soon after unloading
+models.reload_after = 0
+assert models.target_mode(82) == UNLOADED   # inside the hysteresis band
+assert models.target_mode(70) == PRIMARY
+
+# The model's own memory counts: unloading a model that takes 15% of RAM at 92%
+# leaves 77%, which must not trigger a reload that puts it straight back at 92%
+import psutil
+total = psutil.virtual_memory().total
+models.model_sizes['llama3.2:1b'] = int(total * 0.15)
+assert models.target_mode(77) == FALLBACK   # only the smaller model fits
+models.model_sizes['qwen2.5:0.5b'] = int(total * 0.08)
+assert models.target_mode(77) == UNLOADED   # neither fits
+assert models.target_mode(64) == PRIMARY    # 64 + 15 fits under 85 - 5
+models.model_sizes.clear()
+print("✓ Reload waits until memory minus the unloaded model leaves room for it")
+
+# Sampler-driven switch runs off the sampler thread
+models._last_memory_check = 0
+models._on_sample({'mem_percent': 70.0})
+deadline = time.time() + 5
+while time.time() < deadline and (models._switching or 'llama3.2:1b' not in loaded):
+    time.sleep(0.02)
+metrics = models.metrics()
+print(f"✓ 70% memory: back to {metrics['active_model']} ({metrics['mode']}), "
+      f"last load {metrics['last_load']['seconds']}s from {metrics['last_load']['source']}")
+assert metrics['mode'] == PRIMARY and loaded == {'llama3.2:1b'} and metrics['last_load']['source'] == 'reload'
+assert metrics['swaps'] == 1 and metrics['unloads'] == 2 and metrics['cold_starts'] == 3
+
+# A model Ollama expired on its own shows up as a cold request
+loaded.clear()
+ask_ai("one more question please", use_rag=False)
+assert models.metrics()['cold_starts'] == 4 and models.metrics()['last_load']['source'] == 'request'
+print(f"✓ Cold request detected: {models.metrics()['last_load']}")
+
+# Exit hands the model back to Ollama's normal expiry
+models.release()
+assert requests_seen[-1] == ('llama3.2:1b', '', '5m')
+print("✓ Exit resets keep_alive to 5m")
+
+server.shutdown()
+print("\n" + "=" * 70)
+print("  ALL MODEL MANAGER TESTS PASSED")
+print("=" * 70)
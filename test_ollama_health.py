@@ -0,0 +1,160 @@
+"""
+Test the Ollama health monitor and circuit breaker against a fake local server
+"""
+import sys
+import os
+import json
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    PORT = s.getsockname()[1]
+os.environ['OLLAMA_URL'] = f'http://127.0.0.1:{PORT}'
+os.environ['OLLAMA_BACKOFF_MIN'] = '0.2'
+os.environ['OLLAMA_BACKOFF_MAX'] = '0.8'
+os.environ['OLLAMA_HEALTH_INTERVAL'] = '0.5'
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import ai.ollama_health as ollama_health
+from ai.ollama_health import OllamaHealthMonitor, get_ollama_monitor, CLOSED, OPEN
+from ai.brain import ask_ai
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._json({'models': [{'name': 'llama3.2:1b'}, {'name': 'qwen2.5:0.5b'}]})
+        elif self.path == '/api/ps':
+            self._json({'models': [{'name': 'llama3.2:1b', 'size': 1300000000, 'size_vram': 0}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        json.loads(self.rfile.read(length) or b'{}')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        for chunk in ('Paris', ' is the capital.'):
+            self.wfile.write((json.dumps({'response': chunk, 'done': False}) + '\n').encode())
+        self.wfile.write((json.dumps({'response': '', 'done': True}) + '\n').encode())
+
+
+def start_server():
+    ThreadingHTTPServer.allow_reuse_address = True
+    server = ThreadingHTTPServer(('127.0.0.1', PORT), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+print("=" * 70)
+print("  TESTING OLLAMA HEALTH MONITOR")
+print("=" * 70)
+
+monitor = get_ollama_monitor()
+transitions = []
+monitor.add_listener(lambda old, new: transitions.append(new))
+
+# Server down: the breaker opens and ask_ai fails fast instead of waiting out its timeout
+assert not monitor.wait_until_available(timeout=0.5)
+assert monitor.state == OPEN
+t0 = time.perf_counter()
+answer = ask_ai("what is the capital of france", use_rag=False)
+elapsed = time.perf_counter() - t0
+print(f"\n✓ Server down: breaker {monitor.state}, ask_ai answered in {elapsed * 1000:.1f}ms: {answer[:60]}...")
+assert elapsed < 0.5 and "not available" in answer
+
+# Backoff grows while the server stays down
+b1 = monitor.backoff
+wait_for(lambda: monitor.failures >= 3, 3.0)
+print(f"✓ Backoff grew from {b1:.1f}s to {monitor.backoff:.1f}s after {monitor.failures} failed probes")
+assert monitor.backoff > b1 and monitor.backoff <= 0.8
+
+# Server comes up: the monitor closes the breaker by itself
+server = start_server()
+assert wait_for(lambda: monitor.state == CLOSED, 3.0), monitor.status()
+status = monitor.status()
+print(f"✓ Recovered automatically: models {status['models']}, loaded {[m['name'] for m in status['loaded_models']]}")
+assert 'llama3.2:1b' in status['models'] and status['loaded_models'][0]['name'] == 'llama3.2:1b'
+answer = ask_ai("what is the capital of france", use_rag=False)
+print(f"✓ ask_ai after recovery: {answer}")
+assert answer == "Paris is the capital."
+
+# Server dies mid-session: the next request opens the breaker, later ones fail fast
+server.shutdown()
+server.server_close()
+answer = ask_ai("and of germany?", use_rag=False)
+assert monitor.state == OPEN and "not available" in answer
+t0 = time.perf_counter()
+ask_ai("and of italy?", use_rag=False)
+print(f"✓ Outage detected; next call failed in {(time.perf_counter() - t0) * 1000:.1f}ms")
+assert time.perf_counter() - t0 < 0.2
+
+server = start_server()
+assert wait_for(lambda: monitor.available, 3.0)
+print(f"✓ Back again; transitions: {transitions}")
+assert transitions.count('closed') == 2 and 'open' in transitions
+server.shutdown()
+server.server_close()
+monitor.stop()
+
+# Breaker unit behaviour: soft failures (timeouts) need two in a row
+breaker = OllamaHealthMonitor(base_url='http://127.0.0.1:9', backoff_min=0.1)
+breaker.record_success()
+breaker.record_failure("timeout", hard=False)
+assert breaker.state == CLOSED
+breaker.record_failure("timeout", hard=False)
+assert breaker.state == OPEN and not breaker.allow_request()
+time.sleep(breaker.retry_in() + 0.01)
+assert breaker.allow_request() and not breaker.allow_request()  # one half-open trial only
+breaker.record_success()
+assert breaker.state == CLOSED
+print("✓ Soft failures need two in a row; one half-open trial at a time")
+
+# A trial whose outcome is never recorded expires instead of blocking requests for good
+breaker.record_failure("refused")
+time.sleep(breaker.retry_in() + 0.01)
+assert breaker.allow_request() and not breaker.allow_request()
+ollama_health.TRIAL_TIMEOUT = 0.2
+time.sleep(0.25)
+assert breaker.allow_request()
+ollama_health.TRIAL_TIMEOUT = 30.0
+breaker.end_trial()
+print("✓ An abandoned half-open trial expires")
+
+# Errors other than requests' own still settle ask_ai's trial
+class BrokenSession:
+    def ask(self, *args, **kwargs):
+        raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+monitor.record_success()
+answer = ask_ai("what is the capital of spain", use_rag=False, session=BrokenSession())
+assert answer.startswith("AI Error") and monitor.failures == 1 and not monitor._trial
+print(f"✓ Unexpected errors are recorded as failures: {answer}")
+
+print("\n" + "=" * 70)
+print("  ALL OLLAMA HEALTH TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,91 @@
+"""
+Test the process start monitor: snapshot backend, and falling back to snapshots
+when the event backend breaks mid-run (fake WMI watcher, no Windows needed)
+"""
+import sys
+import os
+import time
+import subprocess
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system import process_monitor
+from system.process_monitor import ProcessStartMonitor, compile_matcher
+
+print("=" * 70)
+print("  TESTING PROCESS START MONITOR")
+print("=" * 70)
+
+match = compile_matcher(["code", "vscode", ""])
+assert match("VSCode.exe") == "vscode" and match("code") == "code" and match("bash") is None
+print("\n✓ Matcher prefers the longest target")
+
+
+def wait_for(seen, pid, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pid in seen:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def spawn():
+    return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(2)"])
+
+
+seen = {}
+monitor = ProcessStartMonitor(lambda pid, name: seen.setdefault(pid, name), interval=0.1, backend="snapshot")
+assert monitor.start() == "snapshot"
+time.sleep(0.3)  # first snapshot taken
+child = spawn()
+try:
+    assert wait_for(seen, child.pid), "snapshot backend missed a new process"
+    print(f"✓ Snapshot backend saw pid {child.pid} ({seen[child.pid]})")
+finally:
+    child.kill()
+    monitor.stop()
+
+# WMI watcher that fails with a non-timeout error after one timeout
+class TimedOut(Exception):
+    pass
+
+
+class FakeWMI:
+    x_wmi_timed_out = TimedOut
+    calls = []
+
+    class WMI:
+        def watch_for(self, raw_wql):
+            def watcher(timeout_ms):
+                FakeWMI.calls.append(timeout_ms)
+                if len(FakeWMI.calls) == 1:
+                    raise TimedOut()
+                raise RuntimeError("RPC server is unavailable")
+            return watcher
+
+
+class FakeCOM:
+    CoInitialize = CoUninitialize = staticmethod(lambda: None)
+
+
+process_monitor.wmi, process_monitor.pythoncom = FakeWMI, FakeCOM
+seen = {}
+monitor = ProcessStartMonitor(lambda pid, name: seen.setdefault(pid, name), interval=0.1)
+thread = threading.Thread(target=monitor._run_wmi, daemon=True)
+thread.start()
+time.sleep(0.3)
+child = spawn()
+try:
+    assert wait_for(seen, child.pid), "monitoring stopped when the WMI watcher failed"
+    assert monitor.backend == "snapshot" and len(FakeWMI.calls) == 2
+    print(f"✓ Broken WMI watcher fell back to snapshots (saw pid {child.pid})")
+finally:
+    child.kill()
+    monitor.stop()
+thread.join(timeout=2)
+assert not thread.is_alive()
+
+print("\n" + "=" * 70)
+print("  ALL PROCESS MONITOR TESTS PASSED")
+print("=" * 70)
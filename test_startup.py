@@ -0,0 +1,103 @@
+"""
+Test concurrent startup with readiness futures (no Ollama, database or camera needed)
+"""
+import sys
+import os
+import time
+import subprocess
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from system.startup import StartupOrchestrator, DependencyUnavailable
+
+print("=" * 70)
+print("  TESTING STARTUP ORCHESTRATION")
+print("=" * 70)
+
+
+def slow(value, delay):
+    time.sleep(delay)
+    return value
+
+
+def broken():
+    raise ConnectionError("server refused")
+
+
+order = []
+t0 = time.perf_counter()
+startup = StartupOrchestrator()
+startup.launch('tts', slow, 'engine', 0.3)
+startup.launch('ollama', slow, False, 1.0)          # slow and ultimately unavailable
+startup.launch('db', slow, 'connection', 0.3)
+startup.launch('camera', broken)
+startup.launch('reminders', lambda: order.append('reminders') or True, requires=('db',))
+launched = time.perf_counter() - t0
+print(f"\n✓ Five subsystems launched in {launched * 1000:.1f}ms")
+assert launched < 0.05
+
+# Local commands need nothing: non-blocking reads return immediately
+assert startup.peek('ollama', 'pending') == 'pending' and not startup.ready('db')
+print(f"✓ Status right after launch: {startup.summary()}")
+
+# A task command waits for the database only (not for the 1s Ollama check)
+db = startup.deferred('db', what="Database")
+assert db.resolve() == 'connection'
+waited = time.perf_counter() - t0
+print(f"✓ Database ready after {waited:.2f}s while Ollama is still checking")
+assert waited < 0.6 and not startup.done('ollama')
+assert db.upper() == 'CONNECTION'  # attribute access is forwarded
+
+# Dependencies run after what they require
+startup.wait('reminders')
+assert order == ['reminders']
+
+# Failures and "unavailable" results surface as defaults or DependencyUnavailable
+assert startup.wait('camera', default='no camera') == 'no camera'
+assert startup.wait('ollama', default=None) is False
+try:
+    startup.require('ollama', what="Ollama")
+    raise AssertionError("expected DependencyUnavailable")
+except DependencyUnavailable as e:
+    print(f"✓ Feature needing Ollama: {e}")
+status = startup.status()
+assert status['camera']['state'] == 'failed' and 'refused' in status['camera']['error']
+assert status['ollama']['state'] == 'unavailable' and status['tts']['state'] == 'ready'
+print(f"✓ Final status: {startup.summary()}")
+
+reports = []
+startup.on_ready('db', lambda result, error: reports.append((result, error)))
+assert reports == [('connection', None)]
+print("✓ on_ready fires immediately for finished tasks")
+
+# Total time is the slowest task, not the sum
+assert time.perf_counter() - t0 < 1.5
+
+# A pending check never holds up exit
+t0 = time.perf_counter()
+code = subprocess.run([sys.executable, '-c',
+                       "import sys; sys.path.append('backend');"
+                       "from system.startup import StartupOrchestrator;"
+                       "import time; s = StartupOrchestrator(); s.launch('ollama', time.sleep, 30);"
+                       "s.launch('later', print, requires=('ollama',)); s.shutdown()"],
+                      cwd=os.path.dirname(os.path.abspath(__file__))).returncode
+elapsed = time.perf_counter() - t0
+print(f"✓ Process exited in {elapsed:.2f}s with a 30s check still running")
+assert code == 0 and elapsed < 5
+
+# Logging a local command's turn never waits for a slow database connection
+import threading
+import main_clean
+slow = StartupOrchestrator()
+slow.launch('db', lambda: time.sleep(1.0))   # connection attempt that ends up failing
+threading.Thread(target=main_clean.write_turns, args=(slow,), daemon=True).start()
+t0 = time.perf_counter()
+main_clean.save_turn("open notepad", "Opening notepad")
+elapsed = time.perf_counter() - t0
+print(f"✓ save_turn returned in {elapsed * 1000:.2f}ms while the database was still connecting")
+assert elapsed < 0.05
+main_clean.flush_turns(timeout=3)
+assert not main_clean._turn_log.unfinished_tasks   # dropped once the database turned out unavailable
+
+print("\n" + "=" * 70)
+print("  ALL STARTUP TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,63 @@
+"""
+Test the vision benchmark suite and baseline comparison (no webcam needed)
+"""
+import sys
+import os
+import copy
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from benchmark_vision import run_suite, compare, main
+from benchmark_face_tracking import synthetic_frames
+
+print("=" * 70)
+print("  TESTING VISION BENCHMARK")
+print("=" * 70)
+
+frames = list(synthetic_frames(30))
+results = run_suite(frames)
+assert set(results['suites']) == {'detect_faces', 'analyze_stages', 'analyze_face', 'mood_pipeline'}
+for name, suite in results['suites'].items():
+    assert suite['frames'] == 30 and suite['fps'] > 0 and suite['peak_traced_mb'] >= 0
+    for stage, stats in suite['stages'].items():
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'], (name, stage, stats)
+    print(f"\n✓ {name}: {suite['fps']} fps, stages {sorted(suite['stages'])}")
+assert {'detect', 'emotion', 'age_gender', 'liveness'} <= set(results['suites']['analyze_stages']['stages'])
+# The end-to-end suite times only analyze_face: its fps isn't diluted by the stage breakdown
+assert set(results['suites']['analyze_face']['stages']) == {'analyze_face'}
+
+# Same run vs itself: nothing to report
+assert compare(results, results) == []
+print("✓ No regressions against itself")
+
+# A baseline twice as fast flags fps and latency
+faster = copy.deepcopy(results)
+for suite in faster['suites'].values():
+    suite['fps'] *= 2
+    for stats in suite['stages'].values():
+        stats['p95_ms'] /= 10
+regressions = compare(results, faster)
+print(f"✓ {len(regressions)} regressions vs a faster baseline, e.g. '{regressions[0]}'")
+assert any('fps' in r for r in regressions) and any('p95' in r for r in regressions)
+
+# Peak memory well past the baseline (tolerance plus 1 MB of slack) is flagged
+bloated = copy.deepcopy(results)
+bloated['suites']['analyze_face']['peak_traced_mb'] += 5
+assert compare(bloated, results) == [f"analyze_face: peak memory {bloated['suites']['analyze_face']['peak_traced_mb']}MB "
+                                     f"> baseline {results['suites']['analyze_face']['peak_traced_mb']}MB"]
+
+# Missing suites are regressions too
+partial = copy.deepcopy(results)
+del partial['suites']['mood_pipeline']
+assert compare(partial, results) == ['mood_pipeline: suite missing']
+
+# CLI round trip: save a baseline, then compare against it with a generous tolerance
+import tempfile
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'baseline.json')
+    assert main(['--frames', '20', '--save-baseline', path]) == 0 and os.path.exists(path)
+    assert main(['--frames', '20', '--baseline', path, '--tolerance', '5']) == 0
+print("✓ CLI saved and compared a baseline")
+
+print("\n" + "=" * 70)
+print("  ALL VISION BENCHMARK TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,56 @@
+"""
+Test lazy face-analysis initialization and measure its import/memory cost
+"""
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+print("=" * 70)
+print("  TESTING LAZY VISION INITIALIZATION")
+print("=" * 70)
+
+# Fresh interpreter so import cost isn't hidden by modules already loaded here
+PROBE = r"""
+import sys, time, json, psutil
+sys.path.append('backend')
+proc = psutil.Process()
+import numpy, cv2  # shared dependencies: not counted
+rss0, t0 = proc.memory_info().rss, time.perf_counter()
+import vision.face_analyzer as fa
+import_ms = (time.perf_counter() - t0) * 1000
+rss_import = proc.memory_info().rss
+state = {'analyzer_at_import': fa.face_analyzer is not None, 'mediapipe_at_import': 'mediapipe' in sys.modules}
+analyzer = fa.get_face_analyzer()
+state['detector_built'] = analyzer._face_detection is not None or analyzer._cascade_loaded
+frame = numpy.full((480, 640, 3), 120, dtype=numpy.uint8)
+t0 = time.perf_counter()
+analyzer.detect_faces(frame)
+state.update(import_ms=import_ms, import_mb=(rss_import - rss0) / 2**20,
+             first_detect_ms=(time.perf_counter() - t0) * 1000,
+             first_detect_mb=(proc.memory_info().rss - rss_import) / 2**20,
+             cascade_loaded=analyzer._cascade_loaded)
+print(json.dumps(state))
+"""
+out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True,
+                     cwd=os.path.dirname(os.path.abspath(__file__)))
+state = json.loads(out.stdout.strip().splitlines()[-1])
+
+print(f"\n✓ Import: {state['import_ms']:.0f}ms, +{state['import_mb']:.1f}MB RSS")
+assert not state['analyzer_at_import'], "FaceAnalyzer must not be built at import"
+assert not state['mediapipe_at_import'], "MediaPipe must not be imported at import"
+assert not state['detector_built'], "detectors must not be built with the analyzer"
+print("✓ No analyzer, detector or MediaPipe import until first use")
+print(f"✓ First detection: {state['first_detect_ms']:.0f}ms, +{state['first_detect_mb']:.1f}MB RSS")
+assert state['cascade_loaded']
+
+# FAST_MODE path: main_clean no longer imports vision at module level
+with open(os.path.join('backend', 'main_clean.py'), encoding='utf-8') as f:
+    top_level = [line for line in f if line.startswith(('from vision', 'import vision'))]
+assert not top_level
+print("✓ main_clean imports vision only when face analysis is enabled")
+
+print("\n" + "=" * 70)
+print("  ALL LAZY VISION TESTS PASSED")
+print("=" * 70)
@@ -0,0 +1,96 @@
+"""
+Test the vision worker process and its shared-memory double buffers (no webcam:
+the worker reads a generated video file)
+"""
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import numpy as np
+
+
+def main():
+    import cv2
+    from vision.vision_process import DoubleBuffer, VisionProcess
+
+    print("=" * 70)
+    print("  TESTING VISION PROCESS")
+    print("=" * 70)
+
+    # Double buffer round trip, attach by name like the worker does
+    owner = DoubleBuffer(1024)
+    reader = DoubleBuffer(1024, name=owner.name)
+    assert reader.read() is None
+    owner.write(np.arange(12, dtype=np.uint8), 1.5, (3, 4))
+    owner.write(np.arange(6, dtype=np.uint8) + 100, 2.5, (2, 3))
+    data, shape, ts, seq = reader.read()
+    print(f"\n✓ Double buffer: shape {shape}, ts {ts}, publish #{seq}")
+    assert shape == (2, 3) and ts == 2.5 and seq == 2 and data[0] == 100
+    assert reader.read(only_new=True) is None
+    reader.close()
+    owner.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "session.avi")
+        writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 30, (640, 480))
+        for i in range(150):
+            frame = np.full((480, 640, 3), 120, dtype=np.uint8)
+            cv2.circle(frame, (200 + i, 240), 80, (200, 200, 200), -1)
+            writer.write(frame)
+        writer.release()
+
+        # Brightness fallback gives the worker a "face" without a real detector
+        os.environ["VISION_TRACKING"] = "0"
+        process = VisionProcess(source=video, interval=0.05)
+        t0 = time.perf_counter()
+        assert process.start(timeout=30), process.error
+        print(f"✓ Worker started in {time.perf_counter() - t0:.1f}s (pid {process._process.pid})")
+
+        result = process.wait_result(10.0)
+        assert result is not None
+        time.sleep(1.0)
+
+        t0 = time.perf_counter()
+        for _ in range(10000):
+            analysis = process.analysis()
+            mood = process.mood()
+        per_read = (time.perf_counter() - t0) / 10000 * 1e6
+        print(f"✓ Read in {per_read:.2f}µs: {analysis['faces_detected']} face(s), mood {mood}")
+        assert analysis['faces_detected'] == 1 and per_read < 100
+        assert analysis['analysis'][0]['emotion']['emotion'] in ('happy', 'sad', 'neutral')
+
+        frame = process.latest_frame()
+        print(f"✓ Latest frame through shared memory: {frame.shape} {frame.dtype}")
+        assert frame.shape == (480, 640, 3)
+
+        process.set_rate(0.5)
+        stats = process.stats()
+        print(f"✓ Control channel: {stats}")
+        assert stats['capturing'] and stats['analyzed'] > 0
+
+        # Reads in this process reach the worker's idle timer (camera released when nobody reads)
+        time.sleep(1.5)
+        assert process.stats()['idle_seconds'] >= 1.4
+        process.mood()
+        time.sleep(0.2)
+        stats = process.stats()
+        print(f"✓ Mood read forwarded to the worker: idle {stats['idle_seconds']}s")
+        assert stats['idle_seconds'] < 0.5
+
+        process.pause()
+        assert not process.stats()['capturing']
+        print("✓ Paused (camera released, worker still up)")
+
+        process.stop()
+        assert not process.running
+        print("✓ Worker shut down, shared memory released")
+
+    print("\n" + "=" * 70)
+    print("  ALL VISION PROCESS TESTS PASSED")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()